@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# benchmarks/run_benchmarks.py
+"""
+Time the hot paths of the tool against synthetic data and append the results
+(wall time + peak Python memory) to a JSON file, so runs from different
+commits can be compared.
+
+    python benchmarks/run_benchmarks.py                     # 1k/10k/100k/500k
+    python benchmarks/run_benchmarks.py --sizes 1000 10000  # quicker
+    python benchmarks/run_benchmarks.py --skip-gui          # no display needed
+"""
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import (  # noqa: E402
+    make_pairs,
+    write_oneuni_csv,
+    write_template_xlsx,
+)
+from helpers.export_oneuni import export_ids_marks_to_xlsx, export_oneuni_rows_to_xlsx  # noqa: E402
+from helpers.oneuni_csv import extract_sspassess_rows  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 500_000]
+DEFAULT_OUTPUT = REPO_ROOT / "bench_results.json"
+
+
+def measure(fn, *args, **kwargs):
+    """Run fn once; return (result, seconds, peak_mb) using tracemalloc for memory."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+# ---------------------- Benchmarks ----------------------
+def bench_io(n: int, workdir: Path, hist_ratio: float):
+    results = []
+    csv_path = write_oneuni_csv(workdir / f"oneuni_{n}.csv", n, hist_ratio=hist_ratio)
+    rows, secs, peak = measure(extract_sspassess_rows, csv_path)
+    results.append(("extract_sspassess_rows", n, secs, peak))
+
+    template = write_template_xlsx(workdir / "template.xlsx")
+    target = workdir / f"oneuni_target_{n}.xlsx"
+    shutil.copyfile(template, target)
+    _, secs, peak = measure(export_oneuni_rows_to_xlsx, rows, target_filename=str(target))
+    results.append(("export_oneuni_rows_to_xlsx", n, secs, peak))
+    del rows
+
+    pairs = make_pairs(n)
+    _, secs, peak = measure(
+        export_ids_marks_to_xlsx, pairs,
+        template_filename=str(template),
+        output_filename=str(workdir / f"ids_marks_{n}.xlsx"),
+    )
+    results.append(("export_ids_marks_to_xlsx", n, secs, peak))
+    return results
+
+
+def bench_gui(n: int, app):
+    """Paste n two-column rows through the clipboard, then collect them back."""
+    results = []
+    pairs = make_pairs(n)
+    app.on_clear_grid()
+    app.clipboard_clear()
+    app.clipboard_append("\n".join(f"{sid}\t{mk}" for sid, mk in pairs))
+    app.tree.selection_set(app.tree.get_children()[0])
+
+    def paste():
+        app.on_paste_two_columns()
+        app._finish_paste()  # the paste is fed in batches; time all of it
+
+    _, secs, peak = measure(paste)
+    results.append(("GridApp.on_paste_two_columns", n, secs, peak))
+    collected, secs, peak = measure(app._collect_pairs_from_grid)
+    results.append(("GridApp._collect_pairs_from_grid", n, secs, peak))
+    if len(collected) != n:
+        print(f"  ! collected {len(collected)} pairs, expected {n}")
+    return results
+
+
+def make_grid_app():
+    import tkinter as tk
+    from helpers.idsandmarksgui import GridApp
+    try:
+        app = GridApp()
+    except tk.TclError as e:
+        print(f"Skipping GridApp benchmarks (no display?): {e}")
+        return None
+    app.withdraw()
+    return app
+
+
+# ---------------------- Results file ----------------------
+def load_runs(path: Path):
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_comparison(run, previous):
+    prev = {(r["name"], r["rows"]): r for r in previous["results"]} if previous else {}
+    print(f"\n{'benchmark':<36}{'rows':>9}{'seconds':>10}{'peak MB':>10}{'vs prev':>10}")
+    for r in run["results"]:
+        old = prev.get((r["name"], r["rows"]))
+        delta = f"{(r['seconds'] / old['seconds'] - 1) * 100:+.0f}%" if old and old["seconds"] else ""
+        print(f"{r['name']:<36}{r['rows']:>9}{r['seconds']:>10.3f}{r['peak_mb']:>10.1f}{delta:>10}")
+    if previous:
+        print(f"(compared with commit {previous['commit']} at {previous['timestamp']})")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="row counts to benchmark")
+    ap.add_argument("--hist-ratio", type=float, default=0.3,
+                    help="SSPASSESSHIST lines per SSPASSESS line in the synthetic CSV")
+    ap.add_argument("--skip-gui", action="store_true", help="skip the GridApp paste/collect benchmarks")
+    ap.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="JSON file the run is appended to")
+    args = ap.parse_args(argv)
+
+    app = None if args.skip_gui else make_grid_app()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="msc-bench-") as tmp:
+        for n in args.sizes:
+            print(f"Running {n} rows...")
+            results += bench_io(n, Path(tmp), args.hist_ratio)
+            if app is not None:
+                results += bench_gui(n, app)
+    if app is not None:
+        app.destroy()
+
+    run = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [
+            {"name": name, "rows": n, "seconds": round(secs, 4), "peak_mb": round(peak, 2)}
+            for name, n, secs, peak in results
+        ],
+    }
+    runs = load_runs(args.output)
+    print_comparison(run, runs[-1] if runs else None)
+    runs.append(run)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(runs, f, indent=2)
+    print(f"\nResults appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/synthetic.py
+"""
+Synthetic data generators for the benchmarks: OneUni extract CSVs,
+Blackboard gradebook CSVs, (id, mark) pair lists and a minimal copy of the
+BB -> OneUni import template workbook.
+"""
+import csv
+import random
+from pathlib import Path
+
+from openpyxl import Workbook
+
+from helpers.oneuni_csv import CSV_FIELD_MAP, SSPASSESS
+
+SSPASSESSHIST = "SSPASSESSHIST"
+
+
+def make_student_ids(n: int, seed: int = 0):
+    """n distinct 8-digit student IDs (some with leading zeros)."""
+    rnd = random.Random(seed)
+    return [f"{x:08d}" for x in rnd.sample(range(100_000_000), n)]
+
+
+def make_pairs(n: int, seed: int = 0, blank_ratio: float = 0.02, text_ratio: float = 0.01):
+    """n (student_id, mark) pairs; a few marks blank or non-numeric (e.g. 'AB')."""
+    rnd = random.Random(seed)
+    pairs = []
+    for sid in make_student_ids(n, seed):
+        roll = rnd.random()
+        if roll < blank_ratio:
+            mark = ""
+        elif roll < blank_ratio + text_ratio:
+            mark = "AB"
+        else:
+            mark = str(round(rnd.uniform(0, 100), rnd.choice((0, 1))))
+        pairs.append((sid, mark))
+    return pairs
+
+
+def write_oneuni_csv(path: Path, n_rows: int, hist_ratio: float = 0.3,
+                     n_units: int = 10, n_assessments: int = 4, seed: int = 0):
+    """
+    Write a OneUni-style extract with `n_rows` SSPASSESS lines plus roughly
+    `hist_ratio` extra SSPASSESSHIST lines, preceded by header/format rows.
+    """
+    rnd = random.Random(seed)
+    ids = make_student_ids(max(1, n_rows // max(1, n_assessments)) + 1, seed)
+    units = [(f"UNIT{1000 + u}", f"Synthetic Unit {u}") for u in range(n_units)]
+    n_fields = len(CSV_FIELD_MAP)
+
+    def line(kind, idx):
+        code, title = units[idx % n_units]
+        assess = idx % n_assessments
+        return [
+            kind, code, "1", title, "2026", "S1", "Semester 1", "BEN", "Bentley",
+            "1", ids[idx // n_assessments % len(ids)], "1",
+            f"{code}-A{assess + 1}", "Assignment", f"Assessment {assess + 1}",
+            f"BC{idx:09d}",
+        ][:n_fields]
+
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["H", "OneUni assessment extract"])
+        w.writerow(list(CSV_FIELD_MAP.values()))
+        for i in range(n_rows):
+            w.writerow(line(SSPASSESS, i))
+            if rnd.random() < hist_ratio:
+                w.writerow(line(SSPASSESSHIST, i))
+    return path
+
+
+def write_blackboard_gradebook_csv(path: Path, pairs, column_name="Assignment 1 [Total Pts: 100 Score] |123456"):
+    """Write a Blackboard 'Download Grades' style CSV for the given pairs."""
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["Last Name", "First Name", "Username", "Student ID",
+                    "Last Access", "Availability", column_name])
+        for i, (sid, mark) in enumerate(pairs):
+            w.writerow([f"Last{i}", f"First{i}", f"u{sid}", sid,
+                        "2026-05-01 10:00:00", "Yes", mark])
+    return path
+
+
+def write_template_xlsx(path: Path):
+    """A stand-in for the import template with the two sheets the exporters use."""
+    wb = Workbook()
+    ws1 = wb.active
+    ws1.title = "Tab 1 BB Export"
+    ws3 = wb.create_sheet("Tab 3 OneUni Export")
+    ws3.append(["OneUni export"])
+    ws3.append(list(CSV_FIELD_MAP.values()))
+    wb.save(path)
+    return path
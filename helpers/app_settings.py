@@ -0,0 +1,56 @@
+# helpers/app_settings.py
+"""
+Small persistent preferences for MinimalApp, kept in helpers/app_settings.json.
+Missing or unreadable files fall back to DEFAULT_SETTINGS.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+from helpers.oneuni_index import DEFAULT_MEMORY_BUDGET_MB
+
+SETTINGS_PATH = Path(__file__).resolve().parent / "app_settings.json"
+# Folder name under the platform's per-user data directory
+APP_DATA_NAME = "Bulk Upload Utility"
+
+DEFAULT_SETTINGS = {
+    # OneUni rows beyond this estimated size are kept in a temp file; 0 = never
+    "memory_budget_mb": DEFAULT_MEMORY_BUDGET_MB,
+}
+
+
+def user_data_dir() -> Path:
+    """
+    Per-user folder for larger data kept between runs (e.g. the session
+    snapshot): %LOCALAPPDATA% on Windows, ~/Library/Application Support on
+    macOS, $XDG_DATA_HOME or ~/.local/share elsewhere. Not created here.
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.environ.get("APPDATA") or Path.home() / "AppData" / "Local"
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Application Support"
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(base) / APP_DATA_NAME
+
+
+def load_settings(path: Path = SETTINGS_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(data)
+    return settings
+
+
+def save_settings(settings, path: Path = SETTINGS_PATH):
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(settings, f, indent=1)
+        os.replace(tmp, path)
+    except OSError:
+        pass
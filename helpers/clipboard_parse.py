@@ -0,0 +1,63 @@
+# helpers/clipboard_parse.py
+"""
+Clipboard text -> rows of cells, for GridApp's multi-column paste.
+
+The delimiter and quoting are worked out once from the start of the text
+(Excel copies tab-separated, other tools comma- or semicolon-separated), then
+the text is read lazily with the csv module, so quoted fields, embedded
+delimiters and line breaks inside quotes are handled, and the caller can
+take rows a batch at a time. Blank lines are kept as empty rows except at
+the end, where Excel leaves a trailing newline.
+"""
+import csv
+import io
+import re
+
+SNIFF_CHARS = 4096
+_QUOTED = re.compile(r'"[^"]*"')
+
+
+class _ExcelSemicolon(csv.excel):
+    delimiter = ";"
+
+
+def sniff_dialect(text: str):
+    """
+    Tab if the first non-blank line has a tab (Excel; a comma in a cell is
+    then a decimal comma). Otherwise semicolon if that line has one outside
+    quotes (the separator where the comma is the decimal mark), else comma;
+    the Sniffer only works out the quoting for the chosen delimiter.
+    """
+    sample = text[:SNIFF_CHARS]
+    first = next((line for line in sample.splitlines() if line.strip()), "")
+    if "\t" in first:
+        return csv.excel_tab
+    unquoted = _QUOTED.sub("", first)
+    delimiter = ";" if ";" in unquoted else ","
+    if delimiter not in unquoted:
+        return csv.excel_tab  # single column
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=delimiter)
+    except csv.Error:
+        return _ExcelSemicolon if delimiter == ";" else csv.excel
+
+
+def iter_clipboard_rows(text: str, dialect=None):
+    """Yield each row as a list of stripped cells."""
+    reader = csv.reader(io.StringIO(text, newline=""), dialect or sniff_dialect(text))
+    blanks = 0
+    for row in reader:
+        cells = [c.strip() for c in row]
+        if not any(cells):
+            blanks += 1  # only emitted if a non-blank row follows
+            continue
+        for _ in range(blanks):
+            yield []
+        blanks = 0
+        yield cells
+
+
+def iter_pairs(text: str, dialect=None):
+    """(first cell, second cell) per row; missing cells are ''."""
+    for cells in iter_clipboard_rows(text, dialect):
+        yield (cells[0] if cells else "", cells[1] if len(cells) > 1 else "")
@@ -1,7 +1,6 @@
 # helpers/dnd_gui.py
 from __future__ import annotations
 
-import csv
 import sys
 from pathlib import Path
 
@@ -21,53 +20,66 @@ except ImportError:
     )
     sys.exit(1)
 
-# --- Fields map retained from your existing script ---
-CSV_FIELD_MAP = {
-    0: "LineType",
-    1: "StudentStudyItemAssessmentCurriculumItemCode",
-    2: "StudentStudyItemAssessmentCurriculumItemVersionNumber",
-    3: "StudentStudyItemAssessmentCurriculumItemFullTitle",
-    4: "StudentStudyItemAssessmentDeliveryYear",
-    5: "StudentStudyItemAssessmentDeliveryStudyPeriodCode",
-    6: "StudentStudyItemAssessmentDeliveryStudyPeriodDescription",
-    7: "StudentStudyItemAssessmentDeliveryLocationCode",
-    8: "StudentStudyItemAssessmentDeliveryLocationDescription",
-    9: "StudentStudyItemAssessmentDeliveryNumber",
-    10: "StudentStudyItemAssessmentStudentID",
-    11: "StudentStudyItemAssessmentStudentStudyItemAttemptNumber",
-    12: "StudentStudyItemAssessmentID",
-    13: "StudentStudyItemAssessmentTypeDescription",
-    14: "StudentStudyItemAssessmentDescription",
-    15: "StudentStudyItemAssessmentBarcode",
-}
-
-SSPASSESS = "SSPASSESS"
-
-
-class DnDApp(TkinterDnD.Tk):
+from helpers.oneuni_csv import (
+    CSV_FIELD_MAP,
+    ONEUNI_FILETYPES,
+    SSPASSESS,
+    is_oneuni_file,
+    iter_sspassess_rows,
+)
+from helpers.oneuni_index import OneUniRowStore
+from helpers.oneuni_preview import OneUniPreview
+
+
+def require_dnd(root):
+    """Load the tkdnd package into `root`'s interpreter (once)."""
+    if getattr(root, "TkdndVersion", None) is None:
+        root.TkdndVersion = TkinterDnD._require(root)
+    return root.TkdndVersion
+
+
+class DnDApp(tk.Toplevel):
     """
     A drag-and-drop CSV loader that filters to 'SSPASSESS' rows.
     When the user clicks 'Send to Main' (or drops a file if auto_send is True),
-    we call callback(rows) where rows is a list of dicts mapped by CSV_FIELD_MAP.
+    we call callback(rows) where rows is a OneUniRowStore of dicts mapped by
+    CSV_FIELD_MAP. Past `memory_budget_mb` the store keeps them in a temp file.
+
+    It is a Toplevel on the master's interpreter (tkdnd is loaded into that
+    interpreter on first use). Closing it only hides it, so the loaded rows
+    stay and the owner can reopen it with show().
     """
 
-    def __init__(self, callback=None, auto_send=False):
-        super().__init__()
+    def __init__(self, master=None, callback=None, auto_send=False, memory_budget_mb=None):
+        super().__init__(master)
+        require_dnd(self._root())
         self.callback = callback
         self.auto_send = auto_send
         self.title("Drop a CSV file (prints or sends ONLY SSPASSESS rows)")
         self.geometry("560x320")
 
-        self._rows_accumulator = []  # store parsed rows across multiple drops
+        self.memory_budget_mb = memory_budget_mb
+        # store parsed rows across multiple drops
+        self._rows_accumulator = OneUniRowStore(memory_budget_mb=memory_budget_mb)
 
         self._build_ui()
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+
+    def show(self):
+        self.deiconify()
+        self.lift()
+        self.focus_set()
+
+    def set_memory_budget(self, memory_budget_mb):
+        self.memory_budget_mb = memory_budget_mb
+        self._rows_accumulator.memory_budget_mb = memory_budget_mb
 
     # ---------------------- UI ----------------------
     def _build_ui(self):
         instruction = tk.Label(
             self,
             text=(
-                "Drag and drop a CSV file here.\n"
+                "Drag and drop a CSV file here (.csv, .csv.gz or .zip).\n"
                 "The app filters ONLY rows whose first column is 'SSPASSESS'\n"
                 "(SSPASSESSHIST and header/format rows are ignored)."
             ),
@@ -104,6 +116,9 @@ class DnDApp(TkinterDnD.Tk):
         tk.Button(btns, text="Clear Loaded Rows", command=self._clear_rows).pack(
             side="left", padx=4
         )
+        tk.Button(btns, text="Preview Rows", command=self._preview_rows).pack(
+            side="left", padx=4
+        )
         tk.Button(btns, text="Send to Main", command=self._send_to_main).pack(
             side="left", padx=4
         )
@@ -118,18 +133,22 @@ class DnDApp(TkinterDnD.Tk):
         loaded = 0
         for file_path in files:
             p = Path(file_path)
-            if p.is_file() and p.suffix.lower() == ".csv":
+            if p.is_file() and is_oneuni_file(p):
+                store = self._rows_accumulator
+                before = len(store)
                 try:
-                    rows = self._extract_sspassess_rows(p)
-                    self._rows_accumulator.extend(rows)
+                    # Streamed in batches, so the memory budget holds while a large file is parsed
+                    store.extend_batched(iter_sspassess_rows(p))
                     loaded += 1
                 except Exception as e:
+                    store.truncate(before)  # all of a file or none of it
                     messagebox.showerror("Error", f"Error reading {p}:\n{e}")
             else:
-                messagebox.showinfo("Skipped", f"Not a CSV file: {p}")
+                messagebox.showinfo("Skipped", f"Not a CSV, .csv.gz or .zip file: {p}")
 
         self.drop_area.configure(text="Drop another CSV here…")
-        self._set_status(f"Loaded {loaded} file(s); {len(self._rows_accumulator)} SSPASSESS rows in memory.")
+        where = "on disk" if self._rows_accumulator.spilled else "in memory"
+        self._set_status(f"Loaded {loaded} file(s); {len(self._rows_accumulator)} SSPASSESS rows {where}.")
 
         if self.auto_send and self.callback and self._rows_accumulator:
             self._send_to_main()
@@ -137,36 +156,22 @@ class DnDApp(TkinterDnD.Tk):
     def _browse_file(self):
         path = filedialog.askopenfilename(
             title="Select CSV file",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            filetypes=ONEUNI_FILETYPES,
         )
         if path:
             # Simulate drop
             self._on_drop(type("Evt", (), {"data": path}))
 
     # ---------------------- Logic ----------------------
-    def _extract_sspassess_rows(self, csv_path: Path):
-        """
-        Return a list[dict] of rows whose first column is exactly 'SSPASSESS'.
-        Dictionary keys are mapped using CSV_FIELD_MAP.
-        """
-        rows = []
-        with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
-            reader = csv.reader(f)
-            for raw in reader:
-                if not raw:
-                    continue
-                if raw[0].strip().upper() != SSPASSESS:
-                    continue
-                # map fields using CSV_FIELD_MAP; ignore missing indices safely
-                mapped = {
-                    CSV_FIELD_MAP[i]: (raw[i].strip() if i < len(raw) else "")
-                    for i in CSV_FIELD_MAP
-                }
-                rows.append(mapped)
-        return rows
+    def _preview_rows(self):
+        if not self._rows_accumulator:
+            messagebox.showinfo("Nothing to preview", "No SSPASSESS rows loaded yet.")
+            return
+        OneUniPreview(self, self._rows_accumulator)
 
     def _clear_rows(self):
-        self._rows_accumulator.clear()
+        # A new store, not clear(): the main window may still share the old rows
+        self._rows_accumulator = OneUniRowStore(memory_budget_mb=self.memory_budget_mb)
         self._set_status("Cleared loaded rows.")
 
     def _send_to_main(self):
@@ -175,8 +180,10 @@ class DnDApp(TkinterDnD.Tk):
             return
 
         if self.callback:
-            # Send a copy to avoid accidental mutation by receivers
-            payload = list(self._rows_accumulator)
+            # Passed as-is, no copy: receivers must not mutate it. MinimalApp's
+            # store keeps its own list and indexes only rows added since the
+            # previous send (or shares the spill file read-only).
+            payload = self._rows_accumulator
             try:
                 self.callback(payload)
                 self._set_status(f"Sent {len(payload)} row(s) to main app.")
@@ -199,5 +206,8 @@ def run_dnd_gui(callback=None, auto_send=False):
     Start the DnD GUI. If callback is provided, the user can click 'Send to Main'
     (or, if auto_send=True, results are sent immediately after a drop).
     """
-    app = DnDApp(callback=callback, auto_send=auto_send)
-    app.mainloop()
+    root = TkinterDnD.Tk()
+    root.withdraw()
+    app = DnDApp(root, callback=callback, auto_send=auto_send)
+    app.protocol("WM_DELETE_WINDOW", root.destroy)
+    root.mainloop()
@@ -1,20 +1,94 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
+import json
+import os
+import re
+import shutil
+import tempfile
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 from openpyxl import load_workbook
 
+from helpers.oneuni_index import ASSESSMENT_KEY, MARK_KEY, UNIT_KEY
+from helpers.timing import span, timed
+from helpers.xlsx_columns import NUMBER, STRING, TEXT, TypedColumnWriter
+
+DEFAULT_ONEUNI_TARGET = "/Users/mattpsychology/Documents/Marks Inputter/SEPS Master BB to OneUni mark import template - Final with IDs and marks.xlsx"
+
+# Process umask, read once: mkstemp creates 0600 files, and a new export
+# should get the same mode an ordinary save would
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# How often (in rows) the long loops report progress and check for cancellation
+PROGRESS_EVERY = 1000
+
+# Output types for Tab 3 fields; anything not listed (IDs, codes, text) is
+# written as a STRING cell, keeping the template's format
+ONEUNI_COLUMN_TYPES = {
+    "StudentStudyItemAssessmentCurriculumItemVersionNumber": NUMBER,
+    "StudentStudyItemAssessmentDeliveryYear": NUMBER,
+}
+
+# Tab 1: column A student ID (text keeps leading zeros), column B mark
+IDS_MARKS_COLUMNS = {1: TEXT, 2: NUMBER}
+
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled; the target file is left untouched."""
+
+
+def _check_cancel(cancel):
+    if cancel is not None and cancel.is_set():
+        raise ExportCancelled("Export cancelled; the target file was not modified.")
+
+
+def _save_atomically(wb, out_path: Path, cancel=None):
+    """
+    Save to a temp file next to `out_path`, then swap it in. A cancel or a
+    failure while saving therefore never leaves a half-written target.
+    """
+    fd, tmp = tempfile.mkstemp(prefix=".~export-", suffix=".xlsx", dir=out_path.parent)
+    os.close(fd)
+    try:
+        wb.save(tmp)
+        _check_cancel(cancel)
+        # Keep the target's permissions (mkstemp's 0600 would otherwise replace them)
+        if out_path.exists():
+            shutil.copymode(out_path, tmp)
+        else:
+            os.chmod(tmp, 0o666 & ~_UMASK)
+        os.replace(tmp, out_path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+@timed("export_oneuni_rows_to_xlsx")
 def export_oneuni_rows_to_xlsx(
     rows,
-    target_filename="/Users/mattpsychology/Documents/Marks Inputter/SEPS Master BB to OneUni mark import template - Final with IDs and marks.xlsx",
+    target_filename=DEFAULT_ONEUNI_TARGET,
     sheet_name="Tab 3 OneUni Export",
     start_row=3,
     header_row=2,
+    output_filename=None,
+    progress=None,
+    cancel=None,
+    mark_header=None,
 ):
     """
     Write the list[dict] produced by dnd_gui (SSPASSESS only) into the given workbook.
     - We read the headers on `header_row` of `sheet_name` and match by name (case-insensitive).
     - `start_row` is the first row for data (row 3 as requested).
     - Existing data in the target area is cleared just before writing (limited to used columns).
+    - The workbook is saved in place unless `output_filename` is given.
+    - `progress(done, total)` is called as rows are written; setting the
+      `cancel` event raises ExportCancelled before anything is saved.
+    - With `mark_header`, each row's "Mark" value is written to the column
+      headed `mark_header` (added after the last header if missing). Without
+      it that column is left alone.
     """
 
     if not rows:
@@ -25,7 +99,8 @@ def export_oneuni_rows_to_xlsx(
     if not xlsx_path.exists():
         raise FileNotFoundError(f"Target workbook not found: {xlsx_path}")
 
-    wb = load_workbook(xlsx_path)
+    with span("export_oneuni.load_workbook"):
+        wb = load_workbook(xlsx_path)
     if sheet_name not in wb.sheetnames:
         raise KeyError(
             f"Worksheet '{sheet_name}' not found. Available: {wb.sheetnames!r}"
@@ -77,19 +152,343 @@ def export_oneuni_rows_to_xlsx(
             "Please update 'header_to_row_key' to match your worksheet headers."
         )
 
-    # ---- 3) Clear existing data region from start_row downwards for the used columns
-    max_rows_to_clear = max(ws.max_row - start_row + 1, len(rows))
-    for r in range(start_row, start_row + max_rows_to_clear):
-        for c in used_cols:
-            ws.cell(row=r, column=c, value=None)
-
-    # ---- 4) Write data
-    r = start_row
-    for row_dict in rows:
-        for col_idx, row_key in col_to_row_key.items():
-            value = (row_dict.get(row_key, "") or "").strip()
-            ws.cell(row=r, column=col_idx, value=value)
-        r += 1
-
-    wb.save(xlsx_path)
-    return xlsx_path
+    column_types = {c: ONEUNI_COLUMN_TYPES.get(key, STRING) for c, key in col_to_row_key.items()}
+    if mark_header:
+        mark_col = next((c for c, name in headers if name.lower() == mark_header.lower()), None)
+        if mark_col is None:
+            mark_col = max(used_cols) + 1
+            ws.cell(row=header_row, column=mark_col, value=mark_header)
+            used_cols.append(mark_col)
+        col_to_row_key[mark_col] = MARK_KEY
+        column_types[mark_col] = NUMBER
+
+    # ---- 3) Clear old data below the rows we are about to write (used columns)
+    total = len(rows)
+    with span("export_oneuni.clear", rows=max(0, ws.max_row - start_row + 1 - total)):
+        TypedColumnWriter(ws, {c: STRING for c in used_cols}).clear_rows(start_row + total, ws.max_row)
+    _check_cancel(cancel)
+
+    # ---- 4) Write data, PROGRESS_EVERY rows at a time
+    writer = TypedColumnWriter(ws, column_types)
+    keys = [col_to_row_key[c] for c, _ in writer.columns]
+    with span("export_oneuni.write", rows=total):
+        r = start_row
+        for done in range(0, total, PROGRESS_EVERY):
+            block = [[row_dict.get(k, "") for k in keys] for row_dict in rows[done:done + PROGRESS_EVERY]]
+            r = writer.write_block(r, block)
+            _check_cancel(cancel)
+            if progress:
+                progress(min(done + PROGRESS_EVERY, total), total)
+
+    out_path = base_dir / output_filename if output_filename else xlsx_path
+    with span("export_oneuni.save"):
+        _save_atomically(wb, out_path, cancel)
+    return out_path
+
+
+# ---------------- Per-unit batch export ----------------
+
+def partition_oneuni_rows(rows, by_assessment=False):
+    """
+    Group rows by curriculum item code (and assessment ID if `by_assessment`).
+    Returns {key_tuple: list[dict]} preserving the original row order.
+    A OneUniRowStore is grouped from its indexes instead of a full scan.
+    """
+    parts = {}
+    if hasattr(rows, "partition"):
+        names = ("unit", "assessment") if by_assessment else ("unit",)
+        for key, part in rows.partition(names).items():
+            key = tuple(k or "UNKNOWN" for k in key)
+            # Parts may be lazy views of spilled rows; only merge on a collision
+            parts[key] = list(parts[key]) + list(part) if key in parts else part
+        return parts
+    for row in rows:
+        key = (row.get(UNIT_KEY, "") or "UNKNOWN",)
+        if by_assessment:
+            key += (row.get(ASSESSMENT_KEY, "") or "UNKNOWN",)
+        parts.setdefault(key, []).append(row)
+    return parts
+
+
+def _partition_filename(key, stem="OneUni import"):
+    safe = "_".join(re.sub(r"[^\w.-]+", "-", k).strip("-") for k in key)
+    return f"{stem} - {safe}.xlsx"
+
+
+def _export_partition(job):
+    # Runs in a worker process; must stay a module-level function to be picklable.
+    rows, template, out_path, sheet_name, start_row, header_row = job
+    return export_oneuni_rows_to_xlsx(
+        rows,
+        target_filename=template,
+        sheet_name=sheet_name,
+        start_row=start_row,
+        header_row=header_row,
+        output_filename=out_path,
+    )
+
+
+@timed("export_oneuni_rows_per_unit")
+def export_oneuni_rows_per_unit(
+    rows,
+    output_dir,
+    target_filename=DEFAULT_ONEUNI_TARGET,
+    sheet_name="Tab 3 OneUni Export",
+    start_row=3,
+    header_row=2,
+    by_assessment=False,
+    max_workers=None,
+    progress=None,
+    cancel=None,
+):
+    """
+    Write one workbook per curriculum item (optionally per assessment too) into
+    `output_dir`, using `target_filename` as the template for each. Partitions
+    are written in parallel in a process pool (one process per core by default).
+    Progress is reported in rows as partitions finish; on cancel, workbooks
+    already written by this run are removed.
+    Returns {key_tuple: output_path}.
+    """
+    if not rows:
+        raise ValueError("No rows to export.")
+
+    template = Path(__file__).resolve().parent / target_filename
+    if not template.exists():
+        raise FileNotFoundError(f"Target workbook not found: {template}")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    parts = partition_oneuni_rows(rows, by_assessment=by_assessment)
+    jobs = {
+        key: (part, str(template), str(output_dir / _partition_filename(key)),
+              sheet_name, start_row, header_row)
+        for key, part in parts.items()
+    }
+
+    total = len(rows)
+    outputs = {}
+    done = 0
+
+    def finished(key, path):
+        nonlocal done
+        outputs[key] = path
+        done += len(parts[key])
+        if progress:
+            progress(done, total)
+
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    try:
+        if workers <= 1:
+            for key, job in jobs.items():
+                _check_cancel(cancel)
+                finished(key, _export_partition(job))
+            return outputs
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_export_partition, job): key for key, job in jobs.items()}
+            pending = set(futures)
+            try:
+                while pending:
+                    _check_cancel(cancel)
+                    completed, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                    for fut in completed:
+                        finished(futures[fut], fut.result())
+            except ExportCancelled:
+                for fut in pending:
+                    fut.cancel()
+                # Partitions already running still finish; collect them for cleanup
+                for fut in pending:
+                    if not fut.cancelled() and fut.exception() is None:
+                        outputs[futures[fut]] = fut.result()
+                raise
+        return outputs
+    except ExportCancelled:
+        for path in outputs.values():
+            try:
+                Path(path).unlink()
+            except OSError:
+                pass
+        raise
+
+
+@timed("export_ids_marks_to_xlsx")
+def export_ids_marks_to_xlsx(
+    pairs,
+    template_filename="SEPS Master BB to OneUni mark import template - Final.xlsx",
+    output_filename="SEPS Master BB to OneUni mark import template - Final with IDs and marks.xlsx",
+    sheet_name="Tab 1 BB Export",
+    start_row=1,
+    progress=None,
+    cancel=None,
+    ):
+    """
+    Write (student_id, mark) pairs to the given Excel template and save as a new file.
+    - IDs go to column A (written as text to preserve leading zeros)
+    - Marks go to column B (numeric if possible, otherwise text)
+    - Data starts at `start_row`
+    - `progress(done, total)` / `cancel` behave as in export_oneuni_rows_to_xlsx
+    """
+
+    # Template lives next to maingui.py (one level above helpers/)
+    base_dir = Path(__file__).resolve().parent.parent
+    template_path = base_dir / template_filename
+    output_path = base_dir / output_filename
+
+    if not template_path.exists():
+        raise FileNotFoundError(f"Template not found: {template_path}")
+
+    with span("export_ids_marks.load_workbook"):
+        wb = load_workbook(template_path)
+    if sheet_name not in wb.sheetnames:
+        raise KeyError(
+            f"Worksheet '{sheet_name}' not found in template. "
+            f"Available: {wb.sheetnames!r}"
+            )
+    ws = wb[sheet_name]
+
+    writer = TypedColumnWriter(ws, IDS_MARKS_COLUMNS)
+
+    # Clear old data (A/B) below the rows we are about to write
+    total = len(pairs)
+    with span("export_ids_marks.clear", rows=max(0, ws.max_row - start_row + 1 - total)):
+        writer.clear_rows(start_row + total, ws.max_row)
+    _check_cancel(cancel)
+
+    with span("export_ids_marks.write", rows=total):
+        r = start_row
+        for done in range(0, total, PROGRESS_EVERY):
+            r = writer.write_block(r, pairs[done:done + PROGRESS_EVERY])
+            _check_cancel(cancel)
+            if progress:
+                progress(min(done + PROGRESS_EVERY, total), total)
+
+    with span("export_ids_marks.save"):
+        _save_atomically(wb, output_path, cancel)
+    _save_export_state(output_path, _ids_marks_layout(template_path, sheet_name, start_row), pairs)
+    return output_path
+
+
+# ---------------- Incremental re-export ----------------
+
+IncrementalResult = namedtuple("IncrementalResult", "path rows_written full")
+
+
+def _export_state_path(output_path: Path) -> Path:
+    return output_path.with_name(f".{output_path.name}.export-state.json")
+
+
+def _ids_marks_layout(template_path: Path, sheet_name, start_row):
+    st = template_path.stat()
+    return {
+        "template": str(template_path),
+        "template_mtime_ns": st.st_mtime_ns,
+        "sheet_name": sheet_name,
+        "start_row": start_row,
+    }
+
+
+def _normalise_pairs(pairs):
+    return [[str(sid).strip(), str(mark).strip()] for sid, mark in pairs]
+
+
+def _save_export_state(output_path: Path, layout, pairs):
+    """Remember what was written to `output_path` (best effort)."""
+    st = output_path.stat()
+    state = {
+        "layout": layout,
+        "output_mtime_ns": st.st_mtime_ns,
+        "output_size": st.st_size,
+        "pairs": _normalise_pairs(pairs),
+    }
+    try:
+        with open(_export_state_path(output_path), "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def _load_export_state(output_path: Path):
+    try:
+        with open(_export_state_path(output_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@timed("export_ids_marks_incremental")
+def export_ids_marks_incremental(
+    pairs,
+    template_filename="SEPS Master BB to OneUni mark import template - Final.xlsx",
+    output_filename="SEPS Master BB to OneUni mark import template - Final with IDs and marks.xlsx",
+    sheet_name="Tab 1 BB Export",
+    start_row=1,
+    progress=None,
+    cancel=None,
+):
+    """
+    Re-export (id, mark) pairs by patching only the rows that changed since the
+    last export to the same output file.
+
+    Falls back to a full export_ids_marks_to_xlsx when there is no recorded
+    state, the template/sheet/start row differ, or the output file was changed
+    outside this tool. Returns IncrementalResult(path, rows_written, full).
+    """
+    base_dir = Path(__file__).resolve().parent.parent
+    template_path = base_dir / template_filename
+    output_path = base_dir / output_filename
+
+    if not template_path.exists():
+        raise FileNotFoundError(f"Template not found: {template_path}")
+
+    layout = _ids_marks_layout(template_path, sheet_name, start_row)
+    state = _load_export_state(output_path)
+    usable = (
+        state is not None
+        and output_path.exists()
+        and state.get("layout") == layout
+        and state.get("output_mtime_ns") == output_path.stat().st_mtime_ns
+        and state.get("output_size") == output_path.stat().st_size
+    )
+    if not usable:
+        path = export_ids_marks_to_xlsx(
+            pairs, template_filename, output_filename, sheet_name, start_row,
+            progress=progress, cancel=cancel,
+        )
+        return IncrementalResult(path, len(pairs), True)
+
+    old = state["pairs"]
+    new = _normalise_pairs(pairs)
+    changed = [
+        i for i in range(max(len(old), len(new)))
+        if i >= len(old) or i >= len(new) or old[i] != new[i]
+    ]
+    if not changed:
+        if progress:
+            progress(len(new), len(new))
+        return IncrementalResult(output_path, 0, False)
+
+    with span("export_ids_marks.load_workbook"):
+        wb = load_workbook(output_path)
+    if sheet_name not in wb.sheetnames:
+        raise KeyError(
+            f"Worksheet '{sheet_name}' not found in {output_path.name}. "
+            f"Available: {wb.sheetnames!r}"
+        )
+    ws = wb[sheet_name]
+
+    writer = TypedColumnWriter(ws, IDS_MARKS_COLUMNS)
+    total = len(changed)
+    with span("export_ids_marks.patch", rows=total):
+        for done, i in enumerate(changed, 1):
+            writer.write_row(start_row + i, new[i] if i < len(new) else ("", ""))
+            if done % PROGRESS_EVERY == 0:
+                _check_cancel(cancel)
+                if progress:
+                    progress(done, total)
+    if progress:
+        progress(total, total)
+
+    with span("export_ids_marks.save"):
+        _save_atomically(wb, output_path, cancel)
+    _save_export_state(output_path, layout, new)
+    return IncrementalResult(output_path, total, False)
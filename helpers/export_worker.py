@@ -0,0 +1,125 @@
+# helpers/export_worker.py
+"""
+Run a long export on a worker thread while a small progress window stays
+responsive on the Tk thread.
+
+The export function must accept `progress(done, total)` and `cancel`
+(a threading.Event) keyword arguments, like the exporters in export_oneuni.
+"""
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+from helpers.export_oneuni import ExportCancelled
+
+POLL_MS = 100
+
+
+class ExportProgressDialog(tk.Toplevel):
+    """
+    Progress bar + Cancel button for one background export.
+    Exactly one of on_done(result), on_error(exc) or on_cancel() is called on
+    the Tk thread when the worker finishes; on_finally() is always called last.
+    """
+
+    def __init__(self, master, title, func, *args, total=None,
+                 on_done=None, on_error=None, on_cancel=None, on_finally=None, **kwargs):
+        super().__init__(master)
+        self.title(title)
+        self.transient(master)
+        self.resizable(False, False)
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        self._on_done = on_done
+        self._on_error = on_error
+        self._on_cancel = on_cancel
+        self._on_finally = on_finally
+        self._queue = queue.Queue()
+        self.cancel_event = threading.Event()
+
+        self._build_ui(title, total)
+
+        kwargs.update(progress=self._post_progress, cancel=self.cancel_event)
+        self._thread = threading.Thread(
+            target=self._run, args=(func, args, kwargs), name=f"export: {title}", daemon=True
+        )
+        self._thread.start()
+        self.after(POLL_MS, self._poll)
+
+    # ---------------------- UI ----------------------
+    def _build_ui(self, title, total):
+        frm = ttk.Frame(self, padding=16)
+        frm.pack(fill="both", expand=True)
+
+        ttk.Label(frm, text=title, font=("Segoe UI", 11, "bold")).pack(anchor="w")
+        self.status_var = tk.StringVar(value="Opening workbook…")
+        ttk.Label(frm, textvariable=self.status_var).pack(anchor="w", pady=(4, 8))
+
+        self.bar = ttk.Progressbar(frm, length=360, mode="indeterminate", maximum=total or 100)
+        self.bar.pack(fill="x")
+        self.bar.start(12)
+
+        self.cancel_btn = ttk.Button(frm, text="Cancel", command=self.cancel)
+        self.cancel_btn.pack(anchor="e", pady=(12, 0))
+
+    def cancel(self):
+        if self.cancel_event.is_set():
+            return
+        self.cancel_event.set()
+        self.cancel_btn.configure(state="disabled")
+        self.status_var.set("Cancelling… (the target file will not be changed)")
+
+    # ---------------------- Worker ----------------------
+    def _run(self, func, args, kwargs):
+        try:
+            result = func(*args, **kwargs)
+        except ExportCancelled:
+            self._queue.put(("cancelled", None))
+        except Exception as e:
+            self._queue.put(("error", e))
+        else:
+            self._queue.put(("done", result))
+
+    def _post_progress(self, done, total):
+        # Called on the worker thread; only hand the numbers over.
+        self._queue.put(("progress", (done, total)))
+
+    # ---------------------- Tk-side polling ----------------------
+    def _poll(self):
+        latest = None
+        try:
+            while True:
+                kind, payload = self._queue.get_nowait()
+                if kind == "progress":
+                    latest = payload
+                    continue
+                self._finish(kind, payload)
+                return
+        except queue.Empty:
+            pass
+
+        if latest is not None and not self.cancel_event.is_set():
+            done, total = latest
+            if str(self.bar.cget("mode")) != "determinate":
+                self.bar.stop()
+                self.bar.configure(mode="determinate")
+            self.bar.configure(maximum=max(total, 1), value=done)
+            self.status_var.set(
+                f"Writing rows: {done:,} / {total:,}" if done < total else "Saving workbook…"
+            )
+        self.after(POLL_MS, self._poll)
+
+    def _finish(self, kind, payload):
+        self.bar.stop()
+        self.destroy()
+        try:
+            if kind == "done" and self._on_done:
+                self._on_done(payload)
+            elif kind == "error" and self._on_error:
+                self._on_error(payload)
+            elif kind == "cancelled" and self._on_cancel:
+                self._on_cancel()
+        finally:
+            if self._on_finally:
+                self._on_finally()
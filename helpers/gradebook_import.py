@@ -0,0 +1,144 @@
+# helpers/gradebook_import.py
+"""
+Streaming reader for Blackboard gradebook exports ("Work Offline" ->
+"Download", or "Download Results").
+
+Supported inputs:
+- .csv / .txt / .xls: delimited text. Blackboard's ".xls" download is really
+  UTF-16 tab-separated text, so the encoding is chosen from the BOM and the
+  delimiter is sniffed from the header line.
+- .xlsx: opened with openpyxl in read-only mode, rows streamed one at a time.
+
+Rows are never all held in memory by the reader; callers iterate.
+"""
+import codecs
+import csv
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+from helpers.timing import span
+
+GRADEBOOK_FILETYPES = [
+    ("Gradebook exports", "*.csv *.xls *.xlsx *.txt"),
+    ("All files", "*.*"),
+]
+
+# Header names tried in order when guessing the ID column
+ID_HEADER_CANDIDATES = ("student id", "studentid", "student number", "username", "user name")
+
+
+def _is_xlsx(path: Path) -> bool:
+    return path.suffix.lower() in (".xlsx", ".xlsm")
+
+
+def _text_encoding(path: Path) -> str:
+    with open(path, "rb") as f:
+        head = f.read(4)
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    return "utf-8-sig"
+
+
+def _open_text_reader(path: Path):
+    """Return (file, csv.reader) for a delimited gradebook file."""
+    f = open(path, "r", encoding=_text_encoding(path), newline="")
+    first = f.readline()
+    f.seek(0)
+    if "\t" in first:
+        delimiter = "\t"
+    else:
+        try:
+            delimiter = csv.Sniffer().sniff(first, delimiters=",;\t").delimiter
+        except csv.Error:
+            delimiter = ","
+    return f, csv.reader(f, delimiter=delimiter)
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _iter_raw_rows(path: Path):
+    """Yield each row of the file as a list[str], header included."""
+    if _is_xlsx(path):
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for values in wb.worksheets[0].iter_rows(values_only=True):
+                yield [_cell_text(v) for v in values]
+        finally:
+            wb.close()
+    else:
+        f, reader = _open_text_reader(path)
+        with f:
+            for raw in reader:
+                yield [v.strip() for v in raw]
+
+
+def read_gradebook_header(path) -> list:
+    """Column names from the first row of the gradebook."""
+    for row in _iter_raw_rows(Path(path)):
+        return row
+    return []
+
+
+def _named_columns(header):
+    """(id_index, mark_index) found by header name; either is None if not found."""
+    lowered = [(h or "").strip().lower() for h in header]
+    id_idx = next(
+        (lowered.index(c) for c in ID_HEADER_CANDIDATES if c in lowered),
+        None,
+    )
+    mark_idx = next(
+        (i for i, h in enumerate(lowered) if "total pts" in h or "[total" in h),
+        None,
+    )
+    if mark_idx is None:
+        mark_idx = next(
+            (i for i, h in enumerate(lowered)
+             if i != id_idx and any(k in h for k in ("mark", "grade", "score", "total"))),
+            None,
+        )
+    return id_idx, mark_idx
+
+
+def guess_columns(header):
+    """
+    Best guess at (id_index, mark_index) for a Blackboard header row.
+    Grade columns look like 'Assignment 1 [Total Pts: 100 Score] |123456'.
+    Falls back to the first and last columns; the user confirms the choice.
+    """
+    id_idx, mark_idx = _named_columns(header)
+    return (0 if id_idx is None else id_idx), (len(header) - 1 if mark_idx is None else mark_idx)
+
+
+def recognised_columns(header):
+    """
+    (id_index, mark_index) only when both columns are recognised by name,
+    else None. For unattended imports, where nobody can confirm a guess.
+    """
+    id_idx, mark_idx = _named_columns(header)
+    if id_idx is None or mark_idx is None:
+        return None
+    return id_idx, mark_idx
+
+
+def iter_gradebook_pairs(path, id_col: int, mark_col: int):
+    """Stream (student_id, mark) pairs, skipping the header and rows without an ID."""
+    path = Path(path)
+    with span("gradebook_import", file=path.name) as info:
+        count = 0
+        rows = _iter_raw_rows(path)
+        next(rows, None)  # header
+        for row in rows:
+            sid = row[id_col] if id_col < len(row) else ""
+            if not sid:
+                continue
+            mark = row[mark_col] if mark_col < len(row) else ""
+            count += 1
+            yield sid, mark
+        info["rows"] = count
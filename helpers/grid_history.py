@@ -0,0 +1,107 @@
+from collections import deque
+
+# Rough cap on what the undo stack may hold, counted in stored cells
+DEFAULT_MAX_CELLS = 1_000_000
+
+
+class Change:
+    """
+    One undoable GridApp action, stored as a list of compact diffs:
+
+    - ("cells", col, items, olds, news): cell writes to one column since the
+      last row insert/delete; the three lists are parallel.
+    - ("insert", rows): rows added, as (index, item, sid, mark) tuples.
+    - ("delete", rows): rows removed, as (index, item, sid, mark) tuples in
+      ascending index order, captured before removal.
+
+    Undo applies the inverse of each op in reverse order; redo replays them.
+    Either way the cost is proportional to the rows the action touched.
+    """
+
+    __slots__ = ("label", "ops", "size", "_open")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.ops = []
+        self.size = 0
+        self._open = {}  # col -> "cells" op still accepting writes
+
+    def cell(self, col: str, item, old: str, new: str):
+        if old == new:
+            return
+        op = self._open.get(col)
+        if op is None:
+            # Writes to different columns commute, so each column gets one op
+            # until the row structure changes.
+            op = self._open[col] = ("cells", col, [], [], [])
+            self.ops.append(op)
+        op[2].append(item)
+        op[3].append(old)
+        op[4].append(new)
+        self.size += 1
+
+    def inserted(self, index: int, item, sid: str = "", mark: str = ""):
+        last = self.ops[-1] if self.ops else None
+        if last is None or last[0] != "insert":
+            last = ("insert", [])
+            self.ops.append(last)
+            self._open.clear()
+        last[1].append((index, item, sid, mark))
+        self.size += 2
+
+    def deleted(self, rows):
+        """rows: iterable of (index, item, sid, mark), ascending by index."""
+        rows = list(rows)
+        if rows:
+            self.ops.append(("delete", rows))
+            self._open.clear()
+            self.size += 2 * len(rows)
+
+    def __bool__(self):
+        return bool(self.ops)
+
+
+class EditHistory:
+    """Undo/redo stacks of Change objects, trimmed oldest-first to `max_cells`."""
+
+    def __init__(self, max_cells: int = DEFAULT_MAX_CELLS):
+        self.max_cells = max_cells
+        self._undo = deque()
+        self._redo = []
+        self._cells = 0  # total Change.size across both stacks
+
+    def push(self, change: Change):
+        if not change:
+            return
+        self._cells -= sum(c.size for c in self._redo)
+        self._redo.clear()
+        self._undo.append(change)
+        self._cells += change.size
+        # Always keep the newest action, even if it alone is over budget
+        while self._cells > self.max_cells and len(self._undo) > 1:
+            self._cells -= self._undo.popleft().size
+
+    def undo(self):
+        if not self._undo:
+            return None
+        change = self._undo.pop()
+        self._redo.append(change)
+        return change
+
+    def redo(self):
+        if not self._redo:
+            return None
+        change = self._redo.pop()
+        self._undo.append(change)
+        return change
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._cells = 0
@@ -0,0 +1,176 @@
+import re
+from bisect import bisect_left, insort
+
+# Expected shape of a student ID. Adjust to match your institution's format.
+STUDENT_ID_PATTERN = re.compile(r"^\d{6,10}$")
+
+
+class IdIndex:
+    """
+    Incremental Student ID -> Treeview items index used by GridApp.
+
+    Every cell write goes through `set()` / `discard()`, so duplicate and
+    malformed IDs are known in O(1) per edit without rescanning the grid.
+    Both methods return the items whose duplicate status may have changed
+    (the edited item plus at most one neighbour per ID), so the caller only
+    needs to re-tag those rows.
+
+    A sorted list of the distinct IDs is kept alongside for prefix search.
+
+    Optionally a roster (the set of enrolled IDs) can be attached with
+    `set_roster()`; the index then also tracks, per edit, which rows hold an
+    ID not on the roster and which roster IDs are missing from the grid.
+    """
+
+    def __init__(self, pattern=STUDENT_ID_PATTERN):
+        self.pattern = pattern
+        self._items_by_id = {}  # sid -> set[item]
+        self._id_by_item = {}   # item -> sid
+        self._dup_ids = set()   # sids present on more than one row
+        self._malformed = 0     # rows whose sid fails `pattern`
+        self._sorted_ids = []   # distinct sids, sorted, for prefix search
+        self._roster = None     # frozenset of enrolled sids, or None
+        self._missing = set()   # roster sids not present in the grid
+        self._unenrolled = 0    # rows whose sid is not on the roster
+
+    # ---------------- Updates ----------------
+    def set(self, item, sid):
+        """Record that `item` now holds `sid` (blank clears). Returns affected items."""
+        sid = (sid or "").strip()
+        old = self._id_by_item.get(item)
+        if old == sid or (old is None and not sid):
+            return {item}
+        affected = self.discard(item)
+        if sid:
+            bucket = self._items_by_id.get(sid)
+            if bucket is None:
+                bucket = self._items_by_id[sid] = set()
+                insort(self._sorted_ids, sid)
+                self._missing.discard(sid)
+            bucket.add(item)
+            self._id_by_item[item] = sid
+            if not self.pattern.match(sid):
+                self._malformed += 1
+            if self._roster is not None and sid not in self._roster:
+                self._unenrolled += 1
+            if len(bucket) == 2:
+                self._dup_ids.add(sid)
+                affected.update(bucket)
+        affected.add(item)
+        return affected
+
+    def discard(self, item):
+        """Forget `item` (row deleted or ID cleared). Returns affected items."""
+        affected = {item}
+        old = self._id_by_item.pop(item, None)
+        if old is None:
+            return affected
+        if not self.pattern.match(old):
+            self._malformed -= 1
+        if self._roster is not None and old not in self._roster:
+            self._unenrolled -= 1
+        bucket = self._items_by_id[old]
+        bucket.discard(item)
+        if not bucket:
+            del self._items_by_id[old]
+            del self._sorted_ids[bisect_left(self._sorted_ids, old)]
+            if self._roster is not None and old in self._roster:
+                self._missing.add(old)
+        elif len(bucket) == 1:
+            self._dup_ids.discard(old)
+            affected.update(bucket)
+        return affected
+
+    def clear(self):
+        self._items_by_id.clear()
+        self._id_by_item.clear()
+        self._dup_ids.clear()
+        self._malformed = 0
+        self._sorted_ids.clear()
+        self._unenrolled = 0
+        self._missing = set(self._roster or ())
+
+    def set_roster(self, ids):
+        """
+        Attach the enrolled IDs (None detaches). One pass over the roster and
+        the grid's distinct IDs; edits after that are O(1). Returns every
+        item, since any row's enrolment status may have changed.
+        """
+        if ids is None:
+            self._roster = None
+            self._missing = set()
+            self._unenrolled = 0
+            return set(self._id_by_item)
+        roster = frozenset(s.strip() for s in ids if s and s.strip())
+        self._roster = roster
+        present = self._items_by_id
+        self._missing = {sid for sid in roster if sid not in present}
+        self._unenrolled = sum(
+            len(items) for sid, items in present.items() if sid not in roster
+        )
+        return set(self._id_by_item)
+
+    # ---------------- Queries ----------------
+    def id_of(self, item) -> str:
+        return self._id_by_item.get(item, "")
+
+    def items_for(self, sid):
+        return set(self._items_by_id.get((sid or "").strip(), ()))
+
+    def is_duplicate(self, item) -> bool:
+        return self._id_by_item.get(item) in self._dup_ids
+
+    def is_malformed(self, item) -> bool:
+        sid = self._id_by_item.get(item)
+        return bool(sid) and not self.pattern.match(sid)
+
+    def search(self, query, limit=200):
+        """
+        IDs matching `query`: the exact ID first (if present), then IDs that
+        start with it, in sorted order. At most `limit` IDs are returned.
+        """
+        query = (query or "").strip()
+        if not query:
+            return []
+        out = [query] if query in self._items_by_id else []
+        i = bisect_left(self._sorted_ids, query)
+        while i < len(self._sorted_ids) and len(out) < limit:
+            sid = self._sorted_ids[i]
+            if not sid.startswith(query):
+                break
+            if sid != query:
+                out.append(sid)
+            i += 1
+        return out
+
+    def has_roster(self) -> bool:
+        return self._roster is not None
+
+    def is_unenrolled(self, item) -> bool:
+        """True if a roster is attached and the row's (non-blank) ID is not on it."""
+        if self._roster is None:
+            return False
+        sid = self._id_by_item.get(item)
+        return bool(sid) and sid not in self._roster
+
+    def unenrolled_count(self) -> int:
+        return self._unenrolled
+
+    def missing_ids(self):
+        """Roster IDs that no grid row holds, sorted."""
+        return sorted(self._missing)
+
+    def missing_count(self) -> int:
+        return len(self._missing)
+
+    def duplicate_ids(self):
+        return sorted(self._dup_ids)
+
+    def duplicate_count(self) -> int:
+        return len(self._dup_ids)
+
+    def malformed_count(self) -> int:
+        return self._malformed
+
+    def __len__(self):
+        return len(self._id_by_item)
@@ -1,12 +1,43 @@
 import json
 import tkinter as tk
-from tkinter import ttk, messagebox
+from contextlib import contextmanager
+from itertools import islice
+from tkinter import ttk, messagebox, filedialog
 from tkinter.scrolledtext import ScrolledText
 from pathlib import Path
 
+try:
+    from helpers.clipboard_parse import iter_pairs
+    from helpers.grid_history import Change, EditHistory
+    from helpers.grid_index import IdIndex
+    from helpers.mark_stats import MarkStats, MarkStatsPanel
+    from helpers.gradebook_import import (
+        GRADEBOOK_FILETYPES, guess_columns, iter_gradebook_pairs, read_gradebook_header,
+    )
+except ImportError:  # run directly as a script from helpers/
+    from clipboard_parse import iter_pairs
+    from grid_history import Change, EditHistory
+    from grid_index import IdIndex
+    from mark_stats import MarkStats, MarkStatsPanel
+    from gradebook_import import (
+        GRADEBOOK_FILETYPES, guess_columns, iter_gradebook_pairs, read_gradebook_header,
+    )
+
 APP_TITLE = "Student IDs & Marks - Spreadsheet Style"
 DATA_FILE = "student_marks.json"
 
+# Roster choices shown in the grid (besides one per assessment)
+ROSTER_NONE = "(no roster)"
+ROSTER_ALL = "All loaded students"
+
+# Output pane: lines inserted per after() callback, so large outputs never block the window
+OUTPUT_CHUNK = 2000
+# Multi-column paste: rows written per after() callback
+PASTE_BATCH = 2000
+
+# Statistics panel: edits within this window are folded into one refresh
+STATS_DELAY_MS = 250
+
 
 def data_file_path() -> Path:
     try:
@@ -16,17 +47,48 @@ def data_file_path() -> Path:
     return base / DATA_FILE
 
 
-class GridApp(tk.Tk):
-    def __init__(self, callback=None):
-        super().__init__()
+class GridApp(tk.Toplevel):
+    def __init__(self, master=None, callback=None, roster=None):
+        """
+        A Toplevel on the caller's interpreter. Closing it only hides it, so
+        the owner can keep the instance and reopen it with show().
+        roster: optional OneUniRowStore; grid IDs are then checked against the
+        students it holds (all of them, or one assessment's).
+        """
+        super().__init__(master)
         self.callback = callback
+        self.roster_source = roster
         self.title(APP_TITLE)
         self.geometry("500x650")
         self.minsize(400, 600)
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
 
         # In-memory store (list[tuple[str, str]])
         self.paired_rows = []
 
+        # Live Student ID -> rows index (duplicates / malformed IDs)
+        self._ids = IdIndex()
+        # Python-side mirror of the Mark column (item -> mark); IDs live in self._ids
+        self._marks = {}
+        # Numeric mirror of the marks for the statistics panel (opened on demand)
+        self._stats = MarkStats()
+        self._stats_panel = None
+        self._stats_job = None
+        self._sort_state = None  # (column, descending) of the last heading sort
+
+        # Undo/redo of edits, stored as diffs; _rec is the Change being recorded
+        self._history = EditHistory()
+        self._rec = None
+
+        # Multi-column paste being fed into the grid in batches (see _start_paste)
+        self._paste = None
+        self._paste_job = None
+
+        # Pairs shown in the output pane; copy/save read these, not the widget
+        self._output_pairs = []
+        self._output_job = None
+        self._output_pos = 0
+
         # UI state for in-place edit
         self._edit_entry = None
         self._edit_var = None
@@ -37,6 +99,18 @@ class GridApp(tk.Tk):
         self._style_treeview()
         self._insert_initial_rows(20)  # some empty rows to start
         self._try_load_on_start()
+        self._init_roster()
+
+    def show(self):
+        """Bring a hidden or background grid back, with the roster choices refreshed."""
+        self.deiconify()
+        self.lift()
+        self.focus_set()
+        # The store may have changed while the grid was hidden
+        if self.roster_combo.instate(["disabled"]):
+            self._init_roster()
+        elif self.roster_var.get() != ROSTER_NONE:
+            self._apply_roster()
 
     def process_ids_and_marks(self, pairs):
         if self.callback:
@@ -56,6 +130,31 @@ class GridApp(tk.Tk):
             font=("Segoe UI", 10)
         ).pack(anchor="w", pady=(0, 8))
 
+        # Search bar (backed by the ID index, not a Treeview scan)
+        search = ttk.Frame(root)
+        search.pack(fill="x", pady=(0, 8))
+        ttk.Label(search, text="Find Student ID:").pack(side="left")
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(search, textvariable=self.search_var, width=24)
+        self.search_entry.pack(side="left", padx=(6, 4))
+        self.search_entry.bind("<Return>", self.on_search_next)
+        self.search_entry.bind("<Escape>", lambda e: self.search_var.set(""))
+        ttk.Button(search, text="Next", command=self.on_search_next).pack(side="left")
+        self.search_var.trace_add("write", lambda *_: self._on_search_changed())
+
+        # Roster check against loaded OneUni rows
+        self.roster_var = tk.StringVar(value=ROSTER_NONE)
+        ttk.Button(search, text="Missing…", command=self.on_show_missing).pack(side="right")
+        self.roster_combo = ttk.Combobox(
+            search, textvariable=self.roster_var, state="readonly", width=22,
+            postcommand=self._refresh_roster_choices,
+        )
+        self.roster_combo.pack(side="right", padx=(4, 4))
+        self.roster_combo.bind("<<ComboboxSelected>>", lambda e: self._apply_roster())
+        ttk.Label(search, text="Roster:").pack(side="right")
+        self._search_hits = []
+        self._search_pos = 0
+
         # === Main 2-column area: left (treeview) and right (button panel) ===
         main = ttk.Frame(root)
         main.pack(fill="both", expand=True)
@@ -70,8 +169,8 @@ class GridApp(tk.Tk):
             left, columns=("id", "mark"), show="headings",
             selectmode="extended", height=16
         )
-        self.tree.heading("id", text="Student ID")
-        self.tree.heading("mark", text="Mark")
+        self.tree.heading("id", text="Student ID", command=lambda: self.on_sort("id"))
+        self.tree.heading("mark", text="Mark", command=lambda: self.on_sort("mark"))
         self.tree.column("id", width=150, anchor="w")
         self.tree.column("mark", width=150, anchor="center")
 
@@ -86,6 +185,13 @@ class GridApp(tk.Tk):
         left.columnconfigure(0, weight=1)
 
         self.tree.bind("<Double-1>", self._on_cell_double_click)
+        for seq, handler in (("<Control-z>", self.on_undo), ("<Control-y>", self.on_redo),
+                             ("<Control-Z>", self.on_redo), ("<Command-z>", self.on_undo),
+                             ("<Command-Z>", self.on_redo)):
+            try:
+                self.bind(seq, lambda e, h=handler: None if isinstance(e.widget, (tk.Entry, ttk.Entry)) else h())
+            except tk.TclError:
+                pass  # <Command-...> only exists on macOS
 
         # Right: vertical button panel
         right = ttk.Frame(main)
@@ -99,13 +205,17 @@ class GridApp(tk.Tk):
         ttk.Button(paste_grp, text="Paste IDs", command=self.on_paste_ids).pack(fill="x", pady=2)
         ttk.Button(paste_grp, text="Paste Marks", command=self.on_paste_marks).pack(fill="x", pady=2)
         ttk.Button(paste_grp, text="Paste 2-Column", command=self.on_paste_two_columns).pack(fill="x", pady=2)
+        ttk.Button(paste_grp, text="Import Gradebook…", command=self.on_import_gradebook).pack(fill="x", pady=2)
 
         # Group 2: Rows & Grid
         rows_grp = ttk.Labelframe(right, text="Rows & Grid")
         rows_grp.pack(fill="x", anchor="n", pady=(0, 8))
-        ttk.Button(rows_grp, text="Add 10 Rows", command=lambda: self._insert_initial_rows(10)).pack(fill="x", pady=2)
+        ttk.Button(rows_grp, text="Add 10 Rows", command=self.on_add_rows).pack(fill="x", pady=2)
         ttk.Button(rows_grp, text="Delete Selected", command=self.on_delete_selected).pack(fill="x", pady=2)
         ttk.Button(rows_grp, text="Clear Grid", command=self.on_clear_grid).pack(fill="x", pady=2)
+        ttk.Button(rows_grp, text="Undo", command=self.on_undo).pack(fill="x", pady=2)
+        ttk.Button(rows_grp, text="Redo", command=self.on_redo).pack(fill="x", pady=2)
+        ttk.Button(rows_grp, text="Statistics…", command=self.on_show_stats).pack(fill="x", pady=2)
 
         # Spacer to push persistence group to bottom if desired
         ttk.Frame(right).pack(expand=True, fill="both")
@@ -127,6 +237,7 @@ class GridApp(tk.Tk):
         out_btns = ttk.Frame(root)
         out_btns.pack(fill="x", pady=(6, 0))
         ttk.Button(out_btns, text="Copy Output", command=self.on_copy_output).pack(side="left", padx=4)
+        ttk.Button(out_btns, text="Save Output…", command=self.on_save_output).pack(side="left", padx=4)
         ttk.Button(out_btns, text="Clear Output", command=self.on_clear_output).pack(side="left", padx=4)
 
         # Status bar
@@ -142,13 +253,21 @@ class GridApp(tk.Tk):
             pass
         style.configure("Treeview", rowheight=24, font=("Segoe UI", 10))
         style.configure("Treeview.Heading", font=("Segoe UI", 10, "bold"))
+        # Validation tags. Ttk gives priority to the tag created first, so
+        # these must be configured before the zebra tags.
+        self.tree.tag_configure("dup", background="#f8d7da")
+        self.tree.tag_configure("badid", background="#fff3cd")
+        self.tree.tag_configure("notenrolled", background="#dbe7fb")
         # Zebra striping tags
         self.tree.tag_configure("odd", background="#ffffff")
         self.tree.tag_configure("even", background="#f6f6f6")
 
     def _insert_initial_rows(self, count: int):
-        for _ in range(count):
-            self.tree.insert("", "end", values=("", ""))
+        base = len(self.tree.get_children()) if self._rec is not None else 0
+        for i in range(count):
+            it = self.tree.insert("", "end", values=("", ""))
+            if self._rec is not None:
+                self._rec.inserted(base + i, it)
         self._retag_rows()
         self._set_status(f"Added {count} empty row(s).")
 
@@ -182,7 +301,13 @@ class GridApp(tk.Tk):
         def commit(event=None):
             new_val = self._edit_var.get()
             try:
-                self.tree.set(self._edit_item, self._edit_col, new_val)
+                if self._edit_col == "#1":
+                    with self._recording("Edit ID"):
+                        self._set_id(self._edit_item, new_val, refresh=True)
+                    self._set_status(f"Updated ID.{self._flag_summary()}")
+                else:
+                    with self._recording("Edit Mark"):
+                        self._set_mark(self._edit_item, new_val)
             finally:
                 self._destroy_editor()
 
@@ -208,6 +333,7 @@ class GridApp(tk.Tk):
 
     def _selected_start_index(self) -> int:
         """Start at the first selected row; fallback to first empty-row index; else append at end."""
+        self._finish_paste()  # a paste still being fed decides where the grid ends
         items = self.tree.get_children()
         sel = self.tree.selection()
         if sel:
@@ -217,7 +343,7 @@ class GridApp(tk.Tk):
                 pass
         # First empty row (both cells empty)
         for idx, it in enumerate(items):
-            if not self.tree.set(it, "id").strip() and not self.tree.set(it, "mark").strip():
+            if not self._ids.id_of(it) and not self._marks.get(it, "").strip():
                 return idx
         return len(items)
 
@@ -239,12 +365,15 @@ class GridApp(tk.Tk):
             return
 
         start = self._selected_start_index()
-        self._ensure_rows(start + len(ids))
-        items = self.tree.get_children()
-        for i, sid in enumerate(ids):
-            self.tree.set(items[start + i], "id", sid)
+        with self._recording("Paste IDs"):
+            self._ensure_rows(start + len(ids))
+            items = self.tree.get_children()
+            affected = set()
+            for i, sid in enumerate(ids):
+                affected |= self._set_id(items[start + i], sid)
+        self._refresh_flags(affected)
         self._retag_rows()
-        self._set_status(f"Pasted {len(ids)} ID(s) starting at row {start + 1}.")
+        self._set_status(f"Pasted {len(ids)} ID(s) starting at row {start + 1}.{self._flag_summary()}")
 
     def on_paste_marks(self):
         try:
@@ -259,10 +388,11 @@ class GridApp(tk.Tk):
             return
 
         start = self._selected_start_index()
-        self._ensure_rows(start + len(marks))
-        items = self.tree.get_children()
-        for i, mk in enumerate(marks):
-            self.tree.set(items[start + i], "mark", mk)
+        with self._recording("Paste Marks"):
+            self._ensure_rows(start + len(marks))
+            items = self.tree.get_children()
+            for i, mk in enumerate(marks):
+                self._set_mark(items[start + i], mk)
         self._retag_rows()
         self._set_status(f"Pasted {len(marks)} mark value(s) starting at row {start + 1}.")
 
@@ -272,62 +402,526 @@ class GridApp(tk.Tk):
         except Exception:
             self._set_status("Clipboard is empty or not text.")
             return
-        rows = text.splitlines()
-        parsed = []
-        for r in rows:
-            # Prefer TSV (what Excel copies), fallback to CSV
-            if "\t" in r:
-                parts = r.split("\t")
+        # Dialect (tab/comma/semicolon, quoting) is sniffed once; rows are parsed lazily
+        pairs = iter_pairs(text)
+        first = next(pairs, None)
+        if first is None:
+            self._set_status("Nothing to paste.")
+            return
+        start = self._selected_start_index()
+        self._paste = {
+            "rows": pairs, "pending": [first], "start": start, "done": 0,
+            "change": Change("Paste 2-Column"),
+        }
+        self._feed_paste()
+
+    def _feed_paste(self):
+        """Write the next PASTE_BATCH rows; reschedules itself until the paste is done."""
+        self._paste_job = None
+        job = self._paste
+        batch = job["pending"] + list(islice(job["rows"], PASTE_BATCH - len(job["pending"])))
+        job["pending"] = []
+        if batch:
+            # Every batch lands in the same Change, so the paste undoes in one step
+            self._rec = job["change"]
+            try:
+                self._write_pairs(job["start"] + job["done"], batch)
+            finally:
+                self._rec = None
+            job["done"] += len(batch)
+        if len(batch) == PASTE_BATCH:
+            self._set_status(f"Pasting… {job['done']} row(s) so far.")
+            self._paste_job = self.after(1, self._feed_paste)
+            return
+        self._paste = None
+        self._history.push(job["change"])
+        self._set_status(
+            f"Pasted {job['done']} row(s) (2-column) starting at row {job['start'] + 1}.{self._flag_summary()}"
+        )
+
+    def _finish_paste(self):
+        """Complete a paste still being fed, before anything else touches the grid."""
+        if self._paste_job is not None:
+            self.after_cancel(self._paste_job)
+            self._paste_job = None
+        while self._paste is not None:
+            self._feed_paste()
+            if self._paste_job is not None:
+                self.after_cancel(self._paste_job)
+                self._paste_job = None
+
+    # ------------- Sorting -------------
+
+    @staticmethod
+    def _sort_key_id(sid: str):
+        # Numeric IDs compare as numbers; anything else sorts after them as text
+        return (0, int(sid), sid) if sid.isdecimal() else (1, 0, sid.lower())
+
+    @staticmethod
+    def _sort_key_mark(mk: str):
+        try:
+            return (0, float(mk), "")
+        except ValueError:
+            return (1, 0.0, mk.lower())
+
+    def on_sort(self, col: str):
+        """
+        Sort by a column (click again to reverse). The sort runs on the
+        Python-side values and is applied to the Treeview in a single
+        reorder; rows with a blank cell always stay at the bottom.
+        """
+        self._destroy_editor()
+        self._finish_paste()
+        descending = self._sort_state == (col, False)
+        if col == "id":
+            value_of, key = self._ids.id_of, self._sort_key_id
+        else:
+            marks = self._marks
+            value_of, key = (lambda it: marks.get(it, "").strip()), self._sort_key_mark
+
+        filled, blank = [], []
+        for it in self.tree.get_children():
+            v = value_of(it)
+            if v:
+                filled.append((key(v), it))
             else:
-                parts = r.split(",")
-            id_part = parts[0].strip() if len(parts) >= 1 else ""
-            mark_part = parts[1].strip() if len(parts) >= 2 else ""
-            parsed.append((id_part, mark_part))
+                blank.append(it)
+        # list.sort is stable in both directions
+        filled.sort(key=lambda pair: pair[0], reverse=descending)
+        ordered = [it for _, it in filled] + blank
 
-        if not parsed:
-            self._set_status("Nothing to paste.")
+        self.tree.set_children("", *ordered)
+        self._retag_rows()
+        self._sort_state = (col, descending)
+        # Recorded steps hold row positions from before the reorder
+        self._history.clear()
+
+        arrow = " ▼" if descending else " ▲"
+        self.tree.heading("id", text="Student ID" + (arrow if col == "id" else ""))
+        self.tree.heading("mark", text="Mark" + (arrow if col == "mark" else ""))
+        self._set_status(
+            f"Sorted {len(filled)} row(s) by {'Student ID' if col == 'id' else 'Mark'}, "
+            f"{'descending' if descending else 'ascending'}."
+        )
+
+    # ------------- Search -------------
+
+    def _on_search_changed(self):
+        query = self.search_var.get().strip()
+        self._search_hits = []
+        self._search_pos = 0
+        if not query:
+            self._set_status("Ready")
+            return
+        sids = self._ids.search(query)
+        hits = []
+        for sid in sids:
+            hits.extend(self._ids.items_for(sid))
+        if not hits:
+            self._set_status(f"No ID matching '{query}'.")
+            return
+        # Present matches in grid order (only the matches are looked up)
+        hits.sort(key=self.tree.index)
+        self._search_hits = hits
+        exact = len(self._ids.items_for(query))
+        more = "+" if len(sids) >= 200 else ""
+        self._set_status(
+            f"{len(hits)}{more} row(s) match '{query}'"
+            + (f" ({exact} exact)." if exact else ".")
+        )
+        self._jump_to(hits[0])
+
+    def on_search_next(self, event=None):
+        hits = [it for it in self._search_hits if self.tree.exists(it)]
+        if not hits:
+            self._on_search_changed()
+            return
+        self._search_hits = hits
+        self._search_pos = (self._search_pos + 1) % len(hits)
+        self._jump_to(hits[self._search_pos])
+        self._set_status(f"Match {self._search_pos + 1} of {len(hits)}.")
+
+    def _jump_to(self, item):
+        self.tree.selection_set(item)
+        self.tree.focus(item)
+        self.tree.see(item)
+
+    # ------------- Gradebook import -------------
+
+    def on_import_gradebook(self):
+        path = filedialog.askopenfilename(
+            parent=self, title="Select a Blackboard gradebook export", filetypes=GRADEBOOK_FILETYPES
+        )
+        if not path:
+            return
+        try:
+            header = read_gradebook_header(path)
+        except Exception as e:
+            messagebox.showerror("Import failed", f"Could not read {path}:\n{e}", parent=self)
+            return
+        if not header:
+            messagebox.showinfo("Import", "The file has no header row.", parent=self)
+            return
+
+        cols = self._ask_gradebook_columns(header)
+        if cols is None:
+            return
+        try:
+            pairs = list(iter_gradebook_pairs(path, *cols))
+        except Exception as e:
+            messagebox.showerror("Import failed", f"Could not read {path}:\n{e}", parent=self)
+            return
+        if not pairs:
+            self._set_status("Gradebook contained no rows with an ID.")
             return
 
         start = self._selected_start_index()
-        self._ensure_rows(start + len(parsed))
+        with self._recording("Import Gradebook"):
+            self._write_pairs(start, pairs)
+        self._set_status(
+            f"Imported {len(pairs)} row(s) from '{Path(path).name}' starting at row {start + 1}.{self._flag_summary()}"
+        )
+
+    def _ask_gradebook_columns(self, header):
+        """Modal picker for the ID and mark columns. Returns (id_idx, mark_idx) or None."""
+        labels = [f"{i + 1}: {h}" for i, h in enumerate(header)]
+        id_idx, mark_idx = guess_columns(header)
+        result = {}
+
+        dlg = tk.Toplevel(self)
+        dlg.title("Choose gradebook columns")
+        dlg.transient(self)
+        dlg.resizable(False, False)
+        frm = ttk.Frame(dlg, padding=12)
+        frm.pack(fill="both", expand=True)
+
+        ttk.Label(frm, text="Student ID column:").grid(row=0, column=0, sticky="w", pady=2)
+        id_box = ttk.Combobox(frm, values=labels, state="readonly", width=48)
+        id_box.current(id_idx)
+        id_box.grid(row=0, column=1, sticky="ew", pady=2)
+
+        ttk.Label(frm, text="Mark column:").grid(row=1, column=0, sticky="w", pady=2)
+        mark_box = ttk.Combobox(frm, values=labels, state="readonly", width=48)
+        mark_box.current(mark_idx)
+        mark_box.grid(row=1, column=1, sticky="ew", pady=2)
+
+        def ok():
+            result["cols"] = (id_box.current(), mark_box.current())
+            dlg.destroy()
+
+        btns = ttk.Frame(frm)
+        btns.grid(row=2, column=0, columnspan=2, sticky="e", pady=(10, 0))
+        ttk.Button(btns, text="Import", command=ok).pack(side="left", padx=4)
+        ttk.Button(btns, text="Cancel", command=dlg.destroy).pack(side="left", padx=4)
+
+        dlg.grab_set()
+        self.wait_window(dlg)
+        return result.get("cols")
+
+    def _write_pairs(self, start: int, pairs):
+        """Write (id, mark) pairs from row `start`, appending rows as needed, then retag once."""
         items = self.tree.get_children()
-        for i, (sid, mk) in enumerate(parsed):
-            self.tree.set(items[start + i], "id", sid)
-            self.tree.set(items[start + i], "mark", mk)
+        affected = set()
+        rec = self._rec
+        for i, (sid, mk) in enumerate(pairs):
+            idx = start + i
+            if idx < len(items):
+                it = items[idx]
+                if rec is not None:
+                    rec.cell("id", it, self._ids.id_of(it), sid)
+                    rec.cell("mark", it, self._marks.get(it, ""), mk)
+                self.tree.item(it, values=(sid, mk))
+            else:
+                it = self.tree.insert("", "end", values=(sid, mk))
+                if rec is not None:
+                    rec.inserted(idx, it, sid, mk)
+            affected |= self._ids.set(it, sid)
+            self._stats.set(it, mk)
+            if mk:
+                self._marks[it] = mk
+            else:
+                self._marks.pop(it, None)
+        self._schedule_stats()
+        self._refresh_flags(affected)
         self._retag_rows()
-        self._set_status(f"Pasted {len(parsed)} row(s) (2-column) starting at row {start + 1}.")
+
+    # ------------- Roster -------------
+
+    def _roster_choices(self):
+        store = self.roster_source
+        if store is None or not len(store):
+            return [ROSTER_NONE]
+        return [ROSTER_NONE, ROSTER_ALL] + [f"Assessment {a}" for a in store.values("assessment") if a]
+
+    def _refresh_roster_choices(self):
+        self.roster_combo.configure(values=self._roster_choices())
+
+    def _init_roster(self):
+        choices = self._roster_choices()
+        self.roster_combo.configure(values=choices)
+        if len(choices) == 1:
+            self.roster_combo.state(["disabled"])
+            return
+        self.roster_combo.state(["!disabled"])
+        # A single assessment is the obvious roster; otherwise everyone loaded
+        self.roster_var.set(choices[2] if len(choices) == 3 else ROSTER_ALL)
+        self._apply_roster()
+
+    def _apply_roster(self):
+        choice = self.roster_var.get()
+        store = self.roster_source
+        if choice == ROSTER_NONE or store is None:
+            ids = None
+        elif choice == ROSTER_ALL:
+            ids = store.counts("student")
+        else:
+            ids = store.counts("student", assessment=choice[len("Assessment "):])
+        self._refresh_flags(self._ids.set_roster(ids))
+        if ids is None:
+            self._set_status("Roster check off.")
+        else:
+            self._set_status(
+                f"Roster: {len(ids)} student(s); {self._ids.missing_count()} missing from the grid."
+                f"{self._flag_summary()}"
+            )
+
+    def on_show_missing(self):
+        if not self._ids.has_roster():
+            self._set_status("Choose a roster first (needs OneUni rows loaded in the main window).")
+            return
+        missing = self._ids.missing_ids()
+        win = tk.Toplevel(self)
+        win.title("Missing from Grid")
+        win.transient(self)
+        win.geometry("300x420")
+        frm = ttk.Frame(win, padding=10)
+        frm.pack(fill="both", expand=True)
+        ttk.Label(frm, text=f"{len(missing)} enrolled ID(s) not in the grid ({self.roster_var.get()})").pack(anchor="w")
+        box = tk.Listbox(frm, activestyle="none")
+        box.pack(fill="both", expand=True, pady=(6, 6))
+        if missing:
+            box.insert("end", *missing)
+
+        def copy():
+            self.clipboard_clear()
+            self.clipboard_append("\n".join(missing))
+            self._set_status(f"Copied {len(missing)} missing ID(s).")
+
+        btns = ttk.Frame(frm)
+        btns.pack(fill="x")
+        ttk.Button(btns, text="Copy", command=copy).pack(side="left")
+        ttk.Button(btns, text="Close", command=win.destroy).pack(side="right")
+
+    # ------------- Statistics -------------
+
+    def on_show_stats(self):
+        if self._stats_panel is not None and self._stats_panel.winfo_exists():
+            self._stats_panel.refresh()
+            self._stats_panel.lift()
+            return
+        self._stats_panel = MarkStatsPanel(self, self._stats, title="Mark Statistics (grid)")
+
+    def _schedule_stats(self):
+        """Refresh the open panel once the current burst of edits is over."""
+        if self._stats_job is None and self._stats_panel is not None:
+            self._stats_job = self.after(STATS_DELAY_MS, self._refresh_stats)
+
+    def _refresh_stats(self):
+        self._stats_job = None
+        if self._stats_panel is not None and self._stats_panel.winfo_exists():
+            self._stats_panel.refresh()
+        else:
+            self._stats_panel = None
 
     # ------------- Grid Ops -------------
 
+    def _tag_call(self, action: str, tag: str, items=None):
+        """Batched 'tag add/remove' (Tk 8.6): one Tcl call for many items."""
+        if items is None:
+            self.tree.tk.call(self.tree, "tag", action, tag)
+        elif items:
+            self.tree.tk.call(self.tree, "tag", action, tag, tuple(items))
+
     def _retag_rows(self):
-        for i, item in enumerate(self.tree.get_children()):
-            self.tree.item(item, tags=("even" if i % 2 == 0 else "odd",))
+        """Zebra-stripe every row in four Tcl calls; validation tags are left alone."""
+        items = self.tree.get_children()
+        self._tag_call("remove", "even")
+        self._tag_call("remove", "odd")
+        self._tag_call("add", "even", items[0::2])
+        self._tag_call("add", "odd", items[1::2])
+
+    def _refresh_flags(self, items):
+        """Re-apply the dup/badid tags on the given rows only."""
+        items = [it for it in items if self.tree.exists(it)]
+        if not items:
+            return
+        ids = self._ids
+        for tag in ("dup", "badid", "notenrolled"):
+            self._tag_call("remove", tag, items)
+        self._tag_call("add", "dup", [it for it in items if ids.is_duplicate(it)])
+        self._tag_call("add", "badid", [
+            it for it in items if ids.is_malformed(it) and not ids.is_duplicate(it)
+        ])
+        if ids.has_roster():
+            self._tag_call("add", "notenrolled", [
+                it for it in items
+                if ids.is_unenrolled(it) and not ids.is_duplicate(it) and not ids.is_malformed(it)
+            ])
+
+    def _set_id(self, item, sid: str, refresh: bool = False):
+        """Write an ID cell and keep the ID index in step with it."""
+        if self._rec is not None:
+            self._rec.cell("id", item, self._ids.id_of(item), sid)
+        self.tree.set(item, "id", sid)
+        affected = self._ids.set(item, sid)
+        if refresh:
+            self._refresh_flags(affected)
+        return affected
+
+    def _set_mark(self, item, mk: str):
+        """Write a Mark cell and keep the Python-side mirror in step with it."""
+        if self._rec is not None:
+            self._rec.cell("mark", item, self._marks.get(item, ""), mk)
+        self.tree.set(item, "mark", mk)
+        self._stats.set(item, mk)
+        self._schedule_stats()
+        if mk:
+            self._marks[item] = mk
+        else:
+            self._marks.pop(item, None)
+
+    def _flag_summary(self) -> str:
+        dups = self._ids.duplicate_count()
+        bad = self._ids.malformed_count()
+        parts = []
+        if dups:
+            parts.append(f"{dups} duplicated ID(s)")
+        if bad:
+            parts.append(f"{bad} malformed ID(s)")
+        if self._ids.unenrolled_count():
+            parts.append(f"{self._ids.unenrolled_count()} not enrolled")
+        return f" Warning: {', '.join(parts)}." if parts else ""
 
     def on_delete_selected(self):
         sel = self.tree.selection()
         if not sel:
             self._set_status("No rows selected to delete.")
             return
-        for it in sel:
-            self.tree.delete(it)
+        with self._recording("Delete Rows"):
+            affected = self._remove_rows(sel)
+        self._refresh_flags(affected)
         self._retag_rows()
-        self._set_status(f"Deleted {len(sel)} row(s).")
+        self._set_status(f"Deleted {len(sel)} row(s).{self._flag_summary()}")
 
     def on_clear_grid(self):
-        for it in self.tree.get_children():
-            self.tree.delete(it)
-        self._insert_initial_rows(20)
+        with self._recording("Clear Grid"):
+            self._remove_rows(self.tree.get_children())
+            self._insert_initial_rows(20)
         self._set_status("Grid cleared.")
 
+    def on_add_rows(self):
+        with self._recording("Add Rows"):
+            self._insert_initial_rows(10)
+
+    def _remove_rows(self, items):
+        """Delete rows, keeping the ID index and marks in step. Returns affected items."""
+        if not items:
+            return set()
+        if self._rec is not None:
+            children = self.tree.get_children()
+            if len(items) == len(children):
+                indexed = enumerate(items)
+            else:
+                position = {it: i for i, it in enumerate(children)}
+                indexed = sorted((position[it], it) for it in items)
+            self._rec.deleted(
+                (idx, it, self._ids.id_of(it), self._marks.get(it, "")) for idx, it in indexed
+            )
+        affected = set()
+        for it in items:
+            affected |= self._ids.discard(it)
+            self._marks.pop(it, None)
+            self._stats.discard(it)
+        self.tree.delete(*items)
+        self._schedule_stats()
+        return affected
+
+    # ------------- Undo / Redo -------------
+
+    @contextmanager
+    def _recording(self, label: str):
+        """Collect every grid write made inside the block into one undo step."""
+        if self._rec is not None:  # nested: fold into the outer step
+            yield self._rec
+            return
+        self._finish_paste()
+        self._rec = Change(label)
+        try:
+            yield self._rec
+        finally:
+            change, self._rec = self._rec, None
+            self._history.push(change)
+
+    def on_undo(self):
+        self._destroy_editor()
+        self._finish_paste()
+        change = self._history.undo()
+        if change is None:
+            self._set_status("Nothing to undo.")
+            return
+        self._apply_change(change, undo=True)
+        self._set_status(f"Undid: {change.label}.{self._flag_summary()}")
+
+    def on_redo(self):
+        self._destroy_editor()
+        self._finish_paste()
+        change = self._history.redo()
+        if change is None:
+            self._set_status("Nothing to redo.")
+            return
+        self._apply_change(change, undo=False)
+        self._set_status(f"Redid: {change.label}.{self._flag_summary()}")
+
+    def _apply_change(self, change, undo: bool):
+        """Replay (redo) or invert (undo) a Change; cost is O(rows it touched)."""
+        affected = set()
+        for op in (reversed(change.ops) if undo else change.ops):
+            kind = op[0]
+            if kind == "cells":
+                _, col, items, olds, news = op
+                values = olds if undo else news
+                pairs = zip(reversed(items), reversed(values)) if undo else zip(items, values)
+                for it, v in pairs:
+                    if col == "id":
+                        affected |= self._set_id(it, v)
+                    else:
+                        self._set_mark(it, v)
+            elif (kind == "insert") == undo:
+                # undo an insert / redo a delete: take the rows out again
+                affected |= self._remove_rows([row[1] for row in op[1]])
+            else:
+                # undo a delete / redo an insert: put the rows back with their original iids
+                for idx, it, sid, mk in op[1]:
+                    self.tree.insert("", idx, iid=it, values=(sid, mk))
+                    affected |= self._ids.set(it, sid)
+                    if mk:
+                        self._marks[it] = mk
+                        self._stats.set(it, mk)
+        self._schedule_stats()
+        self._refresh_flags(affected)
+        self._retag_rows()
+
     # ------------- Store / Retrieve / Persist -------------
 
     def _collect_pairs_from_grid(self):
+        # Row order comes from the Treeview; values come from the Python-side model
+        self._finish_paste()
+        id_of, marks = self._ids.id_of, self._marks
         pairs = []
         for it in self.tree.get_children():
-            sid = self.tree.set(it, "id").strip()
-            mk = self.tree.set(it, "mark").strip()
+            sid = id_of(it)
             if sid:  # ignore rows without an ID
-                pairs.append((sid, mk))
+                pairs.append((sid, marks.get(it, "").strip()))
         return pairs
 
     def on_store(self):
@@ -352,21 +946,15 @@ class GridApp(tk.Tk):
                 self._set_status("Retrieve: no data found.")
                 return
         # Output ID \t mark (mark may be blank)
-        lines = [f"{sid}\t{mk}" for sid, mk in self.paired_rows]
-        self._set_output("\n".join(lines))
+        self._show_output(self.paired_rows)
         self._set_status(f"Retrieved {len(self.paired_rows)} row(s).")
 
     def on_load_from_file(self):
         if self._load_data_silent():
             # Reflect loaded data into the grid
-            for it in self.tree.get_children():
-                self.tree.delete(it)
-            self._ensure_rows(len(self.paired_rows))
-            items = self.tree.get_children()
-            for i, (sid, mk) in enumerate(self.paired_rows):
-                self.tree.set(items[i], "id", sid)
-                self.tree.set(items[i], "mark", mk)
-            self._retag_rows()
+            with self._recording("Load from File"):
+                self._remove_rows(self.tree.get_children())
+                self._write_pairs(0, self.paired_rows)
             messagebox.showinfo("Loaded", f"Loaded {len(self.paired_rows)} row(s) from '{data_file_path().name}'.")
             self._set_status(f"Loaded {len(self.paired_rows)} row(s) from file.")
         else:
@@ -428,24 +1016,70 @@ class GridApp(tk.Tk):
 
     # ------------- Output helpers -------------
 
-    def _set_output(self, text: str):
+    def _show_output(self, pairs):
+        """
+        Show pairs as 'ID<tab>Mark' lines. Text is inserted OUTPUT_CHUNK lines
+        per after() callback, so the window stays responsive while it fills.
+        """
+        self._cancel_output_feed()
+        self._output_pairs = list(pairs)
+        self._output_pos = 0
         self.output.config(state="normal")
         self.output.delete("1.0", "end")
-        if text:
-            self.output.insert("1.0", text)
         self.output.config(state="disabled")
+        if self._output_pairs:
+            self._feed_output()
+
+    def _feed_output(self):
+        self._output_job = None
+        pairs, pos = self._output_pairs, self._output_pos
+        chunk = pairs[pos:pos + OUTPUT_CHUNK]
+        text = "".join(f"{sid}\t{mk}\n" for sid, mk in chunk)
+        if pos + len(chunk) >= len(pairs):
+            text = text[:-1]  # no trailing newline after the last line
+        self.output.config(state="normal")
+        self.output.insert("end-1c", text)
+        self.output.config(state="disabled")
+        self._output_pos = pos + len(chunk)
+        if self._output_pos < len(pairs):
+            self._output_job = self.after(1, self._feed_output)
+
+    def _cancel_output_feed(self):
+        if self._output_job is not None:
+            self.after_cancel(self._output_job)
+            self._output_job = None
+
+    def _output_text(self) -> str:
+        return "\n".join(f"{sid}\t{mk}" for sid, mk in self._output_pairs)
 
     def on_copy_output(self):
-        txt = self.output.get("1.0", "end").strip("\n")
-        if not txt.strip():
+        if not self._output_pairs:
             self._set_status("Output is empty; nothing to copy.")
             return
         self.clipboard_clear()
-        self.clipboard_append(txt)
-        self._set_status("Output copied to clipboard.")
+        self.clipboard_append(self._output_text())
+        self._set_status(f"Copied {len(self._output_pairs)} row(s) to the clipboard.")
+
+    def on_save_output(self):
+        if not self._output_pairs:
+            self._set_status("Output is empty; nothing to save.")
+            return
+        path = filedialog.asksaveasfilename(
+            title="Save output", parent=self, defaultextension=".txt",
+            filetypes=[("Tab-separated text", "*.txt *.tsv"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(self._output_text() + "\n")
+        except OSError as e:
+            messagebox.showerror("Save failed", str(e))
+            return
+        self._set_status(f"Saved {len(self._output_pairs)} row(s) to {Path(path).name}.")
 
     def on_clear_output(self):
-        self._set_output("")
+        self._show_output([])
         self._set_status("Output cleared.")
 
     def _set_status(self, msg: str):
@@ -460,8 +1094,11 @@ def run_gui_ids_marks():
     except Exception:
         pass
 
-    app = GridApp()
-    app.mainloop()
+    root = tk.Tk()
+    root.withdraw()
+    app = GridApp(root)
+    app.protocol("WM_DELETE_WINDOW", root.destroy)
+    root.mainloop()
 
 if __name__ == "__main__":
     run_gui_ids_marks()
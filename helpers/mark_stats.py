@@ -0,0 +1,217 @@
+# helpers/mark_stats.py
+"""
+Mark statistics for the grid: summary figures, grade-band counts and a
+10-mark histogram, plus a small Toplevel that shows them.
+
+MarkStats mirrors the grid's Mark column as numbers (updated per edit, like
+IdIndex does for IDs), and computes everything from one array when asked.
+With NumPy installed that is a single vectorised pass; without it the same
+figures come from plain Python, just more slowly on very large grids.
+Results are cached until the next edit.
+"""
+import math
+import tkinter as tk
+from tkinter import ttk
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python fallback below
+    np = None
+
+PASS_MARK = 50
+# (band, lowest mark); a mark falls in the first band whose lower bound it reaches
+GRADE_BANDS = [("HD", 80), ("D", 70), ("C", 60), ("P", 50), ("N", None)]
+# Histogram bins: 0-9, 10-19, ..., 90-100 (100 counts in the top bin)
+HIST_BINS = 10
+
+
+def parse_mark(mk):
+    """'72.5' -> 72.5; blank or non-numeric -> None."""
+    try:
+        value = float(mk)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _band_index(value):
+    for i, (_, low) in enumerate(GRADE_BANDS):
+        if low is None or value >= low:
+            return i
+    return len(GRADE_BANDS) - 1
+
+
+class MarkStats:
+    def __init__(self):
+        self._values = {}    # key (grid item) -> numeric mark
+        self._other = set()  # keys holding a non-numeric mark (e.g. "AF")
+        self._cache = None
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        stats = cls()
+        for i, (_, mk) in enumerate(pairs):
+            stats.set(i, mk)
+        return stats
+
+    # ---------------- Updates ----------------
+    def set(self, key, mk):
+        """Record the mark now held by `key` (blank clears)."""
+        mk = (mk or "").strip()
+        value = parse_mark(mk)
+        self._cache = None
+        if value is not None:
+            self._values[key] = value
+            self._other.discard(key)
+        else:
+            self._values.pop(key, None)
+            if mk:
+                self._other.add(key)
+            else:
+                self._other.discard(key)
+
+    def discard(self, key):
+        self._cache = None
+        self._values.pop(key, None)
+        self._other.discard(key)
+
+    def clear(self):
+        self._cache = None
+        self._values.clear()
+        self._other.clear()
+
+    # ---------------- Results ----------------
+    def summary(self):
+        """
+        dict with count, non_numeric, mean, std (sample), median, min, max,
+        fail_rate, bands {band: count} and histogram [count per 10 marks].
+        Figures are None when there are no numeric marks.
+        """
+        if self._cache is None:
+            values = self._values.values()
+            self._cache = self._summary_numpy(values) if np is not None else self._summary_python(values)
+            self._cache["non_numeric"] = len(self._other)
+        return self._cache
+
+    @staticmethod
+    def _empty():
+        return {
+            "count": 0, "mean": None, "std": None, "median": None, "min": None, "max": None,
+            "fail_rate": None, "bands": {b: 0 for b, _ in GRADE_BANDS}, "histogram": [0] * HIST_BINS,
+        }
+
+    def _summary_numpy(self, values):
+        n = len(values)
+        if not n:
+            return self._empty()
+        arr = np.fromiter(values, dtype=float, count=n)
+        # Band lower bounds ascending (P, C, D, HD): searchsorted gives 0 = N .. 4 = HD
+        lows = np.array([low for _, low in reversed(GRADE_BANDS) if low is not None], dtype=float)
+        band_counts = np.bincount(np.searchsorted(lows, arr, side="right"), minlength=len(GRADE_BANDS))
+        bins = np.clip((arr // (100 / HIST_BINS)).astype(int), 0, HIST_BINS - 1)
+        return {
+            "count": n,
+            "mean": float(arr.mean()),
+            "std": float(arr.std(ddof=1)) if n > 1 else 0.0,
+            "median": float(np.median(arr)),
+            "min": float(arr.min()),
+            "max": float(arr.max()),
+            "fail_rate": float((arr < PASS_MARK).mean()),
+            "bands": {band: int(c) for (band, _), c in zip(GRADE_BANDS, band_counts[::-1])},
+            "histogram": np.bincount(bins, minlength=HIST_BINS).tolist(),
+        }
+
+    def _summary_python(self, values):
+        arr = sorted(values)
+        n = len(arr)
+        if not n:
+            return self._empty()
+        mean = sum(arr) / n
+        bands = [0] * len(GRADE_BANDS)
+        hist = [0] * HIST_BINS
+        fails = 0
+        width = 100 / HIST_BINS
+        for v in arr:
+            bands[_band_index(v)] += 1
+            hist[min(max(int(v // width), 0), HIST_BINS - 1)] += 1
+            if v < PASS_MARK:
+                fails += 1
+        mid = n // 2
+        return {
+            "count": n,
+            "mean": mean,
+            "std": math.sqrt(sum((v - mean) ** 2 for v in arr) / (n - 1)) if n > 1 else 0.0,
+            "median": arr[mid] if n % 2 else (arr[mid - 1] + arr[mid]) / 2,
+            "min": arr[0],
+            "max": arr[-1],
+            "fail_rate": fails / n,
+            "bands": {band: c for (band, _), c in zip(GRADE_BANDS, bands)},
+            "histogram": hist,
+        }
+
+
+def format_summary_line(s) -> str:
+    """One-line summary for a status bar."""
+    if not s["count"]:
+        return "No numeric marks."
+    return (f"{s['count']} mark(s): mean {s['mean']:.1f}, median {s['median']:.1f}, "
+            f"fail {s['fail_rate']:.0%}")
+
+
+class MarkStatsPanel(tk.Toplevel):
+    """Shows a MarkStats; call refresh() after the marks change."""
+
+    def __init__(self, master, stats: MarkStats, title="Mark Statistics"):
+        super().__init__(master)
+        self.title(title)
+        self.geometry("420x420")
+        self.minsize(360, 360)
+        self.stats = stats
+
+        root = ttk.Frame(self, padding=10)
+        root.pack(fill="both", expand=True)
+        self.figures_var = tk.StringVar()
+        ttk.Label(root, textvariable=self.figures_var, justify="left", font=("Consolas", 10)).pack(anchor="w")
+        self.canvas = tk.Canvas(root, height=200, bg="white", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True, pady=(8, 0))
+        self.canvas.bind("<Configure>", lambda e: self._draw_histogram())
+        if np is None:
+            ttk.Label(root, text="(Install NumPy for faster statistics on large grids.)").pack(anchor="w", pady=(6, 0))
+        self.refresh()
+
+    def refresh(self):
+        s = self.stats.summary()
+        if s["count"]:
+            lines = [
+                f"Marks:     {s['count']}" + (f"  (+{s['non_numeric']} non-numeric)" if s["non_numeric"] else ""),
+                f"Mean:      {s['mean']:.2f}   SD {s['std']:.2f}",
+                f"Median:    {s['median']:.2f}",
+                f"Range:     {s['min']:g} - {s['max']:g}",
+                f"Fail rate: {s['fail_rate']:.1%}  (< {PASS_MARK})",
+                "Bands:     " + "  ".join(f"{b} {c}" for b, c in s["bands"].items()),
+            ]
+        else:
+            lines = ["No numeric marks yet."]
+        self.figures_var.set("\n".join(lines))
+        self._draw_histogram()
+
+    def _draw_histogram(self):
+        c = self.canvas
+        c.delete("all")
+        hist = self.stats.summary()["histogram"]
+        w, h = c.winfo_width(), c.winfo_height()
+        if w <= 1 or h <= 1:
+            return
+        top = max(hist) or 1
+        pad, label_h = 6, 16
+        bar_w = (w - 2 * pad) / HIST_BINS
+        step = 100 // HIST_BINS
+        for i, count in enumerate(hist):
+            x0 = pad + i * bar_w
+            bar_h = (h - 2 * label_h - pad) * count / top
+            y1 = h - label_h
+            fill = "#e8a0a0" if (i + 1) * step <= PASS_MARK else "#8fb8de"
+            c.create_rectangle(x0 + 2, y1 - bar_h, x0 + bar_w - 2, y1, fill=fill, outline="")
+            c.create_text(x0 + bar_w / 2, y1 + label_h / 2, text=str(i * step), font=("Segoe UI", 8))
+            if count:
+                c.create_text(x0 + bar_w / 2, y1 - bar_h - 7, text=str(count), font=("Segoe UI", 8))
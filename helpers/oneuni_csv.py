@@ -0,0 +1,131 @@
+# helpers/oneuni_csv.py
+"""
+OneUni CSV parsing shared by the drag-and-drop window, the exporters and the
+benchmarks. Kept free of any GUI imports so it can be used headless.
+
+Inputs may be plain .csv files, gzip-compressed .csv.gz files or .zip
+archives (every .csv member is read). Compressed inputs are decompressed
+as a stream straight into the parser; nothing is unpacked to disk.
+"""
+import csv
+import gzip
+import io
+import zipfile
+from contextlib import closing
+from pathlib import Path
+
+from helpers.timing import span
+
+# --- Fields map retained from your existing script ---
+CSV_FIELD_MAP = {
+    0: "LineType",
+    1: "StudentStudyItemAssessmentCurriculumItemCode",
+    2: "StudentStudyItemAssessmentCurriculumItemVersionNumber",
+    3: "StudentStudyItemAssessmentCurriculumItemFullTitle",
+    4: "StudentStudyItemAssessmentDeliveryYear",
+    5: "StudentStudyItemAssessmentDeliveryStudyPeriodCode",
+    6: "StudentStudyItemAssessmentDeliveryStudyPeriodDescription",
+    7: "StudentStudyItemAssessmentDeliveryLocationCode",
+    8: "StudentStudyItemAssessmentDeliveryLocationDescription",
+    9: "StudentStudyItemAssessmentDeliveryNumber",
+    10: "StudentStudyItemAssessmentStudentID",
+    11: "StudentStudyItemAssessmentStudentStudyItemAttemptNumber",
+    12: "StudentStudyItemAssessmentID",
+    13: "StudentStudyItemAssessmentTypeDescription",
+    14: "StudentStudyItemAssessmentDescription",
+    15: "StudentStudyItemAssessmentBarcode",
+}
+
+SSPASSESS = "SSPASSESS"
+
+# Accepted input suffixes (".csv.gz" ends in ".gz")
+ONEUNI_SUFFIXES = (".csv", ".gz", ".zip")
+ONEUNI_FILETYPES = [
+    ("OneUni exports", "*.csv *.csv.gz *.gz *.zip"),
+    ("CSV files", "*.csv"),
+    ("All files", "*.*"),
+]
+
+
+def is_oneuni_file(path) -> bool:
+    return Path(path).suffix.lower() in ONEUNI_SUFFIXES
+
+
+def _zip_csv_members(zf: zipfile.ZipFile):
+    return [
+        info.filename for info in zf.infolist()
+        if not info.is_dir()
+        and info.filename.lower().endswith(".csv")
+        and not info.filename.startswith("__MACOSX/")
+    ]
+
+
+def _iter_csv_streams(path: Path):
+    """
+    Yield (name, text stream) for each CSV in `path`, one at a time: a zip
+    member is only open until the next one is requested. Wrap the generator
+    in contextlib.closing() when the caller may stop early.
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".zip":
+        with zipfile.ZipFile(path) as zf:
+            names = _zip_csv_members(zf)
+            if not names:
+                raise ValueError(f"No .csv files inside {path.name}")
+            for name in names:
+                with io.TextIOWrapper(zf.open(name), encoding="utf-8-sig", newline="") as f:
+                    yield name, f
+    elif suffix == ".gz":
+        with gzip.open(path, "rt", encoding="utf-8-sig", newline="") as f:
+            yield path.name, f
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            yield path.name, f
+
+
+def _parse_sspassess(f):
+    for raw in csv.reader(f):
+        if not raw:
+            continue
+        if raw[0].strip().upper() != SSPASSESS:
+            continue
+        # map fields using CSV_FIELD_MAP; ignore missing indices safely
+        yield {
+            CSV_FIELD_MAP[i]: (raw[i].strip() if i < len(raw) else "")
+            for i in CSV_FIELD_MAP
+        }
+
+
+def has_sspassess(path) -> bool:
+    """
+    True if any record's first field (as read by csv, so quoted
+    "SSPASSESS" counts) is SSPASSESS. Stops at the first one found, so a
+    preamble of any length is fine.
+    """
+    with closing(_iter_csv_streams(Path(path))) as streams:
+        for _, f in streams:
+            for raw in csv.reader(f):
+                if raw and raw[0].strip().upper() == SSPASSESS:
+                    return True
+    return False
+
+
+def iter_sspassess_rows(csv_path: Path):
+    """
+    Yield the rows whose first column is exactly 'SSPASSESS' as they are
+    parsed, as dicts keyed by CSV_FIELD_MAP. `csv_path` may be a .csv,
+    .csv.gz or .zip (all CSV members, in archive order).
+    """
+    csv_path = Path(csv_path)
+    with span("extract_sspassess_rows", file=csv_path.name) as info:
+        info["members"] = info["rows"] = 0
+        for _, f in _iter_csv_streams(csv_path):
+            info["members"] += 1
+            for row in _parse_sspassess(f):
+                info["rows"] += 1
+                yield row
+
+
+def extract_sspassess_rows(csv_path: Path):
+    """All of iter_sspassess_rows() as a list[dict]."""
+    return list(iter_sspassess_rows(csv_path))
@@ -0,0 +1,335 @@
+# helpers/oneuni_index.py
+"""
+SSPASSESS rows plus secondary indexes by unit, assessment and student.
+
+The indexes map each value to the ascending list of row positions holding it,
+so filtered selections and summary counts never scan the whole row list.
+Rows are appended incrementally as they arrive from DnDApp.
+
+With a memory budget, the rows themselves move to a temporary SQLite file
+(helpers/spill_store.py) once their estimated size passes the budget; the
+indexes stay in memory. Callers keep using `rows`, select() and partition()
+as before; spilled rows are read back in batches.
+"""
+import sys
+import weakref
+from itertools import islice
+
+from helpers.spill_store import FETCH_BATCH, SpilledRows
+
+# Row fields the store indexes (and the exporters group by); kept here so the
+# store stays free of the openpyxl/Tk imports of export_oneuni
+UNIT_KEY = "StudentStudyItemAssessmentCurriculumItemCode"
+ASSESSMENT_KEY = "StudentStudyItemAssessmentID"
+STUDENT_KEY = "StudentStudyItemAssessmentStudentID"
+ATTEMPT_KEY = "StudentStudyItemAssessmentStudentStudyItemAttemptNumber"
+# Row key holding the mark in rows joined from the wide grid (see wide_marks.py)
+MARK_KEY = "Mark"
+
+# Query keyword -> indexed row field
+FILTER_FIELDS = {
+    "unit": UNIT_KEY,
+    "assessment": ASSESSMENT_KEY,
+    "student": STUDENT_KEY,
+}
+
+# Default for the "Memory budget (MB)" setting; None/0 means never spill
+DEFAULT_MEMORY_BUDGET_MB = 512
+# Rows sampled to estimate the in-memory size of one row
+SIZE_SAMPLE = 200
+
+
+def estimate_row_bytes(rows) -> int:
+    """Rough in-memory size of one row dict (dict plus its key/value strings)."""
+    sample = rows[:SIZE_SAMPLE]
+    if not sample:
+        return 0
+    total = sum(sys.getsizeof(r) + sum(sys.getsizeof(v) for v in r.values()) for r in sample)
+    return total // len(sample)
+
+
+class OneUniRowStore:
+    def __init__(self, rows=None, memory_budget_mb=None):
+        self.rows = []
+        self.memory_budget_mb = memory_budget_mb
+        self._row_bytes = 0  # estimated size of one row, from the first rows seen
+        self._index = {field: {} for field in FILTER_FIELDS.values()}
+        # Bumped whenever rows are replaced rather than appended
+        self.generation = 0
+        # (store, its generation, its length) last sync()ed from, while we only appended since
+        self._synced = None
+        if rows:
+            self.extend(rows)
+
+    @property
+    def spilled(self) -> bool:
+        return isinstance(self.rows, SpilledRows)
+
+    # ---------------- Loading ----------------
+    def extend(self, rows):
+        """
+        Append rows and index them. Cost is proportional to the new rows only.
+        The memory budget is checked afterwards, so feed large or streamed
+        inputs through extend_batched().
+        """
+        base = len(self.rows)
+        indexes = [(field, self._index[field]) for field in FILTER_FIELDS.values()]
+
+        def indexed():
+            # Index each row on its way into the list / spill file (`rows` may be a generator)
+            for pos, row in enumerate(rows, base):
+                for field, index in indexes:
+                    index.setdefault(row.get(field, ""), []).append(pos)
+                yield row
+
+        if self.spilled and not self.rows.owner:
+            self._spill()  # read-only rows shared with another store: copy first
+        self.rows.extend(indexed())
+        if not self.spilled and self.memory_budget_mb:
+            if not self._row_bytes:
+                self._row_bytes = estimate_row_bytes(self.rows)
+            if len(self.rows) * self._row_bytes > self.memory_budget_mb * 1024 * 1024:
+                self._spill()
+
+    def _spill(self):
+        """Move the rows (a list, or spilled rows we may not append to) to a new spill file."""
+        spilled = SpilledRows()
+        rows = self.rows
+        for start in range(0, len(rows), FETCH_BATCH):
+            spilled.extend(rows[start:start + FETCH_BATCH])
+        self.rows = spilled
+
+    def extend_batched(self, rows, batch=FETCH_BATCH):
+        """
+        extend() from a (possibly streamed) iterable `batch` rows at a time,
+        checking the memory budget after each batch: a large file being
+        parsed goes to the spill file as it arrives, not after it is all in memory.
+        """
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, batch))
+            if not chunk:
+                break
+            self.extend(chunk)
+
+    def truncate(self, count):
+        """Keep only the first `count` rows (e.g. to drop a file that failed half-way)."""
+        if count < len(self.rows):
+            self._rebuild(islice(iter(self.rows), count))
+
+    def _rebuild(self, rows):
+        """Replace the contents with the (possibly streamed) iterable `rows`."""
+        self.clear()
+        self.extend_batched(rows)
+
+    def sync(self, rows):
+        """
+        Make the store hold exactly `rows`. DnDApp re-sends its whole
+        accumulator on each 'Send to Main'; when that is our rows plus new
+        ones, only the new tail is indexed.
+
+        `rows` may be another store (DnDApp's): if its rows have spilled to
+        disk, we share a read-only handle on its file and copy its indexes.
+        Otherwise, if neither store has been rewritten since the last sync
+        from it, we copy just its new rows, whether or not ours are in
+        memory. A plain list continues ours when it holds the same dict
+        objects.
+        """
+        if isinstance(rows, OneUniRowStore):
+            self._sync_store(rows)
+            return
+        n = len(self.rows)
+        if rows is self.rows:
+            return
+        if n and len(rows) >= n and rows[0] is self.rows[0] and rows[n - 1] is self.rows[n - 1]:
+            self.extend(rows[n:])
+        else:
+            self._rebuild(rows)
+
+    def _sync_store(self, source: "OneUniRowStore"):
+        synced = self._synced
+        continues = (
+            synced is not None
+            and synced[0]() is source
+            and synced[1] == source.generation
+            and synced[2] == len(self.rows) <= len(source)
+        )
+        if source.spilled:
+            self.adopt(source.snapshot())
+        elif continues:
+            self.extend(source.rows[len(self.rows):])  # an in-memory list: only the tail is copied
+        else:
+            self._rebuild(source.rows)
+        self._synced = (weakref.ref(source), source.generation, len(self.rows))
+
+    def adopt(self, other: "OneUniRowStore"):
+        """Take over another store's rows and indexes as they are (e.g. one built on a worker thread)."""
+        self.rows = other.rows
+        self._index = other._index
+        self._row_bytes = other._row_bytes
+        self.generation += 1
+        self._synced = None
+
+    def frozen_rows(self):
+        """
+        The rows as they are now, unaffected by later changes to the store:
+        a frozen() handle when spilled, else a new list of the same dicts.
+        """
+        return self.rows.frozen() if self.spilled else list(self.rows)
+
+    def snapshot(self) -> "OneUniRowStore":
+        """
+        A read-only copy for another thread (e.g. an export) to query while
+        this store keeps loading. Rows are shared (frozen_rows()); only the
+        indexes are copied.
+        """
+        copy = OneUniRowStore(memory_budget_mb=self.memory_budget_mb)
+        copy.rows = self.frozen_rows()
+        copy._row_bytes = self._row_bytes
+        copy._index = {
+            field: {v: list(plist) for v, plist in index.items()} for field, index in self._index.items()
+        }
+        return copy
+
+    def upsert(self, rows):
+        """
+        Merge rows from another extract: rows with the same student,
+        assessment and attempt replace the ones held; the rest are appended.
+        With no overlap only the new rows are indexed.
+        """
+        def key(r):
+            return r.get(STUDENT_KEY, ""), r.get(ASSESSMENT_KEY, ""), r.get(ATTEMPT_KEY, "")
+
+        incoming = {key(r) for r in rows}
+        students = self._index[STUDENT_KEY]
+        if not any(k[0] in students for k in incoming):
+            self.extend(rows)
+            return
+        old = self.rows
+        self._rebuild(r for part in ((r for r in old if key(r) not in incoming), rows) for r in part)
+
+    def clear(self):
+        # A spilled file is deleted once nothing (e.g. a running export) references it
+        self.rows = []
+        self._index = {field: {} for field in FILTER_FIELDS.values()}
+        self.generation += 1
+        self._synced = None
+
+    # ---------------- Queries ----------------
+    def _postings(self, filters):
+        lists = []
+        for name, value in filters.items():
+            if value in (None, ""):
+                continue
+            if name not in FILTER_FIELDS:
+                raise TypeError(f"Unknown filter {name!r}; expected one of {sorted(FILTER_FIELDS)}")
+            lists.append(self._index[FILTER_FIELDS[name]].get(value, []))
+        return lists
+
+    def positions(self, student_prefix=None, **filters):
+        """
+        Ascending row positions matching every given filter
+        (unit=..., assessment=..., student=...), optionally restricted to
+        student IDs starting with `student_prefix`. No filters -> all rows.
+        """
+        lists = self._postings(filters)
+        if student_prefix:
+            students = self._index[STUDENT_KEY]
+            merged = [
+                p for sid, plist in students.items() if sid.startswith(student_prefix) for p in plist
+            ]
+            merged.sort()
+            lists.append(merged)
+        if not lists:
+            return range(len(self.rows))
+        lists.sort(key=len)
+        result = lists[0]
+        for other in lists[1:]:
+            if not result:
+                break
+            keep = set(other)
+            result = [p for p in result if p in keep]
+        return result
+
+    def take(self, positions):
+        """Row dicts at the given positions, as a list."""
+        if self.spilled:
+            return self.rows.take(positions)
+        rows = self.rows
+        return [rows[p] for p in positions]
+
+    def view(self, positions):
+        """
+        Rows at `positions` as a sequence for the exporters: a plain list in
+        memory, or a lazy RowsView over the spill file.
+        """
+        return self.rows.view(positions) if self.spilled else self.take(positions)
+
+    def select(self, **filters):
+        """Rows (dicts, in load order) matching the filters."""
+        return self.take(self.positions(**filters))
+
+    def count(self, **filters) -> int:
+        lists = self._postings(filters)
+        if len(lists) == 1:
+            return len(lists[0])
+        return len(self.positions(**filters))
+
+    def values(self, name):
+        """Sorted distinct values of an indexed field ('unit', 'assessment' or 'student')."""
+        return sorted(self._index[FILTER_FIELDS[name]])
+
+    def counts(self, name, **filters):
+        """{value: row count} for an indexed field, within the optional filters."""
+        field = FILTER_FIELDS[name]
+        if not any(v not in (None, "") for v in filters.values()):
+            return {v: len(p) for v, p in self._index[field].items()}
+        keep = set(self.positions(**filters))
+        out = {}
+        for v, plist in self._index[field].items():
+            n = sum(1 for p in plist if p in keep)
+            if n:
+                out[v] = n
+        return out
+
+    def distinct_count(self, name, **filters) -> int:
+        """e.g. distinct_count('student', assessment='X') -> students in assessment X."""
+        return len(self.counts(name, **filters))
+
+    def partition(self, names):
+        """
+        {(value, ...): rows} grouped by the given field names, in load order,
+        built from the indexes alone (no row is read). Each group is a
+        view() of its rows. Used for per-unit / per-assessment exports.
+        """
+        first, rest = names[0], names[1:]
+        value_at = [
+            {p: v for v, plist in self._index[FILTER_FIELDS[n]].items() for p in plist} for n in rest
+        ]
+        groups = {}
+        for value, plist in self._index[FILTER_FIELDS[first]].items():
+            if not rest:
+                groups[(value,)] = plist
+                continue
+            for p in plist:
+                key = (value,) + tuple(m[p] for m in value_at)
+                groups.setdefault(key, []).append(p)
+        return {key: self.view(plist) for key, plist in groups.items()}
+
+    def summary(self):
+        return {
+            "rows": len(self.rows),
+            "units": len(self._index[UNIT_KEY]),
+            "assessments": len(self._index[ASSESSMENT_KEY]),
+            "students": len(self._index[STUDENT_KEY]),
+        }
+
+    # ---------------- Sequence protocol ----------------
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __getitem__(self, i):
+        return self.rows[i]
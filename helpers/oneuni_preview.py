@@ -0,0 +1,237 @@
+# helpers/oneuni_preview.py
+"""
+Virtualized preview of SSPASSESS rows.
+
+Only one screenful of Treeview items exists at any time; scrolling just
+rewrites their values from the underlying list, so hundreds of thousands of
+rows open instantly. Filtering by unit, assessment and student ID builds a
+list of matching row indices and the view pages over that; when given a
+OneUniRowStore the indices come from its secondary indexes.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+from helpers.oneuni_index import ASSESSMENT_KEY, STUDENT_KEY, UNIT_KEY
+
+# (row key, heading, width)
+PREVIEW_COLUMNS = [
+    (STUDENT_KEY, "Student ID", 100),
+    (UNIT_KEY, "Unit", 90),
+    ("StudentStudyItemAssessmentCurriculumItemVersionNumber", "Ver", 40),
+    (ASSESSMENT_KEY, "Assessment ID", 120),
+    ("StudentStudyItemAssessmentTypeDescription", "Type", 110),
+    ("StudentStudyItemAssessmentDescription", "Description", 220),
+    ("StudentStudyItemAssessmentDeliveryYear", "Year", 50),
+    ("StudentStudyItemAssessmentDeliveryStudyPeriodCode", "Period", 60),
+    ("StudentStudyItemAssessmentDeliveryLocationCode", "Location", 70),
+    ("StudentStudyItemAssessmentStudentStudyItemAttemptNumber", "Attempt", 60),
+]
+
+ALL = "(all)"
+FILTER_DELAY_MS = 150
+
+
+class OneUniPreview(tk.Toplevel):
+    def __init__(self, master, rows, title="OneUni Rows Preview", on_export=None):
+        """
+        rows: list[dict] or OneUniRowStore. If `on_export` is given, an
+        'Export Filtered…' button calls on_export(rows, description) with the
+        rows currently matching the filters.
+        """
+        super().__init__(master)
+        self.title(title)
+        self.geometry("980x560")
+        self.minsize(600, 300)
+
+        self.rows = rows
+        self._view = range(len(rows))  # indices into self.rows that pass the filters
+        self._top = 0                   # first visible position in self._view
+        self._slots = []                # the only Treeview items that ever exist
+        self._filter_job = None
+        self._on_export = on_export
+
+        self._build_ui()
+        self._apply_filter()
+
+    # ---------------------- UI ----------------------
+    def _build_ui(self):
+        root = ttk.Frame(self, padding=10)
+        root.pack(fill="both", expand=True)
+
+        bar = ttk.Frame(root)
+        bar.pack(fill="x", pady=(0, 8))
+        self.unit_var = tk.StringVar(value=ALL)
+        self.assess_var = tk.StringVar(value=ALL)
+        self.sid_var = tk.StringVar()
+
+        if hasattr(self.rows, "values"):
+            units, assessments = self.rows.values("unit"), self.rows.values("assessment")
+        else:
+            units = sorted({r.get(UNIT_KEY, "") for r in self.rows})
+            assessments = sorted({r.get(ASSESSMENT_KEY, "") for r in self.rows})
+
+        ttk.Label(bar, text="Unit:").pack(side="left")
+        ttk.Combobox(bar, textvariable=self.unit_var, values=[ALL] + units, width=14).pack(side="left", padx=(4, 12))
+        ttk.Label(bar, text="Assessment:").pack(side="left")
+        ttk.Combobox(bar, textvariable=self.assess_var, values=[ALL] + assessments, width=18).pack(side="left", padx=(4, 12))
+        ttk.Label(bar, text="Student ID starts with:").pack(side="left")
+        ttk.Entry(bar, textvariable=self.sid_var, width=14).pack(side="left", padx=(4, 12))
+        ttk.Button(bar, text="Reset", command=self._reset_filters).pack(side="left")
+        if self._on_export is not None:
+            ttk.Button(bar, text="Export Filtered…", command=self._export_filtered).pack(side="right")
+
+        for var in (self.unit_var, self.assess_var, self.sid_var):
+            var.trace_add("write", lambda *_: self._schedule_filter())
+
+        table = ttk.Frame(root)
+        table.pack(fill="both", expand=True)
+        keys = [k for k, _, _ in PREVIEW_COLUMNS]
+        self.tree = ttk.Treeview(table, columns=keys, show="headings", selectmode="browse")
+        for key, heading, width in PREVIEW_COLUMNS:
+            self.tree.heading(key, text=heading)
+            self.tree.column(key, width=width, anchor="w", stretch=(key == "StudentStudyItemAssessmentDescription"))
+        self.vsb = ttk.Scrollbar(table, orient="vertical", command=self._on_scrollbar)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.vsb.grid(row=0, column=1, sticky="ns")
+        table.rowconfigure(0, weight=1)
+        table.columnconfigure(0, weight=1)
+
+        self.tree.bind("<Configure>", lambda e: self._resize_slots())
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        for key, delta in (("<Prior>", "-page"), ("<Next>", "page"), ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(key, lambda e, d=delta: self._on_key_scroll(d))
+
+        self.status_var = tk.StringVar()
+        ttk.Label(root, textvariable=self.status_var, anchor="w").pack(fill="x", pady=(6, 0))
+
+    # ---------------------- Filtering ----------------------
+    def _reset_filters(self):
+        self.unit_var.set(ALL)
+        self.assess_var.set(ALL)
+        self.sid_var.set("")
+
+    def _schedule_filter(self):
+        # Debounce: typing a student ID should not refilter on every keystroke
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(FILTER_DELAY_MS, self._apply_filter)
+
+    def _filter_values(self):
+        unit = self.unit_var.get().strip()
+        assess = self.assess_var.get().strip()
+        return (
+            "" if unit == ALL else unit,
+            "" if assess == ALL else assess,
+            self.sid_var.get().strip(),
+        )
+
+    def _matching_indices(self, unit, assess, sid):
+        rows = self.rows
+        if not (unit or assess or sid):
+            return range(len(rows))
+        if hasattr(rows, "positions"):
+            return rows.positions(unit=unit, assessment=assess, student_prefix=sid)
+        return [
+            i for i, r in enumerate(rows)
+            if (not unit or r.get(UNIT_KEY) == unit)
+            and (not assess or r.get(ASSESSMENT_KEY) == assess)
+            and (not sid or r.get(STUDENT_KEY, "").startswith(sid))
+        ]
+
+    def _export_filtered(self):
+        unit, assess, sid = self._filter_values()
+        parts = [f"unit {unit}" if unit else "", f"assessment {assess}" if assess else "",
+                 f"student IDs starting {sid}" if sid else ""]
+        description = ", ".join(p for p in parts if p) or "all rows"
+        if hasattr(self.rows, "view"):
+            # A store may have spilled its rows to disk: hand over a lazy view
+            self._on_export(self.rows.view(self._view), description)
+        else:
+            self._on_export([self.rows[i] for i in self._view], description)
+
+    def _apply_filter(self):
+        self._filter_job = None
+        self._view = self._matching_indices(*self._filter_values())
+        self._top = 0
+        self._render()
+
+    # ---------------------- Virtual scrolling ----------------------
+    def _page_size(self) -> int:
+        style = ttk.Style(self)
+        try:
+            rowheight = int(style.lookup("Treeview", "rowheight") or 20)
+        except (tk.TclError, ValueError):
+            rowheight = 20
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return 25
+        return max(1, (height - rowheight) // rowheight)  # minus the heading row
+
+    def _resize_slots(self):
+        want = self._page_size()
+        while len(self._slots) < want:
+            self._slots.append(self.tree.insert("", "end", values=()))
+        if len(self._slots) > want:
+            self.tree.delete(*self._slots[want:])
+            del self._slots[want:]
+        self._render()
+
+    def _clamp_top(self, top: int) -> int:
+        return max(0, min(top, len(self._view) - len(self._slots)))
+
+    def _render(self):
+        if not self._slots:
+            self._resize_slots()
+            return
+        self._top = self._clamp_top(self._top)
+        rows, view, keys = self.rows, self._view, [k for k, _, _ in PREVIEW_COLUMNS]
+        visible = view[self._top:self._top + len(self._slots)]
+        # One batched read per screen (matters when the store has spilled to disk)
+        page = rows.take(visible) if hasattr(rows, "take") else [rows[i] for i in visible]
+        for offset, iid in enumerate(self._slots):
+            if offset < len(page):
+                row = page[offset]
+                self.tree.item(iid, values=[row.get(k, "") for k in keys])
+            else:
+                self.tree.item(iid, values=())
+
+        total = len(view)
+        if total:
+            first = self._top / total
+            last = min(1.0, (self._top + len(self._slots)) / total)
+            self.vsb.set(first, last)
+            shown = f"{self._top + 1:,}-{min(total, self._top + len(self._slots)):,} of {total:,} matching"
+        else:
+            self.vsb.set(0, 1)
+            shown = "No matching rows"
+        self.status_var.set(f"{shown} ({len(rows):,} SSPASSESS rows loaded)")
+
+    def _scroll_by(self, n: int):
+        self._top = self._clamp_top(self._top + n)
+        self._render()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._top = self._clamp_top(int(float(amount) * len(self._view)))
+            self._render()
+        elif action == "scroll":
+            step = len(self._slots) if unit == "pages" else 1
+            self._scroll_by(int(amount) * step)
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120; macOS reports small deltas
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self._scroll_by(-3 * delta)
+        return "break"
+
+    def _on_key_scroll(self, what):
+        if what == "home":
+            self._top = 0
+        elif what == "end":
+            self._top = len(self._view)
+        else:
+            self._top += len(self._slots) * (-1 if what == "-page" else 1)
+        self._render()
+        return "break"
@@ -0,0 +1,326 @@
+# helpers/session_snapshot.py
+"""
+Binary session snapshot for MinimalApp: the OneUni rows, the (id, mark)
+pairs and the last export targets, so a restart picks up where it left off.
+
+The file lives in the per-user data directory (app_settings.user_data_dir()),
+not in the source tree. Layout (all lengths big-endian):
+
+    MAGIC | u32 meta length | meta | u64 pairs length | pairs | u64 rows length | rows
+
+Meta and pairs are zlib-compressed JSON. Rows are dictionary-encoded column
+by column in CSV_FIELD_MAP order (see RowEncoder) and stored zlib-compressed
+as a JSON header (row count, each column's distinct values) followed by each
+column's codes as raw uint32s. Nothing in the file is executed on load. The
+meta block is tiny, so `read_snapshot()` returns it together with the pairs
+and leaves the rows on disk until `Snapshot.load_rows()` is called. Problems
+reading or writing are recorded with timing.note() for the diagnostics window.
+
+Encoding, writing and decoding the rows can take seconds for large extracts,
+so MinimalApp runs them on worker threads: SnapshotWriter.save_async() hands
+a save to the writer's own thread and load_rows() is called off the Tk thread.
+"""
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+from helpers.app_settings import user_data_dir
+from helpers.oneuni_csv import CSV_FIELD_MAP
+from helpers.timing import note
+
+MAGIC = b"BUUSESS2"
+SNAPSHOT_PATH = user_data_dir() / "session.snapshot"
+ROW_FIELDS = tuple(CSV_FIELD_MAP.values())
+# Rows read per step while encoding (spilled rows are fetched from disk)
+ENCODE_BATCH = 20000
+
+_U32 = struct.Struct(">I")
+_U64 = struct.Struct(">Q")
+# Row codes are written as little-endian uint32s
+_CODE_TYPE = "I" if array("I").itemsize == 4 else "L"
+_SWAP = sys.byteorder != "little"
+
+# What a damaged or foreign file can raise while being read
+READ_ERRORS = (OSError, ValueError, KeyError, TypeError, IndexError, struct.error, zlib.error)
+
+
+def _pack(obj) -> bytes:
+    # Level 1: the data is highly repetitive, so speed matters more than ratio
+    return zlib.compress(json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 1)
+
+
+def _unpack(blob: bytes):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def _codes_to_bytes(codes) -> bytes:
+    if _SWAP:
+        codes = array(_CODE_TYPE, codes)
+        codes.byteswap()
+    return codes.tobytes()
+
+
+def _codes_from_bytes(data) -> array:
+    codes = array(_CODE_TYPE)
+    codes.frombytes(data)
+    if _SWAP:
+        codes.byteswap()
+    return codes
+
+
+def _pack_columns(count, columns) -> bytes:
+    """columns: [(distinct values, codes array), ...] -> rows section."""
+    header = json.dumps({"rows": count, "values": [values for values, _ in columns]},
+                        ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    parts = [_U32.pack(len(header)), header]
+    parts.extend(_codes_to_bytes(codes) for _, codes in columns)
+    return zlib.compress(b"".join(parts), 1)
+
+
+def _unpack_columns(blob: bytes):
+    data = zlib.decompress(blob)
+    (header_len,) = _U32.unpack_from(data)
+    offset = _U32.size + header_len
+    header = json.loads(data[_U32.size:offset].decode("utf-8"))
+    count, width = header["rows"], 4 * header["rows"]
+    columns = []
+    for values in header["values"]:
+        codes = _codes_from_bytes(data[offset:offset + width])
+        if len(codes) != count:
+            raise ValueError("truncated rows section")
+        offset += width
+        columns.append((values, codes))
+    if len(columns) != len(ROW_FIELDS):
+        raise ValueError("snapshot has a different set of row fields")
+    return count, columns
+
+
+class RowEncoder:
+    """
+    Dictionary-encodes rows column by column: each column's distinct values
+    plus an array of codes. OneUni columns repeat heavily (units,
+    assessments, years), so this is far smaller and faster to store than one
+    string per cell. The store only ever appends to its rows, so update()
+    encodes just the rows added since the last call.
+
+    Rows are recognised by what backs them, not by object: spilled rows are
+    a new frozen() handle on every save, but a handle on the same spill file
+    with at least as many rows is the same rows plus a tail.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, rows=None):
+        self._src = rows  # also keeps a spill file alive while we rely on it
+        self.count = 0
+        self._lookups = [{} for _ in ROW_FIELDS]
+        self._codes = [array(_CODE_TYPE) for _ in ROW_FIELDS]
+
+    def _same_source(self, rows) -> bool:
+        if rows is self._src:
+            return True
+        path = getattr(rows, "path", None)  # SpilledRows
+        return path is not None and path == getattr(self._src, "path", None)
+
+    def update(self, rows, count=None) -> bool:
+        """
+        Bring the encoding up to date with the first `count` rows (default:
+        all of them). Returns True if it changed.
+        """
+        count = len(rows) if count is None else count
+        if not self._same_source(rows) or count < self.count:
+            self.reset(rows)
+        elif count == self.count:
+            return False
+        self._src = rows
+        for start in range(self.count, count, ENCODE_BATCH):
+            tail = rows[start:min(start + ENCODE_BATCH, count)]
+            for field, lookup, codes in zip(ROW_FIELDS, self._lookups, self._codes):
+                codes.extend(lookup.setdefault(r.get(field, ""), len(lookup)) for r in tail)
+        self.count = count
+        return True
+
+    def adopt(self, rows, columns):
+        """Take over `columns` (as decoded from a snapshot) as the encoding of `rows`."""
+        self.reset(rows)
+        self._lookups = [{v: i for i, v in enumerate(values)} for values, _ in columns]
+        self._codes = [codes for _, codes in columns]
+        self.count = len(rows)
+
+    def encode(self) -> bytes:
+        return _pack_columns(self.count, [(list(lookup), codes) for lookup, codes in zip(self._lookups, self._codes)])
+
+
+def decode_columns(columns):
+    decoded = [[values[c] for c in codes] for values, codes in columns]
+    fields = ROW_FIELDS
+    return [dict(zip(fields, cells)) for cells in zip(*decoded)]
+
+
+class Snapshot:
+    """A snapshot whose meta and pairs are loaded and whose rows are not (yet)."""
+
+    def __init__(self, path: Path, meta: dict, pairs, rows_offset: int, stamp):
+        self.path = path
+        self.meta = meta
+        self.pairs = pairs
+        self.targets = meta.get("targets", {})
+        self.row_count = meta.get("rows", 0)
+        self.columns = None  # encoded rows, kept after load_rows() for reuse
+        self._rows_offset = rows_offset
+        self._stamp = stamp
+
+    def load_rows(self):
+        """
+        Decode the OneUni rows. Returns None if the file was replaced or
+        damaged since read_snapshot() looked at it.
+        """
+        if not self.row_count:
+            return []
+        try:
+            st = self.path.stat()
+            if (st.st_mtime_ns, st.st_size) != self._stamp:
+                return None
+            with open(self.path, "rb") as f:
+                f.seek(self._rows_offset)
+                (size,) = _U64.unpack(f.read(_U64.size))
+                count, self.columns = _unpack_columns(f.read(size))
+            return decode_columns(self.columns) if count else []
+        except READ_ERRORS as e:
+            note("session_snapshot.load_rows_failed", file=str(self.path), error=repr(e))
+            return None
+
+
+def read_snapshot(path: Path = SNAPSHOT_PATH):
+    """Read meta + pairs. Returns None when there is no usable snapshot."""
+    path = Path(path)
+    try:
+        st = path.stat()
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                note("session_snapshot.read_failed", file=str(path), error="not a session snapshot (or an older format)")
+                return None
+            (meta_len,) = _U32.unpack(f.read(_U32.size))
+            meta = _unpack(f.read(meta_len))
+            (pairs_len,) = _U64.unpack(f.read(_U64.size))
+            pairs = [(str(s), str(m)) for s, m in _unpack(f.read(pairs_len))]
+            rows_offset = f.tell()
+    except FileNotFoundError:
+        return None
+    except READ_ERRORS as e:
+        note("session_snapshot.read_failed", file=str(path), error=repr(e))
+        return None
+    return Snapshot(path, dict(meta), pairs, rows_offset, (st.st_mtime_ns, st.st_size))
+
+
+class SnapshotWriter:
+    """
+    Writes snapshots atomically (temp file + os.replace). Only rows added
+    since the previous save are encoded, and the rows section is reused
+    as-is when just the pairs or targets changed.
+
+    save() writes on the calling thread; save_async() queues the save for the
+    writer thread, where a newer request replaces one that has not started.
+    """
+
+    def __init__(self, path: Path = SNAPSHOT_PATH):
+        self.path = Path(path)
+        self._encoder = RowEncoder()
+        self._rows_blob = None
+        self._lock = threading.Lock()  # encoder and file
+        self._cond = threading.Condition()
+        self._job = None  # latest save_async() arguments not yet picked up
+        self._busy = False
+        self._thread = None
+
+    def adopt(self, rows, snapshot: Snapshot):
+        """`rows` were restored from `snapshot`: reuse its encoding instead of redoing it."""
+        if snapshot.columns is not None and len(rows) == snapshot.row_count:
+            with self._lock:
+                self._encoder.adopt(rows, snapshot.columns)
+                self._rows_blob = None
+
+    def save(self, pairs, rows, targets, row_count=None):
+        """Write a snapshot of `pairs`, the first `row_count` rows (default: all) and `targets`."""
+        rows = rows if rows is not None else []
+        with self._lock:
+            self._write(pairs, rows, len(rows) if row_count is None else row_count, targets)
+
+    def save_async(self, pairs, rows, targets):
+        """
+        Queue a save for the writer thread. Call this from the thread that
+        changes the rows: it takes what the save needs (pairs and targets
+        copied, the current row count, a frozen() handle for spilled rows)
+        so later changes do not leak into this snapshot.
+        """
+        rows = rows if rows is not None else []
+        frozen = getattr(rows, "frozen", None)
+        job = (list(pairs or ()), frozen() if frozen else rows, dict(targets or {}), len(rows))
+        with self._cond:
+            self._job = job
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="session-snapshot", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout=None) -> bool:
+        """Wait until queued saves are written. False if `timeout` ran out first."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._job is None and not self._busy, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._job is not None)
+                (pairs, rows, targets, count), self._job = self._job, None
+                self._busy = True
+            try:
+                self.save(pairs, rows, targets, count)
+            except OSError as e:
+                note("session_snapshot.save_failed", error=str(e))
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _write(self, pairs, rows, count, targets):
+        if self._encoder.update(rows, count) or self._rows_blob is None:
+            self._rows_blob = self._encoder.encode()
+        meta = _pack({
+            "saved_at": time.time(),
+            "pairs": len(pairs or ()),
+            "rows": count,
+            "targets": dict(targets or {}),
+        })
+        pairs_blob = _pack([(str(s), str(m)) for s, m in (pairs or ())])
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(_U32.pack(len(meta)))
+            f.write(meta)
+            f.write(_U64.pack(len(pairs_blob)))
+            f.write(pairs_blob)
+            f.write(_U64.pack(len(self._rows_blob)))
+            f.write(self._rows_blob)
+        os.replace(tmp, self.path)
+
+    def delete(self):
+        with self._cond:
+            self._job = None  # a queued save would bring the file back
+            self._cond.wait_for(lambda: not self._busy)
+        with self._lock:
+            self._encoder.reset()
+            self._rows_blob = None
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,182 @@
+# helpers/spill_store.py
+"""
+On-disk row storage for OneUniRowStore once it goes over its memory budget.
+
+SpilledRows is an append-only sequence of SSPASSESS row dicts kept in a
+temporary SQLite file (one column per CSV_FIELD_MAP field, keyed by row
+position). It supports len(), indexing, slicing and iteration, so the
+exporters and the preview read from it exactly as from a list; rows are
+fetched in batches and rebuilt as dicts on the way out.
+
+Pickling a SpilledRows (or a RowsView over one) only pickles the file path,
+so process-pool export workers open the file and stream from it themselves.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import weakref
+
+from helpers.oneuni_csv import CSV_FIELD_MAP
+
+ROW_FIELDS = tuple(CSV_FIELD_MAP.values())
+FETCH_BATCH = 5000
+# Stay under SQLite's default limit on bound parameters per statement
+IN_BATCH = 900
+
+_COLS = ", ".join(f"c{i}" for i in range(len(ROW_FIELDS)))
+_SELECT = f"SELECT {_COLS} FROM rows"
+_INSERT = f"INSERT INTO rows (pos, {_COLS}) VALUES (?, {', '.join('?' * len(ROW_FIELDS))})"
+
+
+def _unlink(path):
+    for p in (path, path + "-wal", path + "-shm"):
+        try:
+            os.unlink(p)
+        except OSError:
+            pass
+
+
+class SpilledRows:
+    def __init__(self, path=None, _count=None, _keepalive=None):
+        """
+        Create a new temp file (path=None), or attach read-only to an existing
+        one, as a worker process does after unpickling.
+        """
+        self._local = threading.local()  # one connection per thread
+        self._keepalive = _keepalive  # owner whose finalizer deletes the file
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="oneuni-rows-", suffix=".sqlite")
+            os.close(fd)
+            self.path = path
+            self.owner = True
+            conn = self._conn()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(f"CREATE TABLE rows (pos INTEGER PRIMARY KEY, {_COLS})")
+            conn.commit()
+            self._count = 0
+            # The temp file goes away with the last reference to this object
+            self._finalizer = weakref.finalize(self, _unlink, path)
+        else:
+            self.path = path
+            self.owner = False
+            self._count = _count if _count is not None else self._conn().execute(
+                "SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path)
+        return conn
+
+    def __reduce__(self):
+        return SpilledRows, (self.path, self._count)
+
+    def frozen(self):
+        """
+        A read-only handle on the rows written so far. Rows appended to this
+        object later do not show up in it; the file lives as long as either.
+        """
+        return SpilledRows(self.path, self._count, _keepalive=self if self.owner else self._keepalive)
+
+    # ---------------- Writing ----------------
+    def extend(self, rows):
+        if not self.owner:
+            raise TypeError("Attached SpilledRows are read-only")
+        conn = self._conn()
+        start = self._count
+        fields = ROW_FIELDS
+        cur = conn.executemany(_INSERT, (
+            (pos,) + tuple(r.get(f, "") for f in fields) for pos, r in enumerate(rows, start)
+        ))
+        conn.commit()
+        self._count = start + max(cur.rowcount, 0)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        if self.owner:
+            self._finalizer()
+
+    # ---------------- Reading ----------------
+    @staticmethod
+    def _to_dicts(tuples):
+        fields = ROW_FIELDS
+        return [dict(zip(fields, t)) for t in tuples]
+
+    def _range(self, start, stop):
+        cur = self._conn().execute(f"{_SELECT} WHERE pos >= ? AND pos < ? ORDER BY pos", (start, stop))
+        return self._to_dicts(cur.fetchall())
+
+    def take(self, positions):
+        """Rows at the given positions, in that order."""
+        positions = list(positions)
+        conn = self._conn()
+        found = {}
+        for i in range(0, len(positions), IN_BATCH):
+            chunk = positions[i:i + IN_BATCH]
+            cur = conn.execute(
+                f"SELECT pos, {_COLS} FROM rows WHERE pos IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            for t in cur:
+                found[t[0]] = t[1:]
+        return self._to_dicts(found[p] for p in positions)
+
+    def view(self, positions):
+        return RowsView(self, positions)
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._count)
+            if step != 1:
+                return self.take(range(start, stop, step))
+            return self._range(start, stop)
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("SpilledRows index out of range")
+        return self._range(i, i + 1)[0]
+
+    def __iter__(self):
+        for start in range(0, self._count, FETCH_BATCH):
+            yield from self._range(start, start + FETCH_BATCH)
+
+
+class RowsView:
+    """A subset of a SpilledRows (by position) that reads like a list."""
+
+    def __init__(self, base: SpilledRows, positions):
+        self.base = base
+        self.positions = list(positions)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __bool__(self):
+        return bool(self.positions)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.base.take(self.positions[i])
+        return self.base[self.positions[i]]
+
+    def __iter__(self):
+        for start in range(0, len(self.positions), FETCH_BATCH):
+            yield from self.base.take(self.positions[start:start + FETCH_BATCH])
+
+    def take(self, positions):
+        mine = self.positions
+        return self.base.take([mine[p] for p in positions])
+
+    def view(self, positions):
+        mine = self.positions
+        return RowsView(self.base, [mine[p] for p in positions])
@@ -0,0 +1,122 @@
+# helpers/timing.py
+"""
+Lightweight timing spans for the importers, exporters and MinimalApp actions.
+
+    with span("export_oneuni.save"):
+        wb.save(path)
+
+Finished spans go into an in-memory ring buffer (see `recent_spans()`), shown
+in Settings -> Diagnostics, and optionally to a rotating log file.
+"""
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+RING_SIZE = 500
+LOG_FILE = "timings.log"
+
+_spans = deque(maxlen=RING_SIZE)
+_lock = threading.Lock()
+_local = threading.local()
+
+logger = logging.getLogger("mark_spreadsheet_creator.timing")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_file_handler = None
+
+
+def log_file_path() -> Path:
+    return Path(__file__).resolve().parent / LOG_FILE
+
+
+@contextmanager
+def span(name: str, **info):
+    """Time the enclosed block. Nested spans are recorded with their depth."""
+    depth = getattr(_local, "depth", 0)
+    _local.depth = depth + 1
+    started = datetime.now().strftime("%H:%M:%S")
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield info
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        _local.depth = depth
+        _record(name, started, (time.perf_counter() - start) * 1000.0, depth, status, info)
+
+
+def note(name: str, status: str = "warning", **info):
+    """Record an event with no duration (e.g. a skipped file) alongside the spans."""
+    depth = getattr(_local, "depth", 0)
+    _record(name, datetime.now().strftime("%H:%M:%S"), 0.0, depth, status, info)
+
+
+def _record(name, started, ms, depth, status, info):
+    record = {
+        "name": name,
+        "started": started,
+        "ms": ms,
+        "depth": depth,
+        "status": status,
+        "info": info,
+    }
+    with _lock:
+        _spans.append(record)
+    if _file_handler is not None:
+        extra = " ".join(f"{k}={v}" for k, v in info.items())
+        logger.info("%s%s %.1fms %s %s", "  " * depth, name, ms, status, extra)
+
+
+def timed(name=None):
+    """Decorator form of `span`, e.g. for Tk button callbacks."""
+    def wrap(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def recent_spans():
+    """Oldest-first copy of the ring buffer."""
+    with _lock:
+        return list(_spans)
+
+
+def clear_spans():
+    with _lock:
+        _spans.clear()
+
+
+def enable_file_log(path=None, max_bytes=1_000_000, backups=3) -> Path:
+    """Also write finished spans to a rotating log file."""
+    global _file_handler
+    disable_file_log()
+    path = Path(path) if path else log_file_path()
+    _file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    _file_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(_file_handler)
+    return path
+
+
+def disable_file_log():
+    global _file_handler
+    if _file_handler is not None:
+        logger.removeHandler(_file_handler)
+        _file_handler.close()
+        _file_handler = None
+
+
+def file_log_enabled() -> bool:
+    return _file_handler is not None
@@ -0,0 +1,217 @@
+# helpers/watch_folder.py
+"""
+Watch-folder ingestion: poll a directory for OneUni extracts and Blackboard
+gradebook exports and ingest each new or changed file once.
+
+A file is ingested when it is new, or when its size/mtime changed *and* its
+content hash differs from the last ingest (a re-saved identical file is
+skipped). Files must look the same on two consecutive polls first, so a copy
+still in progress is not read half-written. What has been seen is kept in
+helpers/watch_folder.json together with the watch settings, so restarts do
+not re-ingest the whole folder.
+
+Polling and parsing run on a background thread; results are put on a queue
+for the Tk side to collect with after().
+"""
+import csv
+import hashlib
+import json
+import os
+import queue
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+from helpers.gradebook_import import iter_gradebook_pairs, read_gradebook_header, recognised_columns
+from helpers.oneuni_csv import extract_sspassess_rows, has_sspassess
+from helpers.timing import note, span
+
+STATE_PATH = Path(__file__).resolve().parent / "watch_folder.json"
+
+DEFAULT_SETTINGS = {
+    "folder": "",
+    "interval": 10,          # seconds between polls
+    "enabled": False,
+    "auto_export_oneuni": False,
+    "auto_export_ids_marks": False,
+}
+
+GRADEBOOK_SUFFIXES = (".xls", ".xlsx", ".xlsm", ".txt")
+
+# kind: "oneuni" (payload = list[dict] rows) or "gradebook" (payload = list[(id, mark)]);
+# error is set (and payload None) when the file could not be read.
+WatchResult = namedtuple("WatchResult", "path kind payload error")
+
+
+# ---------------- Settings + seen-file index ----------------
+
+def load_state(path: Path = STATE_PATH):
+    """Return (settings, seen) from disk; defaults when missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(data.get("settings", {}))
+    return settings, data.get("seen", {})
+
+
+def save_state(settings, seen, path: Path = STATE_PATH):
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "seen": seen}, f, indent=1)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+# ---------------- Classification ----------------
+
+def _sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _csv_has_sspassess(path: Path) -> bool:
+    try:
+        return has_sspassess(path)
+    except (UnicodeDecodeError, csv.Error):
+        return False  # e.g. a UTF-16 Blackboard download saved as .csv
+
+
+def classify(path: Path):
+    """
+    'oneuni', 'gradebook' or None (not something we ingest). 'gradebook'
+    only means "may be one": ingest() still rejects files whose header
+    does not name an ID and a mark column.
+    """
+    name = path.name
+    if name.startswith((".", "~$")):
+        return None
+    suffix = path.suffix.lower()
+    if suffix in (".gz", ".zip"):
+        return "oneuni"
+    if suffix == ".csv":
+        return "oneuni" if _csv_has_sspassess(path) else "gradebook"
+    if suffix in GRADEBOOK_SUFFIXES:
+        return "gradebook"
+    return None
+
+
+def ingest(path: Path, kind: str):
+    if kind == "oneuni":
+        return extract_sspassess_rows(path)
+    header = read_gradebook_header(path)
+    cols = recognised_columns(header)
+    if cols is None:
+        # Nobody is there to confirm a guessed column, so only take clear headers
+        raise ValueError("not a recognised gradebook (no Student ID and mark columns in the header)")
+    pairs = list(iter_gradebook_pairs(path, *cols))
+    if not pairs:
+        raise ValueError("gradebook has no rows with a Student ID")
+    return pairs
+
+
+# ---------------- Scanner ----------------
+
+class FolderScanner:
+    """
+    One poll at a time over `folder` (not recursive). `seen` maps the file
+    path to {"mtime_ns", "size", "sha1"} of its last ingest and is updated
+    in place.
+    """
+
+    def __init__(self, folder, seen=None):
+        self.folder = Path(folder)
+        self.seen = seen if seen is not None else {}
+        self._last_stat = {}  # path -> (mtime_ns, size) from the previous poll
+
+    def poll(self):
+        """Ingest new/changed files; returns a list of WatchResult."""
+        results = []
+        current = {}
+        with span("watch_folder.poll", folder=self.folder.name) as info:
+            try:
+                entries = list(os.scandir(self.folder))
+            except OSError as e:
+                info["error"] = str(e)
+                return results
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                key = os.path.join(str(self.folder), entry.name)
+                stamp = (st.st_mtime_ns, st.st_size)
+                current[key] = stamp
+                known = self.seen.get(key)
+                if known and (known["mtime_ns"], known["size"]) == stamp:
+                    continue  # unchanged since it was ingested
+                if self._last_stat.get(key) != stamp:
+                    continue  # new or still being written; look again next poll
+                result = self._ingest_if_changed(Path(key), stamp, known)
+                if result is not None:
+                    results.append(result)
+            info["ingested"] = len(results)
+        # Forget files that left the folder, so putting one back ingests it again
+        folder = str(self.folder)
+        for key in [k for k in self.seen if os.path.dirname(k) == folder and k not in current]:
+            del self.seen[key]
+        self._last_stat = current
+        return results
+
+    def _ingest_if_changed(self, path: Path, stamp, known):
+        try:
+            kind = classify(path)
+            if kind is None:
+                return None
+            digest = _sha1(path)
+        except OSError:
+            return None
+        record = {"mtime_ns": stamp[0], "size": stamp[1], "sha1": digest}
+        if known and known.get("sha1") == digest:
+            self.seen[str(path)] = record  # touched but identical content
+            return None
+        # Recorded even on failure, so a broken file is not retried until it changes
+        self.seen[str(path)] = record
+        try:
+            return WatchResult(path, kind, ingest(path, kind), None)
+        except Exception as e:
+            note("watch_folder.skipped", file=path.name, kind=kind, error=str(e))
+            return WatchResult(path, kind, None, str(e))
+
+
+class WatchService:
+    """
+    Runs a FolderScanner every `interval` seconds on a daemon thread. Each
+    poll that ingested something puts (results, copy of seen) on `results`.
+    """
+
+    def __init__(self, folder, interval=10, seen=None):
+        self.scanner = FolderScanner(folder, seen)
+        self.interval = max(1, int(interval))
+        self.results = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="watch-folder", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            results = self.scanner.poll()
+            if results:
+                self.results.put((results, dict(self.scanner.seen)))
+            self._stop.wait(self.interval)
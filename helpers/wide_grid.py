@@ -0,0 +1,313 @@
+# helpers/wide_grid.py
+"""
+Wide marks grid: one Student ID column plus one mark column per assessment.
+
+Each mark column is mapped to a OneUni assessment ID from the loaded
+SSPASSESS rows. 'Export All…' hands the grid to the owner, which joins it
+with those rows and writes every assessment to Tab 3 in one workbook pass
+(see helpers/wide_marks.py). The grid is saved to helpers/wide_marks.json
+whenever it is hidden or exported, and reloaded on open.
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from helpers.clipboard_parse import iter_clipboard_rows
+from helpers.grid_index import IdIndex
+from helpers.wide_marks import MarkColumn, assessment_description, load_wide, save_wide
+
+
+class WideGridApp(tk.Toplevel):
+    def __init__(self, master, store, on_export=None):
+        """
+        store: the OneUniRowStore whose assessments the columns map to.
+        on_export(columns, rows) is called by 'Export All…' with the
+        MarkColumns and the grid rows ([sid, mark per column]).
+        """
+        super().__init__(master)
+        self.store = store
+        self.on_export = on_export
+        self.title("Marks for Several Assessments")
+        self.geometry("760x600")
+        self.minsize(520, 400)
+        self.protocol("WM_DELETE_WINDOW", self._on_hide)
+
+        self.columns = []      # list[MarkColumn], in grid order
+        self._values = {}      # item -> [sid, mark per column]
+        self._ids = IdIndex()  # duplicate / malformed ID flags
+
+        self._edit_entry = None
+        self._edit_item = None
+        self._edit_index = None
+
+        self._build_ui()
+        columns, rows = load_wide()
+        self._set_columns(columns)
+        self._append_rows(rows or [[""] * (len(columns) + 1) for _ in range(20)])
+        self._set_status(f"Loaded {len(rows)} row(s) from the last session." if rows else "Ready")
+
+    def show(self):
+        self.deiconify()
+        self.lift()
+        self.focus_set()
+
+    def _on_hide(self):
+        self._destroy_editor()
+        save_wide(self.columns, self.grid_rows())
+        self.withdraw()
+
+    # ---------------- UI ----------------
+    def _build_ui(self):
+        root = ttk.Frame(self, padding=12)
+        root.pack(fill="both", expand=True)
+
+        bar = ttk.Frame(root)
+        bar.pack(fill="x", pady=(0, 8))
+        ttk.Button(bar, text="Add Assessment…", command=self.on_add_column).pack(side="left")
+        ttk.Button(bar, text="Remove Assessment…", command=self.on_remove_column).pack(side="left", padx=(6, 0))
+        ttk.Button(bar, text="Export All…", command=self.on_export_all).pack(side="right")
+
+        table = ttk.Frame(root)
+        table.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(table, show="headings", selectmode="extended")
+        vsb = ttk.Scrollbar(table, orient="vertical", command=self.tree.yview)
+        hsb = ttk.Scrollbar(table, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        vsb.grid(row=0, column=1, sticky="ns")
+        hsb.grid(row=1, column=0, sticky="ew")
+        table.rowconfigure(0, weight=1)
+        table.columnconfigure(0, weight=1)
+        self.tree.bind("<Double-1>", self._on_cell_double_click)
+        # Flag tags first: ttk gives priority to the tag created first
+        self.tree.tag_configure("dup", background="#f8d7da")
+        self.tree.tag_configure("badid", background="#fff3cd")
+
+        btns = ttk.Frame(root)
+        btns.pack(fill="x", pady=(8, 0))
+        ttk.Button(btns, text="Paste (ID + marks)", command=self.on_paste).pack(side="left")
+        ttk.Button(btns, text="Add 10 Rows", command=lambda: self._append_rows([[""]] * 10)).pack(side="left", padx=(6, 0))
+        ttk.Button(btns, text="Delete Selected", command=self.on_delete_selected).pack(side="left", padx=(6, 0))
+        ttk.Button(btns, text="Clear Grid", command=self.on_clear_grid).pack(side="left", padx=(6, 0))
+
+        self.status_var = tk.StringVar(value="Ready")
+        ttk.Label(root, textvariable=self.status_var, anchor="w", relief="sunken").pack(fill="x", pady=(8, 0))
+
+    def _set_columns(self, columns):
+        """Lay the Treeview out for `columns`; cell values come from self._values."""
+        self._destroy_editor()
+        self.columns = list(columns)
+        keys = ["id"] + [f"m{j}" for j in range(len(self.columns))]
+        self.tree.configure(columns=keys)
+        self.tree.heading("id", text="Student ID")
+        self.tree.column("id", width=130, anchor="w", stretch=False)
+        for j, col in enumerate(self.columns):
+            self.tree.heading(f"m{j}", text=f"{col.name} [{col.assessment}]")
+            self.tree.column(f"m{j}", width=140, anchor="center", stretch=False)
+        width = len(keys)
+        for it, values in self._values.items():
+            values[:] = (values + [""] * width)[:width]
+            self.tree.item(it, values=values)
+
+    def _set_status(self, msg: str):
+        self.status_var.set(msg)
+
+    # ---------------- Columns ----------------
+    def on_add_column(self):
+        assessments = [a for a in self.store.values("assessment") if a] if self.store is not None else []
+        taken = {c.assessment for c in self.columns}
+        choices = [a for a in assessments if a not in taken]
+        if not choices:
+            messagebox.showinfo(
+                "Add Assessment",
+                "No further assessments to add.\n\nLoad OneUni rows in the main window first.",
+                parent=self,
+            )
+            return
+
+        win = tk.Toplevel(self)
+        win.title("Add Assessment Column")
+        win.transient(self)
+        win.resizable(False, False)
+        frm = ttk.Frame(win, padding=12)
+        frm.pack(fill="both", expand=True)
+        assess_var = tk.StringVar(value=choices[0])
+        name_var = tk.StringVar(value=assessment_description(self.store, choices[0]))
+        ttk.Label(frm, text="Assessment ID:").grid(row=0, column=0, sticky="w")
+        combo = ttk.Combobox(frm, textvariable=assess_var, values=choices, state="readonly", width=24)
+        combo.grid(row=0, column=1, sticky="ew", padx=(6, 0))
+        combo.bind("<<ComboboxSelected>>",
+                   lambda e: name_var.set(assessment_description(self.store, assess_var.get())))
+        ttk.Label(frm, text="Column name:").grid(row=1, column=0, sticky="w", pady=(6, 0))
+        ttk.Entry(frm, textvariable=name_var, width=28).grid(row=1, column=1, sticky="ew", padx=(6, 0), pady=(6, 0))
+
+        def ok():
+            a = assess_var.get()
+            self._set_columns(self.columns + [MarkColumn(name_var.get().strip() or a, a)])
+            win.destroy()
+            self._set_status(f"Added a column for assessment {a}.")
+
+        ttk.Button(frm, text="Add", command=ok).grid(row=2, column=1, sticky="e", pady=(10, 0))
+
+    def on_remove_column(self):
+        if not self.columns:
+            self._set_status("No assessment columns to remove.")
+            return
+        win = tk.Toplevel(self)
+        win.title("Remove Assessment Column")
+        win.transient(self)
+        win.resizable(False, False)
+        frm = ttk.Frame(win, padding=12)
+        frm.pack(fill="both", expand=True)
+        labels = [f"{c.name} [{c.assessment}]" for c in self.columns]
+        var = tk.StringVar(value=labels[-1])
+        ttk.Combobox(frm, textvariable=var, values=labels, state="readonly", width=36).pack(fill="x")
+
+        def ok():
+            j = labels.index(var.get())
+            if any(v[j + 1] for v in self._values.values()) and not messagebox.askyesno(
+                    "Remove Assessment", f"Remove '{labels[j]}' and the marks in it?", parent=win):
+                return
+            for values in self._values.values():
+                del values[j + 1]
+            self._set_columns(self.columns[:j] + self.columns[j + 1:])
+            win.destroy()
+            self._set_status(f"Removed {labels[j]}.")
+
+        ttk.Button(frm, text="Remove", command=ok).pack(anchor="e", pady=(10, 0))
+
+    # ---------------- Rows ----------------
+    def _append_rows(self, rows):
+        width = len(self.columns) + 1
+        affected = set()
+        for r in rows:
+            values = (list(r) + [""] * width)[:width]
+            it = self.tree.insert("", "end", values=values)
+            self._values[it] = values
+            affected |= self._ids.set(it, values[0])
+        self._refresh_flags(affected)
+
+    def _refresh_flags(self, items):
+        items = [it for it in items if self.tree.exists(it)]
+        if not items:
+            return
+        ids = self._ids
+        for tag in ("dup", "badid"):
+            self.tree.tk.call(self.tree, "tag", "remove", tag, tuple(items))
+        dup = [it for it in items if ids.is_duplicate(it)]
+        bad = [it for it in items if ids.is_malformed(it) and not ids.is_duplicate(it)]
+        if dup:
+            self.tree.tk.call(self.tree, "tag", "add", "dup", tuple(dup))
+        if bad:
+            self.tree.tk.call(self.tree, "tag", "add", "badid", tuple(bad))
+
+    def grid_rows(self):
+        """Rows in grid order as [sid, mark per column]; fully blank rows are dropped."""
+        return [list(self._values[it]) for it in self.tree.get_children() if any(self._values[it])]
+
+    def on_paste(self):
+        """
+        Paste rows of 'ID, mark, mark…' from the selected row (or the first
+        empty one); marks fill the assessment columns left to right.
+        """
+        try:
+            text = self.clipboard_get()
+        except tk.TclError:
+            self._set_status("Clipboard is empty or not text.")
+            return
+        self._destroy_editor()
+        rows = list(iter_clipboard_rows(text))
+        if not rows:
+            self._set_status("Nothing to paste.")
+            return
+        items = list(self.tree.get_children())
+        sel = self.tree.selection()
+        start = items.index(sel[0]) if sel else next(
+            (i for i, it in enumerate(items) if not any(self._values[it])), len(items))
+        width = len(self.columns) + 1
+        affected = set()
+        for i, cells in enumerate(rows):
+            values = (cells + [""] * width)[:width]
+            if start + i < len(items):
+                it = items[start + i]
+                self._values[it][:] = values
+                self.tree.item(it, values=values)
+                affected |= self._ids.set(it, values[0])
+            else:
+                self._append_rows([values])
+        self._refresh_flags(affected)
+        extra = max((len(c) for c in rows), default=0) - width
+        note = f" {extra} extra column(s) ignored; add assessments first." if extra > 0 else ""
+        self._set_status(f"Pasted {len(rows)} row(s) from row {start + 1}.{note}")
+
+    def on_delete_selected(self):
+        sel = self.tree.selection()
+        if not sel:
+            self._set_status("No rows selected to delete.")
+            return
+        self._destroy_editor()
+        affected = set()
+        for it in sel:
+            affected |= self._ids.discard(it)
+            self._values.pop(it, None)
+        self.tree.delete(*sel)
+        self._refresh_flags(affected)
+        self._set_status(f"Deleted {len(sel)} row(s).")
+
+    def on_clear_grid(self):
+        if not messagebox.askyesno("Clear Grid", "Clear all IDs and marks (the columns stay)?", parent=self):
+            return
+        self._destroy_editor()
+        self.tree.delete(*self.tree.get_children())
+        self._values.clear()
+        self._ids = IdIndex()
+        self._append_rows([[""]] * 20)
+        self._set_status("Grid cleared.")
+
+    # ---------------- Cell editing ----------------
+    def _on_cell_double_click(self, event):
+        if self.tree.identify_region(event.x, event.y) != "cell":
+            return
+        item = self.tree.identify_row(event.y)
+        col = self.tree.identify_column(event.x)  # '#1', '#2', ...
+        bbox = self.tree.bbox(item, col) if item and col else None
+        if not bbox:
+            return
+        self._destroy_editor()
+        index = int(col[1:]) - 1
+        var = tk.StringVar(value=self._values[item][index])
+        entry = tk.Entry(self.tree, textvariable=var, font=("Segoe UI", 10))
+        x, y, w, h = bbox
+        entry.place(x=x, y=y, width=w, height=h)
+        entry.focus()
+        entry.icursor("end")
+        self._edit_entry, self._edit_item, self._edit_index = entry, item, index
+
+        def commit(event=None):
+            if self._edit_entry is not entry:
+                return
+            value = var.get().strip()
+            self._values[item][index] = value
+            self.tree.set(item, index, value)
+            if index == 0:
+                self._refresh_flags(self._ids.set(item, value))
+            self._destroy_editor()
+
+        entry.bind("<Return>", commit)
+        entry.bind("<Escape>", lambda e: self._destroy_editor())
+        entry.bind("<FocusOut>", commit, add="+")
+
+    def _destroy_editor(self):
+        if self._edit_entry is not None:
+            self._edit_entry.destroy()
+        self._edit_entry = self._edit_item = self._edit_index = None
+
+    # ---------------- Export ----------------
+    def on_export_all(self):
+        self._destroy_editor()
+        if not self.columns:
+            messagebox.showinfo("Export All", "Add at least one assessment column first.", parent=self)
+            return
+        rows = self.grid_rows()
+        save_wide(self.columns, rows)
+        if self.on_export is not None:
+            self.on_export(list(self.columns), rows)
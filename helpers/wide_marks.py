@@ -0,0 +1,111 @@
+# helpers/wide_marks.py
+"""
+Data side of the wide (multi-assessment) marks grid.
+
+The grid holds one Student ID column plus any number of mark columns, each
+mapped to a OneUni assessment ID. join_wide_marks() pairs every non-blank
+mark with that student's SSPASSESS row for the column's assessment, so all
+assessments go to Tab 3 in a single export (see export_oneuni_rows_to_xlsx
+with `mark_header`).
+
+The grid layout and contents are kept in helpers/wide_marks.json between
+sessions.
+"""
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+
+from helpers.oneuni_index import ASSESSMENT_KEY, ATTEMPT_KEY, MARK_KEY
+
+WIDE_STATE_PATH = Path(__file__).resolve().parent / "wide_marks.json"
+
+DESCRIPTION_KEY = "StudentStudyItemAssessmentDescription"
+# Tab 3 header the joined marks are written under
+MARK_HEADER = "Mark"
+
+# name: column heading in the grid; assessment: OneUni StudentStudyItemAssessmentID
+MarkColumn = namedtuple("MarkColumn", "name assessment")
+
+# One grid mark that could not be exported: (student ID, column name, reason)
+JoinProblem = namedtuple("JoinProblem", "sid column reason")
+
+
+def load_wide(path: Path = WIDE_STATE_PATH):
+    """Return (columns, rows); rows are [sid, mark per column]. Empty when missing/unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        columns = [MarkColumn(str(c["name"]), str(c["assessment"])) for c in data.get("columns", [])]
+        width = len(columns) + 1
+        rows = [([str(v) for v in r] + [""] * width)[:width] for r in data.get("rows", [])]
+        return columns, rows
+    except (OSError, ValueError, KeyError, TypeError):
+        return [], []
+
+
+def save_wide(columns, rows, path: Path = WIDE_STATE_PATH):
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"columns": [c._asdict() for c in columns], "rows": rows}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def assessment_description(store, assessment) -> str:
+    """Description of an assessment from the first loaded row that has it ('' if none)."""
+    first = store.take(store.positions(assessment=assessment)[:1])
+    return first[0].get(DESCRIPTION_KEY, "") if first else ""
+
+
+def _attempt(row):
+    try:
+        return int(row.get(ATTEMPT_KEY) or 0)
+    except ValueError:
+        return 0
+
+
+def join_wide_marks(store, columns, rows):
+    """
+    Join grid marks to SSPASSESS rows. Returns (joined, problems):
+    joined is a list of row dicts (a copy of the student's row for that
+    assessment, latest attempt, plus MARK_KEY), ordered by column and then
+    grid order; problems lists the marks that had no matching row.
+    """
+    by_student = {}  # sid -> {assessment: latest row}
+    seen = set()
+    problems = []
+    grid = []
+    for r in rows:
+        sid = r[0].strip()
+        if not sid:
+            continue
+        if sid in seen:
+            problems.append(JoinProblem(sid, "", "duplicate Student ID in the grid (later row skipped)"))
+            continue
+        seen.add(sid)
+        grid.append((sid, r[1:]))
+        latest = by_student[sid] = {}
+        for row in store.select(student=sid):
+            a = row.get(ASSESSMENT_KEY, "")
+            if a not in latest or _attempt(row) >= _attempt(latest[a]):
+                latest[a] = row
+
+    joined = []
+    for j, col in enumerate(columns):
+        for sid, marks in grid:
+            mk = marks[j].strip() if j < len(marks) else ""
+            if not mk:
+                continue
+            row = by_student[sid].get(col.assessment)
+            if row is None:
+                reason = "not in the loaded OneUni rows" if not by_student[sid] else \
+                    f"no SSPASSESS row for assessment {col.assessment}"
+                problems.append(JoinProblem(sid, col.name, reason))
+                continue
+            out = dict(row)
+            out[MARK_KEY] = mk
+            joined.append(out)
+    return joined, problems
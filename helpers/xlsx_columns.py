@@ -0,0 +1,88 @@
+# helpers/xlsx_columns.py
+"""
+Typed column writer for openpyxl worksheets.
+
+Each output column is declared once with a ColumnType (how to convert the
+raw value, and which number format the cell should carry). Cells are
+written through the public worksheet API; a format is only set where the
+type asks for one, so the template's own formats (e.g. "0.0" on a mark
+column) are kept.
+"""
+from collections import namedtuple
+
+# convert(raw) -> value to store (None leaves the cell empty).
+# number_format: applied to every written cell; None keeps the existing format
+# (text written to a NUMBER column still gets '@', see TypedColumnWriter).
+ColumnType = namedtuple("ColumnType", "name convert number_format")
+
+TEXT_FORMAT = "@"
+
+
+def _to_text(raw):
+    s = "" if raw is None else str(raw).strip()
+    return s or None
+
+
+def _to_number(raw):
+    """'70' -> 70, '72.5' -> 72.5; anything non-numeric stays text."""
+    s = "" if raw is None else str(raw).strip()
+    if not s:
+        return None
+    try:
+        num = float(s)
+    except ValueError:
+        return s
+    # store as integer if it is an integer value like "70" or "70.0"
+    return int(num) if num.is_integer() else num
+
+
+# Text, forced to the '@' format (IDs: keeps leading zeros, no scientific notation)
+TEXT = ColumnType("text", _to_text, TEXT_FORMAT)
+# Numeric where possible, in the template's format; non-numeric values are written as '@' text
+NUMBER = ColumnType("number", _to_number, None)
+# Plain text; the template's own cell format is left alone
+STRING = ColumnType("string", _to_text, None)
+
+
+class TypedColumnWriter:
+    def __init__(self, ws, columns):
+        """columns: {column index (1-based): ColumnType}; values are passed in that order."""
+        self.ws = ws
+        self.columns = sorted(columns.items())
+
+    def write_block(self, start_row, block):
+        """
+        Write `block` (a list of value sequences, one per row, in column
+        order) to consecutive rows from `start_row`. Returns the next row.
+        """
+        ws = self.ws
+        for i, (col, ctype) in enumerate(self.columns):
+            fmt = ctype.number_format
+            for r, values in enumerate(block, start_row):
+                value = ctype.convert(values[i])
+                # ws.cell(..., value=None) would leave an old value in place
+                cell = ws.cell(row=r, column=col)
+                cell.value = value
+                if value is None:
+                    continue
+                if fmt is not None:
+                    if cell.number_format != fmt:
+                        cell.number_format = fmt
+                elif ctype is NUMBER:
+                    # Text fallback as '@'; a number replacing such text goes back to General
+                    if isinstance(value, str):
+                        cell.number_format = TEXT_FORMAT
+                    elif cell.number_format == TEXT_FORMAT:
+                        cell.number_format = "General"
+        return start_row + len(block)
+
+    def write_row(self, row, values):
+        self.write_block(row, [values])
+
+    def clear_rows(self, first_row, last_row):
+        """Empty the declared columns on rows first_row..last_row (inclusive)."""
+        if last_row < first_row:
+            return
+        for col, _ in self.columns:
+            for (cell,) in self.ws.iter_rows(min_row=first_row, max_row=last_row, min_col=col, max_col=col):
+                cell.value = None
@@ -4,12 +4,39 @@ from helpers.oneunicsvimport import *
 from helpers.idsandmarksgui import *
 from helpers.dnd_gui import *
 from helpers.export_oneuni import *
+from helpers.export_worker import ExportProgressDialog
+from helpers.app_settings import load_settings, save_settings
+from helpers.mark_stats import MarkStats, MarkStatsPanel
+from helpers.oneuni_index import OneUniRowStore
+from helpers.oneuni_preview import OneUniPreview
+from helpers.session_snapshot import SnapshotWriter, read_snapshot
+from helpers.wide_grid import WideGridApp
+from helpers.wide_marks import MARK_HEADER, join_wide_marks
+from helpers.watch_folder import WatchService, load_state as load_watch_state, save_state as save_watch_state
+from helpers import timing
+from helpers.timing import timed
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from datetime import datetime
+from tkinter import ttk, messagebox, filedialog, simpledialog
 from pathlib import Path
 from openpyxl import load_workbook
 
 
+# Export actions that must not run at the same time. They all read or write
+# the "... Final with IDs and marks" workbook: IDs & marks and the Tab 3
+# export save it in place, the per-unit and wide exports use it as template.
+# Auto-exports wait (see _auto_export) while a conflicting one is running.
+_SHARED_WORKBOOK = ("ids_marks", "oneuni", "oneuni_per_unit", "wide")
+EXPORT_CONFLICTS = {key: _SHARED_WORKBOOK for key in _SHARED_WORKBOOK}
+
+# Debounce for writing the session snapshot after a change
+SNAPSHOT_DELAY_MS = 500
+# How often the Tk side collects watch-folder results
+WATCH_COLLECT_MS = 500
+
+
 class MinimalApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -58,10 +85,17 @@ class MinimalApp(tk.Tk):
 
         # Card container
         card = ttk.Frame(self.root_frame, style="Card.TFrame", padding=24)
-        card.grid(row=2, column=0, padx=24, pady=(0, 48), sticky="n")
+        card.grid(row=2, column=0, padx=24, pady=(0, 12), sticky="n")
         card.columnconfigure(0, weight=1)
 
+        # Watch-folder status line
+        self.watch_status_var = tk.StringVar(value="")
+        ttk.Label(
+            self.root_frame, textvariable=self.watch_status_var, style="Subtitle.TLabel", anchor="center"
+        ).grid(row=3, column=0, sticky="n", pady=(0, 24))
+
         # ---- Buttons ----
+        self._menu_buttons = {}
         self._make_menu_button(
             card,
             "Input Student IDs and Marks",
@@ -69,32 +103,60 @@ class MinimalApp(tk.Tk):
             row=0
         )
 
+        self._menu_buttons["wide"] = self._make_menu_button(
+            card,
+            "Input Marks for Several Assessments",
+            self.on_wide_grid,
+            row=1
+        )
+
         self._make_menu_button(
             card,
             "Load OneUni CSV File",
             self.on_load_one_uni_csv,
-            row=1
+            row=2
+        )
+
+        self._make_menu_button(
+            card,
+            "Preview OneUni Rows",
+            self.on_preview_oneuni_rows,
+            row=3
         )
 
         # Print IDs to console button — NOTE: now zero-arg callable
         self._make_menu_button(
             card, "Print IDs to Console",
             self.on_print_ids_to_console,   # <-- fixed
-            row=2,
+            row=4,
         )
 
-        self._make_menu_button(
+        self._menu_buttons["ids_marks"] = self._make_menu_button(
             card,
             "Export IDs & Marks to XLSX",
             self.on_export_to_xlsx,
-            row=3
+            row=5
         )
 
-        self._make_menu_button(
+        self._menu_buttons["oneuni"] = self._make_menu_button(
             card,
             "Export OneUni CSV Rows to XLSX",
             self.on_export_oneuni_to_xlsx,
-            row=4
+            row=6
+        )
+
+        self._menu_buttons["oneuni_per_unit"] = self._make_menu_button(
+            card,
+            "Export OneUni Rows per Unit",
+            self.on_export_oneuni_per_unit,
+            row=7
+        )
+
+        self._make_menu_button(
+            card,
+            "Mark Statistics",
+            self.on_mark_stats,
+            row=8
         )
 
         # Settings button
@@ -102,7 +164,7 @@ class MinimalApp(tk.Tk):
             card,
             "Settings",
             self.on_settings,
-            row=5
+            row=9
         )
 
         # Center the window after layout is computed
@@ -111,6 +173,198 @@ class MinimalApp(tk.Tk):
         # storage for last received pairs
         self.pairs = None
 
+        # Child windows, created on first use and then only hidden/shown
+        self._grid_win = None
+        self._dnd_win = None
+        self._wide_win = None
+        self._stats_panel = None
+
+        self.app_settings = load_settings()
+
+        # OneUni rows from DnDApp, indexed by unit / assessment / student;
+        # spilled to a temp file past the memory budget
+        self.oneuni_store = OneUniRowStore(memory_budget_mb=self.app_settings["memory_budget_mb"])
+        self.oneuni_rows = None
+
+        # ----- Session snapshot (rows, pairs, last export targets) -----
+        self.last_export_targets = {}
+        self._snapshot_writer = SnapshotWriter()
+        self._snapshot_job = None
+        self._pending_snapshot = None  # (snapshot, queue) while its rows are decoded off the Tk thread
+        self._restore_session()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # ----- Watch folder (OneUni extracts / gradebooks dropped in a folder) -----
+        self._watch_settings, self._watch_seen = load_watch_state()
+        self._watch = None
+        if self._watch_settings["enabled"]:
+            self._start_watch()
+
+    # ------------------- Session snapshot -------------------
+    @timed()
+    def _restore_session(self):
+        """
+        Restore pairs and export targets now; the OneUni rows are decoded
+        and indexed on a worker thread and picked up when ready (or on first
+        use, if sooner).
+        """
+        snap = read_snapshot()
+        if snap is None:
+            return
+        self.pairs = snap.pairs or None
+        self.last_export_targets = dict(snap.targets)
+        if snap.row_count:
+            done = queue.Queue(maxsize=1)
+            budget = self.app_settings["memory_budget_mb"]
+            threading.Thread(target=self._decode_session_rows, args=(snap, budget, done),
+                             name="session-restore", daemon=True).start()
+            self._pending_snapshot = (snap, done)
+            self.after(200, self._poll_session_rows)
+
+    @staticmethod
+    def _decode_session_rows(snap, budget, done):
+        # Worker thread: no Tk calls here
+        store = None
+        try:
+            with timing.span("session.decode_rows", rows=snap.row_count):
+                rows = snap.load_rows()
+                if rows:
+                    store = OneUniRowStore(rows, memory_budget_mb=budget)
+        finally:
+            done.put(store)
+
+    def _poll_session_rows(self):
+        pending = self._pending_snapshot
+        if pending is None:
+            return
+        if pending[1].empty():
+            self.after(200, self._poll_session_rows)
+        else:
+            self._ensure_session_rows()
+
+    def _session_rows_ready(self) -> bool:
+        return self._pending_snapshot is None or not self._pending_snapshot[1].empty()
+
+    @timed()
+    def _ensure_session_rows(self):
+        """Take over the restored rows, waiting for the decode only if it is still running."""
+        pending, self._pending_snapshot = self._pending_snapshot, None
+        if pending is None:
+            return
+        snap, done = pending
+        store = done.get()
+        if store is not None:
+            self.oneuni_store.adopt(store)
+            self.oneuni_rows = self.oneuni_store.rows
+            self._snapshot_writer.adopt(self.oneuni_store.rows, snap)
+
+    def _schedule_snapshot(self):
+        if self._snapshot_job is not None:
+            self.after_cancel(self._snapshot_job)
+        self._snapshot_job = self.after(SNAPSHOT_DELAY_MS, self._save_snapshot)
+
+    @timed()
+    def _save_snapshot(self):
+        self._snapshot_job = None
+        # Rows still on disk from the last session must not be dropped; come
+        # back once they are decoded rather than wait for them here
+        if not self._session_rows_ready():
+            self._schedule_snapshot()
+            return
+        self._ensure_session_rows()
+        # Encoding and writing happen on the writer's thread
+        self._snapshot_writer.save_async(self.pairs, self.oneuni_store.rows, self.last_export_targets)
+
+    def _remember_target(self, key, path):
+        self.last_export_targets[key] = str(path)
+        self._schedule_snapshot()
+
+    def _on_close(self):
+        self._stop_watch()
+        if self._snapshot_job is not None:
+            self.after_cancel(self._snapshot_job)
+            self._ensure_session_rows()
+            self._save_snapshot()
+        self._snapshot_writer.flush()
+        self.destroy()
+
+    # ------------------- Watch folder -------------------
+    def _start_watch(self):
+        self._stop_watch()
+        folder = self._watch_settings["folder"]
+        if not folder or not Path(folder).is_dir():
+            self.watch_status_var.set(f"Watch folder not found: {folder or '(none)'}")
+            return
+        self._watch = WatchService(folder, self._watch_settings["interval"], dict(self._watch_seen))
+        self._watch.start()
+        self.watch_status_var.set(f"Watching {Path(folder).name} every {self._watch.interval}s")
+        self.after(WATCH_COLLECT_MS, self._collect_watch_results)
+
+    def _stop_watch(self):
+        if self._watch is not None:
+            self._watch.stop()
+            self._watch = None
+            self.watch_status_var.set("")
+
+    def _collect_watch_results(self):
+        watch = self._watch
+        if watch is None:
+            return
+        while True:
+            try:
+                results, seen = watch.results.get_nowait()
+            except queue.Empty:
+                break
+            self._watch_seen = seen
+            save_watch_state(self._watch_settings, seen)
+            self._on_watch_results(results)
+        if self._watch is watch:
+            self.after(WATCH_COLLECT_MS, self._collect_watch_results)
+
+    @timed()
+    def _on_watch_results(self, results):
+        """
+        OneUni extracts are merged into the loaded rows (same student,
+        assessment and attempt replaces); the newest gradebook becomes the
+        (id, mark) pairs. Optionally each kind is exported straight away.
+        """
+        rows_changed = pairs_changed = False
+        notes = []
+        for res in results:
+            if res.error:
+                notes.append(f"{res.path.name}: {res.error}")
+            elif res.kind == "oneuni":
+                self._ensure_session_rows()
+                self.oneuni_store.upsert(res.payload)
+                self.oneuni_rows = self.oneuni_store.rows
+                rows_changed = True
+                notes.append(f"{res.path.name}: {len(res.payload)} SSPASSESS row(s)")
+            elif res.payload:
+                self.pairs = res.payload
+                pairs_changed = True
+                notes.append(f"{res.path.name}: {len(res.payload)} ID/mark pair(s)")
+            else:
+                # Never replace the marks with nothing (ingest() normally rejects this already)
+                notes.append(f"{res.path.name}: no ID/mark pairs, current marks kept")
+        if rows_changed or pairs_changed:
+            self._schedule_snapshot()
+        if pairs_changed:
+            self._update_mark_stats()
+        stamp = datetime.now().strftime("%H:%M")
+        self.watch_status_var.set(f"[{stamp}] " + "; ".join(notes))
+
+        if rows_changed and self._watch_settings["auto_export_oneuni"]:
+            self._auto_export("oneuni", lambda: self._export_oneuni(self.oneuni_store.frozen_rows(), "watch folder"))
+        if pairs_changed and self.pairs and self._watch_settings["auto_export_ids_marks"]:
+            self._auto_export("ids_marks", self.on_export_to_xlsx)
+
+    def _auto_export(self, key, start):
+        # An export of this kind is already running: try again shortly
+        if self._menu_buttons[key].instate(["disabled"]):
+            self.after(2000, lambda: self._auto_export(key, start))
+        else:
+            start()
+
     # ------------------- UI helpers -------------------
     def _apply_base_theme(self):
         """Set base colors depending on theme_mode."""
@@ -210,7 +464,7 @@ class MinimalApp(tk.Tk):
         parent.columnconfigure(0, weight=1)
         return btn
 
-    def _center_window(self, width=620, height=580):
+    def _center_window(self, width=620, height=780):
         # Compute a nice centered geometry
         self.update_idletasks()
         screen_w = self.winfo_screenwidth()
@@ -221,25 +475,102 @@ class MinimalApp(tk.Tk):
         self.minsize(420, 360)
 
     # --------------- Button callbacks ---------------
+    @timed()
     def on_output_ids_to_console(self):
-        # Open the grid window; it will call self.handle_pairs(pairs)
-        app = GridApp(callback=self.handle_pairs)
-        app.mainloop()
+        # Open (or reopen) the grid window; it will call self.handle_pairs(pairs).
+        # Loaded OneUni rows serve as the roster for its enrolment check.
+        self._ensure_session_rows()
+        if self._grid_win is None or not self._grid_win.winfo_exists():
+            self._grid_win = GridApp(self, callback=self.handle_pairs, roster=self.oneuni_store)
+        else:
+            self._grid_win.show()
+
+    @timed()
+    def on_wide_grid(self):
+        # One mark column per assessment; the columns map to the loaded OneUni rows
+        self._ensure_session_rows()
+        if self._wide_win is None or not self._wide_win.winfo_exists():
+            self._wide_win = WideGridApp(self, self.oneuni_store, on_export=self._export_wide)
+        else:
+            self._wide_win.show()
+
+    def _export_wide(self, columns, rows):
+        """
+        Join the wide grid with the loaded OneUni rows and write every
+        assessment's marks to Tab 3 (plus a Mark column) in one workbook.
+        """
+        if not len(self.oneuni_store):
+            messagebox.showinfo("Export All Assessments", "Load the OneUni CSV for these assessments first.")
+            return
+        joined, problems = join_wide_marks(self.oneuni_store, columns, rows)
+        if problems:
+            listed = "\n".join(
+                f"{p.sid}{f' ({p.column})' if p.column else ''}: {p.reason}" for p in problems[:15]
+            )
+            more = f"\n…and {len(problems) - 15} more." if len(problems) > 15 else ""
+            if not joined:
+                messagebox.showerror("Export All Assessments", f"No marks could be matched:\n\n{listed}{more}")
+                return
+            if not messagebox.askyesno(
+                    "Export All Assessments",
+                    f"{len(problems)} mark(s) cannot be exported:\n\n{listed}{more}\n\n"
+                    f"Export the other {len(joined)} mark(s)?"):
+                return
+        elif not joined:
+            messagebox.showinfo("Export All Assessments", "The grid has no marks to export.")
+            return
+
+        initial = self.last_export_targets.get("wide")
+        out_path = filedialog.asksaveasfilename(
+            title="Save all assessments as",
+            defaultextension=".xlsx",
+            filetypes=[("Excel workbook", "*.xlsx")],
+            initialdir=str(Path(initial).parent) if initial else None,
+            initialfile=Path(initial).name if initial else "OneUni import - all assessments.xlsx",
+        )
+        if not out_path:
+            return
+
+        def done(path):
+            self._remember_target("wide", path)
+            messagebox.showinfo(
+                "Export Complete",
+                f"Exported {len(joined)} mark(s) for {len(columns)} assessment(s) to:\n{path}\n\n"
+                f"Worksheet: 'Tab 3 OneUni Export', marks in the '{MARK_HEADER}' column."
+            )
 
+        self._run_export(
+            "wide", "Exporting All Assessments", export_oneuni_rows_to_xlsx,
+            joined,
+            sheet_name="Tab 3 OneUni Export",
+            start_row=3,
+            header_row=2,
+            output_filename=out_path,
+            mark_header=MARK_HEADER,
+            on_done=done,
+        )
+
+    @timed()
     def on_load_one_uni_csv(self):
-        # Open the DnDApp with a callback to receive rows
-        # Option A: open a separate window and let the user click "Send to Main"
-        from helpers.dnd_gui import DnDApp
-        win = DnDApp(callback=self.handle_oneuni_rows, auto_send=False)
-        # If you prefer modal-like behaviour, you can just leave it to run.
+        # Open (or reopen) the DnDApp with a callback to receive rows;
+        # the user clicks "Send to Main" when done
+        if self._dnd_win is None or not self._dnd_win.winfo_exists():
+            self._dnd_win = DnDApp(self, callback=self.handle_oneuni_rows, auto_send=False,
+                                   memory_budget_mb=self.app_settings["memory_budget_mb"])
+        else:
+            self._dnd_win.show()
 
     def handle_oneuni_rows(self, rows):
         """
-        Receives a list[dict] of SSPASSESS rows from DnDApp.
+        Receives the SSPASSESS rows from DnDApp (a OneUniRowStore of dicts).
         Store them; you can also surface a summary or enable downstream actions.
         """
-        # Keep latest
-        self.oneuni_rows = rows
+        # Keep latest; only rows not seen before are indexed. Rows from the
+        # previous session are replaced, not merged.
+        self._pending_snapshot = None
+        self.oneuni_store.sync(rows)
+        self.oneuni_rows = self.oneuni_store.rows
+        self._schedule_snapshot()
 
         # Example: print a summary to console and show a messagebox
         print(f"Received {len(rows)} SSPASSESS row(s) from DnD GUI.")
@@ -249,16 +580,33 @@ class MinimalApp(tk.Tk):
                   f"Type={r.get('StudentStudyItemAssessmentTypeDescription','')}, "
                   f"Desc={r.get('StudentStudyItemAssessmentDescription','')}")
 
+        summary = self.oneuni_store.summary()
         messagebox.showinfo(
             "CSV Loaded",
-            f"Received {len(rows)} SSPASSESS row(s) from CSV."
+            f"Received {len(rows)} SSPASSESS row(s) from CSV.\n\n"
+            f"{summary['units']} unit(s), {summary['assessments']} assessment(s), "
+            f"{summary['students']} student(s)."
             )
-        
 
+    @timed()
+    def on_preview_oneuni_rows(self):
+        self._ensure_session_rows()
+        rows = getattr(self, "oneuni_rows", None)
+        if not rows:
+            messagebox.showinfo(
+                "Preview OneUni Rows",
+                "No OneUni rows captured yet.\n\n"
+                "Click 'Load OneUni CSV File', drop a CSV, then click 'Send to Main'."
+            )
+            return
+        OneUniPreview(self, self.oneuni_store, on_export=self._export_oneuni)
+
+    @timed()
     def on_export_to_xlsx(self):
         """
         Exports the most recently received (id, mark) pairs into the Excel template
         and saves a 'with IDs and marks' copy alongside the template.
+        Re-exports only patch the rows that changed since the last export.
         """
         if not self.pairs:
             from tkinter import messagebox
@@ -270,51 +618,158 @@ class MinimalApp(tk.Tk):
             )
             return
 
-        try:
-            out_path = export_ids_marks_to_xlsx(self.pairs)
-        except Exception as e:
-            from tkinter import messagebox
-            messagebox.showerror("Export failed", str(e))
-            return
+        def done(result):
+            if result.full:
+                detail = f"Wrote all {result.rows_written} row(s)."
+            elif result.rows_written:
+                detail = f"Updated {result.rows_written} changed row(s)."
+            else:
+                detail = "No changes since the last export."
+            self._remember_target("ids_marks", result.path)
+            messagebox.showinfo("Export complete", f"Saved:\n{result.path}\n\n{detail}")
 
-        from tkinter import messagebox
-        messagebox.showinfo("Export complete", f"Saved:\n{out_path}")
+        self._run_export(
+            "ids_marks", "Exporting IDs & Marks", export_ids_marks_incremental,
+            list(self.pairs), on_done=done,
+        )
 
+    @timed()
     def on_export_oneuni_to_xlsx(self):
         """
         Export the most recently received OneUni rows (from DnDApp) into
         'Tab 3 OneUni Export' of the 'Final - with IDs and marks' workbook,
         starting at row 3.
         """
-        try:
-            rows = getattr(self, "oneuni_rows", None)
-            if not rows:
-                from tkinter import messagebox
-                messagebox.showinfo(
-                    "Export OneUni Rows",
-                    "No OneUni rows captured yet.\n\n"
-                    "Click 'Load OneUni CSV File', drop a CSV, then click 'Send to Main'."
-                )
-                return
-
-            out_path = export_oneuni_rows_to_xlsx(
-                rows,
-                target_filename="/Users/mattpsychology/Documents/Marks Inputter/SEPS Master BB to OneUni mark import template - Final with IDs and marks.xlsx",
-                sheet_name="Tab 3 OneUni Export",
-                start_row=3,
-                header_row=2,
+        self._ensure_session_rows()
+        rows = getattr(self, "oneuni_rows", None)
+        if not rows:
+            messagebox.showinfo(
+                "Export OneUni Rows",
+                "No OneUni rows captured yet.\n\n"
+                "Click 'Load OneUni CSV File', drop a CSV, then click 'Send to Main'."
             )
+            return
+        # The export thread must not see rows that arrive while it runs
+        self._export_oneuni(self.oneuni_store.frozen_rows())
 
-            from tkinter import messagebox
+    def _export_oneuni(self, rows, description="all rows"):
+        """Export `rows` (all loaded rows, or a filtered subset from the preview)."""
+        if not rows:
+            messagebox.showinfo("Export OneUni Rows", f"No rows match ({description}).")
+            return
+
+        def done(out_path):
+            self._remember_target("oneuni", out_path)
             messagebox.showinfo(
                 "Export Complete",
-                f"Exported {len(rows)} row(s) to:\n{out_path}\n\n"
+                f"Exported {len(rows)} row(s) ({description}) to:\n{out_path}\n\n"
                 "Worksheet: 'Tab 3 OneUni Export' (from row 3)."
             )
-        except Exception as e:
-            from tkinter import messagebox
-            messagebox.showerror("Export failed", str(e))
 
+        self._run_export(
+            "oneuni", "Exporting OneUni Rows", export_oneuni_rows_to_xlsx,
+            rows,
+            target_filename="/Users/mattpsychology/Documents/Marks Inputter/SEPS Master BB to OneUni mark import template - Final with IDs and marks.xlsx",
+            sheet_name="Tab 3 OneUni Export",
+            start_row=3,
+            header_row=2,
+            on_done=done,
+        )
+
+    @timed()
+    def on_export_oneuni_per_unit(self):
+        """
+        Write one 'Tab 3 OneUni Export' workbook per curriculum item (optionally
+        per assessment) into a chosen folder, in parallel across CPU cores.
+        """
+        self._ensure_session_rows()
+        rows = getattr(self, "oneuni_rows", None)
+        if not rows:
+            messagebox.showinfo(
+                "Export per Unit",
+                "No OneUni rows captured yet.\n\n"
+                "Click 'Load OneUni CSV File', drop a CSV, then click 'Send to Main'."
+            )
+            return
+
+        out_dir = filedialog.askdirectory(
+            title="Choose a folder for the per-unit workbooks",
+            initialdir=self.last_export_targets.get("oneuni_per_unit"),
+            parent=self,
+        )
+        if not out_dir:
+            return
+        by_assessment = messagebox.askyesnocancel(
+            "Export per Unit",
+            "Also split each unit by assessment ID?\n\n"
+            "Yes: one workbook per unit + assessment\nNo: one workbook per unit",
+            parent=self,
+        )
+        if by_assessment is None:
+            return
+
+        # Partitioned on the export thread: give it indexes and rows that
+        # rows arriving meanwhile cannot change
+        store = self.oneuni_store.snapshot()
+
+        def done(outputs):
+            self._remember_target("oneuni_per_unit", out_dir)
+            messagebox.showinfo(
+                "Export Complete",
+                f"Wrote {len(outputs)} workbook(s) for {len(store)} row(s) to:\n{out_dir}"
+            )
+
+        self._run_export(
+            "oneuni_per_unit", "Exporting OneUni Rows per Unit", export_oneuni_rows_per_unit,
+            store, out_dir, by_assessment=by_assessment, on_done=done,
+        )
+
+    def _run_export(self, key, title, func, *args, on_done=None, **kwargs):
+        """
+        Run `func` on a background thread with a progress/cancel window.
+        Only the menu buttons that conflict with `key` are disabled meanwhile.
+        """
+        conflicting = [self._menu_buttons[k] for k in EXPORT_CONFLICTS[key]]
+        for btn in conflicting:
+            btn.state(["disabled"])
+
+        def enable():
+            for btn in conflicting:
+                if btn.winfo_exists():
+                    btn.state(["!disabled"])
+
+        ExportProgressDialog(
+            self, title, func, *args,
+            on_done=on_done,
+            on_error=lambda e: messagebox.showerror("Export failed", str(e)),
+            on_cancel=lambda: messagebox.showinfo("Export cancelled", "Export cancelled. No file was changed."),
+            on_finally=enable,
+            **kwargs,
+        )
+
+    @timed()
+    def on_mark_stats(self):
+        """Statistics of the stored (id, mark) pairs; follows later stores from the grid."""
+        if not self.pairs:
+            messagebox.showinfo(
+                "Mark Statistics",
+                "No IDs/marks stored yet.\n\nUse 'Input Student IDs and Marks', then click 'Save'."
+            )
+            return
+        stats = MarkStats.from_pairs(self.pairs)
+        if self._stats_panel is not None and self._stats_panel.winfo_exists():
+            self._stats_panel.stats = stats
+            self._stats_panel.refresh()
+            self._stats_panel.lift()
+        else:
+            self._stats_panel = MarkStatsPanel(self, stats, title="Mark Statistics (stored pairs)")
+
+    def _update_mark_stats(self):
+        if self._stats_panel is not None and self._stats_panel.winfo_exists():
+            self._stats_panel.stats = MarkStats.from_pairs(self.pairs or ())
+            self._stats_panel.refresh()
+
+    @timed()
     def on_settings(self):
         # Minimal Settings dialog (placeholder)
         win = tk.Toplevel(self)
@@ -354,8 +809,185 @@ class MinimalApp(tk.Tk):
         toggle_btn = ttk.Button(frm, textvariable=toggle_text, style="Menu.TButton", command=toggle_theme, cursor="hand2")
         toggle_btn.grid(row=2, column=0, sticky="ew")
 
+        diag_btn = ttk.Button(frm, text="Diagnostics (Timings)", style="Menu.TButton",
+                              command=self.on_diagnostics, cursor="hand2")
+        diag_btn.grid(row=3, column=0, sticky="ew", pady=(10, 0))
+
+        forget_btn = ttk.Button(frm, text="Forget Saved Session", style="Menu.TButton",
+                                command=self.on_forget_session, cursor="hand2")
+        forget_btn.grid(row=4, column=0, sticky="ew", pady=(10, 0))
+
+        watch_btn = ttk.Button(frm, text="Watch Folder…", style="Menu.TButton",
+                               command=self.on_watch_settings, cursor="hand2")
+        watch_btn.grid(row=5, column=0, sticky="ew", pady=(10, 0))
+
+        budget_btn = ttk.Button(frm, text="Memory Budget…", style="Menu.TButton",
+                                command=lambda: self.on_memory_budget(win), cursor="hand2")
+        budget_btn.grid(row=6, column=0, sticky="ew", pady=(10, 0))
+
         # Center settings window relative to main
-        self._center_child(win, w=420, h=220)
+        self._center_child(win, w=420, h=470)
+
+    def on_memory_budget(self, parent=None):
+        """Set how much memory OneUni rows may use before they move to a temp file."""
+        budget = simpledialog.askinteger(
+            "Memory Budget",
+            "Keep OneUni rows in memory up to (MB).\n"
+            "Beyond this they are kept in a temporary file on disk (0 = never).",
+            initialvalue=self.app_settings["memory_budget_mb"] or 0,
+            minvalue=0, parent=parent or self,
+        )
+        if budget is None:
+            return
+        self.app_settings["memory_budget_mb"] = budget
+        save_settings(self.app_settings)
+        # Applies from the next rows loaded; rows already on disk stay there
+        self.oneuni_store.memory_budget_mb = budget
+        if self._dnd_win is not None and self._dnd_win.winfo_exists():
+            self._dnd_win.set_memory_budget(budget)
+
+    def on_watch_settings(self):
+        """Choose the watched folder, poll interval and auto-export options."""
+        win = tk.Toplevel(self)
+        win.title("Watch Folder")
+        win.transient(self)
+        win.configure(bg=self.colors["bg"])
+        win.resizable(False, False)
+
+        frm = ttk.Frame(win, style="App.TFrame", padding=16)
+        frm.grid(sticky="nsew")
+        frm.columnconfigure(1, weight=1)
+        settings = self._watch_settings
+
+        ttk.Label(
+            frm,
+            text="OneUni extracts (.csv, .csv.gz, .zip) and Blackboard gradebooks saved\n"
+                 "into this folder are loaded automatically. Each file is read once,\n"
+                 "and again only if its content changes.",
+            style="Subtitle.TLabel", justify="left",
+        ).grid(row=0, column=0, columnspan=3, sticky="w", pady=(0, 10))
+
+        folder_var = tk.StringVar(value=settings["folder"])
+        ttk.Label(frm, text="Folder:").grid(row=1, column=0, sticky="w")
+        ttk.Entry(frm, textvariable=folder_var, width=40).grid(row=1, column=1, sticky="ew", padx=6)
+
+        def browse():
+            path = filedialog.askdirectory(title="Folder to watch", initialdir=folder_var.get() or None, parent=win)
+            if path:
+                folder_var.set(path)
+
+        ttk.Button(frm, text="Browse…", command=browse).grid(row=1, column=2)
+
+        interval_var = tk.IntVar(value=settings["interval"])
+        ttk.Label(frm, text="Check every (s):").grid(row=2, column=0, sticky="w", pady=(8, 0))
+        ttk.Spinbox(frm, from_=2, to=600, textvariable=interval_var, width=6).grid(
+            row=2, column=1, sticky="w", padx=6, pady=(8, 0))
+
+        enabled_var = tk.BooleanVar(value=settings["enabled"])
+        oneuni_var = tk.BooleanVar(value=settings["auto_export_oneuni"])
+        ids_var = tk.BooleanVar(value=settings["auto_export_ids_marks"])
+        ttk.Checkbutton(frm, text="Watch this folder", variable=enabled_var).grid(
+            row=3, column=0, columnspan=3, sticky="w", pady=(10, 0))
+        ttk.Checkbutton(frm, text="Export OneUni rows after each new extract", variable=oneuni_var).grid(
+            row=4, column=0, columnspan=3, sticky="w")
+        ttk.Checkbutton(frm, text="Export IDs & Marks after each new gradebook", variable=ids_var).grid(
+            row=5, column=0, columnspan=3, sticky="w")
+
+        def apply():
+            try:
+                interval = max(2, int(interval_var.get()))
+            except (tk.TclError, ValueError):
+                interval = settings["interval"]
+            settings.update(
+                folder=folder_var.get().strip(),
+                interval=interval,
+                enabled=enabled_var.get(),
+                auto_export_oneuni=oneuni_var.get(),
+                auto_export_ids_marks=ids_var.get(),
+            )
+            save_watch_state(settings, self._watch_seen)
+            if settings["enabled"]:
+                self._start_watch()
+            else:
+                self._stop_watch()
+            win.destroy()
+
+        btns = ttk.Frame(frm, style="App.TFrame")
+        btns.grid(row=6, column=0, columnspan=3, sticky="e", pady=(14, 0))
+        ttk.Button(btns, text="Cancel", command=win.destroy).pack(side="right")
+        ttk.Button(btns, text="Apply", command=apply).pack(side="right", padx=(0, 6))
+
+        self._center_child(win, w=520, h=300)
+
+    def on_forget_session(self):
+        """Delete the snapshot; the loaded data stays until the app closes."""
+        if self._snapshot_job is not None:
+            self.after_cancel(self._snapshot_job)
+            self._snapshot_job = None
+        self._pending_snapshot = None
+        self._snapshot_writer.delete()
+        messagebox.showinfo("Saved Session", "The saved session was deleted.\n\n"
+                            "It will be written again on the next change.")
+
+    def on_diagnostics(self):
+        """Show the most recent timing spans (newest first)."""
+        win = tk.Toplevel(self)
+        win.title("Diagnostics - Operation Timings")
+        win.transient(self)
+        win.configure(bg=self.colors["bg"])
+
+        frm = ttk.Frame(win, style="App.TFrame", padding=12)
+        frm.pack(fill="both", expand=True)
+
+        tree = ttk.Treeview(frm, columns=("started", "ms", "status", "info"), height=18)
+        tree.heading("#0", text="Operation")
+        tree.heading("started", text="Started")
+        tree.heading("ms", text="Duration (ms)")
+        tree.heading("status", text="Status")
+        tree.heading("info", text="Details")
+        tree.column("#0", width=300)
+        tree.column("started", width=80, anchor="center")
+        tree.column("ms", width=110, anchor="e")
+        tree.column("status", width=60, anchor="center")
+        tree.column("info", width=200)
+        vsb = ttk.Scrollbar(frm, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=vsb.set)
+        tree.grid(row=0, column=0, sticky="nsew")
+        vsb.grid(row=0, column=1, sticky="ns")
+        frm.rowconfigure(0, weight=1)
+        frm.columnconfigure(0, weight=1)
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            for rec in reversed(timing.recent_spans()):
+                info = " ".join(f"{k}={v}" for k, v in rec["info"].items())
+                tree.insert(
+                    "", "end", text="    " * rec["depth"] + rec["name"],
+                    values=(rec["started"], f"{rec['ms']:.1f}", rec["status"], info),
+                )
+
+        def clear():
+            timing.clear_spans()
+            refresh()
+
+        log_var = tk.BooleanVar(value=timing.file_log_enabled())
+
+        def toggle_log():
+            if log_var.get():
+                path = timing.enable_file_log()
+                messagebox.showinfo("Diagnostics", f"Writing timings to:\n{path}", parent=win)
+            else:
+                timing.disable_file_log()
+
+        btns = ttk.Frame(frm, style="App.TFrame")
+        btns.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(8, 0))
+        ttk.Button(btns, text="Refresh", command=refresh).pack(side="left", padx=(0, 6))
+        ttk.Button(btns, text="Clear", command=clear).pack(side="left", padx=(0, 6))
+        ttk.Checkbutton(btns, text="Write to rotating log file", variable=log_var,
+                        command=toggle_log).pack(side="left", padx=(12, 0))
+
+        refresh()
+        self._center_child(win, w=820, h=480)
 
     def _center_child(self, win, w=420, h=220):
         self.update_idletasks()
@@ -371,7 +1003,10 @@ class MinimalApp(tk.Tk):
         'Print IDs to Console' button meaningful.
         """
         self.pairs = pairs
+        self._schedule_snapshot()
+        self._update_mark_stats()
 
+    @timed()
     def on_print_ids_to_console(self):
         """
         Zero-argument Tkinter callback for the 'Print IDs to Console' button.
@@ -388,67 +1023,6 @@ class MinimalApp(tk.Tk):
         for sid, mark in self.pairs:
             print(f"{sid} {mark}")
 
-def export_ids_marks_to_xlsx(
-    pairs,
-    template_filename="SEPS Master BB to OneUni mark import template - Final.xlsx",
-    output_filename="SEPS Master BB to OneUni mark import template - Final with IDs and marks.xlsx",
-    sheet_name="Tab 1 BB Export",
-    start_row=1,
-    ):
-    """
-    Write (student_id, mark) pairs to the given Excel template and save as a new file.
-    - IDs go to column A (written as text to preserve leading zeros)
-    - Marks go to column B (numeric if possible, otherwise text)
-    - Data starts at `start_row`
-    """
-
-    base_dir = Path(__file__).resolve().parent
-    template_path = base_dir / template_filename
-    output_path = base_dir / output_filename
-
-    if not template_path.exists():
-        raise FileNotFoundError(f"Template not found: {template_path}")
-
-    wb = load_workbook(template_path)
-    if sheet_name not in wb.sheetnames:
-        raise KeyError(
-            f"Worksheet '{sheet_name}' not found in template. "
-            f"Available: {wb.sheetnames!r}"
-            )
-    ws = wb[sheet_name]
-
-    # Optional: clear existing data region (A/B) where we'll write
-    max_rows_to_clear = max(len(pairs), ws.max_row - start_row + 1)
-    for r in range(start_row, start_row + max_rows_to_clear):
-        ws.cell(row=r, column=1, value=None)
-        ws.cell(row=r, column=2, value=None)
-
-    r = start_row
-    for sid, mark in pairs:
-        # Column A: Student ID as TEXT (to preserve leading zeros)
-        c_id = ws.cell(row=r, column=1, value=str(sid).strip())
-        c_id.number_format = "@" # force text
-
-        # Column B: MArk (try numeric; fallback to text)
-        m_str = str(mark).strip()
-        if m_str == "":
-            ws.cell(row=r, column=2, value=None)
-        else:
-            try:
-                num = float(m_str)
-                # store as integer if it is an integer value like "70" or "70.0"
-                if num.is_integer():
-                    num = int(num)
-                ws.cell(row=r, column=2, value=num)
-            except ValueError:
-                c_m = ws.cell(row=r, column=2, value=m_str)
-                c_m.number_format = "@"
-
-        r += 1
-
-    wb.save(output_path)
-    return output_path
-
 if __name__ == "__main__":
     app = MinimalApp()
     app.mainloop()
@@ -0,0 +1,7 @@
+# Make `helpers` importable however pytest is started (tests/ has no __init__.py)
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
@@ -0,0 +1,37 @@
+import csv
+
+from helpers.clipboard_parse import iter_clipboard_rows, iter_pairs, sniff_dialect
+
+
+def test_tab_separated_keeps_decimal_commas():
+    text = "12345678\t72,5\n23456789\t61,0\n"
+    assert sniff_dialect(text).delimiter == "\t"
+    assert list(iter_pairs(text)) == [("12345678", "72,5"), ("23456789", "61,0")]
+
+
+def test_semicolon_separated_keeps_decimal_commas():
+    assert list(iter_pairs("12345678;72,5\n23456789;61\n")) == [("12345678", "72,5"), ("23456789", "61")]
+
+
+def test_comma_separated_with_quotes():
+    text = '12345678,"72,5"\n"23456789",61\n'
+    assert list(iter_pairs(text)) == [("12345678", "72,5"), ("23456789", "61")]
+
+
+def test_semicolon_inside_quotes_does_not_pick_the_delimiter():
+    assert sniff_dialect('"late; see note",5\n').delimiter == ","
+
+
+def test_single_column():
+    assert sniff_dialect("12345678\n23456789\n") is csv.excel_tab
+    assert list(iter_pairs("12345678\n23456789")) == [("12345678", ""), ("23456789", "")]
+
+
+def test_inner_blank_lines_kept_trailing_ones_dropped():
+    rows = list(iter_clipboard_rows("1\t2\n\n3\t4\n\n\n"))
+    assert rows == [["1", "2"], [], ["3", "4"]]
+
+
+def test_cells_are_stripped_and_quoted_line_breaks_kept():
+    rows = list(iter_clipboard_rows(' 1 \t"two\nlines"\n'))
+    assert rows == [["1", "two\nlines"]]
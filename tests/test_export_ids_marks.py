@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("openpyxl")
+from openpyxl import Workbook, load_workbook  # noqa: E402
+
+from helpers.export_oneuni import _export_state_path, export_ids_marks_incremental  # noqa: E402
+
+SHEET = "Tab 1 BB Export"
+
+
+@pytest.fixture
+def paths(tmp_path):
+    template = tmp_path / "template.xlsx"
+    wb = Workbook()
+    wb.active.title = SHEET
+    wb.save(template)
+    return template, tmp_path / "out.xlsx"
+
+
+def _export(paths, pairs):
+    template, out = paths
+    return export_ids_marks_incremental(pairs, str(template), str(out), sheet_name=SHEET, start_row=2)
+
+
+def _cells(out):
+    ws = load_workbook(out)[SHEET]
+    return [(a.value, b.value) for a, b in ws.iter_rows(min_row=2, max_col=2)]
+
+
+PAIRS = [("001", "70"), ("002", "65.5"), ("003", "AB")]
+
+
+def test_first_export_is_full_and_records_state(paths):
+    result = _export(paths, PAIRS)
+    assert result.full and result.rows_written == 3
+    assert _cells(paths[1]) == [("001", 70), ("002", 65.5), ("003", "AB")]
+    state = json.loads(_export_state_path(paths[1]).read_text(encoding="utf-8"))
+    assert state["pairs"] == [list(p) for p in PAIRS]
+
+
+def test_only_changed_rows_are_patched(paths):
+    _export(paths, PAIRS)
+    result = _export(paths, [("001", "70"), ("002", "80"), ("003", "AB")])
+    assert not result.full and result.rows_written == 1
+    assert _cells(paths[1]) == [("001", 70), ("002", 80), ("003", "AB")]
+
+
+def test_unchanged_pairs_write_nothing(paths):
+    _export(paths, PAIRS)
+    mtime = paths[1].stat().st_mtime_ns
+    result = _export(paths, [(" 001 ", "70 "), ("002", "65.5"), ("003", "AB")])
+    assert result.rows_written == 0 and not result.full
+    assert paths[1].stat().st_mtime_ns == mtime
+
+
+def test_removed_rows_are_emptied(paths):
+    _export(paths, PAIRS)
+    result = _export(paths, PAIRS[:1])
+    assert not result.full and result.rows_written == 2
+    cells = _cells(paths[1])
+    assert cells[0] == ("001", 70)
+    assert all(c == (None, None) for c in cells[1:])
+
+
+def test_changed_template_forces_a_full_export(paths):
+    _export(paths, PAIRS)
+    st = paths[0].stat()
+    os.utime(paths[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert _export(paths, PAIRS[:2]).full
+
+
+def test_output_edited_elsewhere_forces_a_full_export(paths):
+    _export(paths, PAIRS)
+    st = paths[1].stat()
+    os.utime(paths[1], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert _export(paths, PAIRS).full
+
+
+@pytest.mark.parametrize("state", [None, "{not json", '{"pairs": []}'])
+def test_missing_or_bad_state_forces_a_full_export(paths, state):
+    _export(paths, PAIRS)
+    state_path = _export_state_path(paths[1])
+    if state is None:
+        state_path.unlink()
+    else:
+        state_path.write_text(state, encoding="utf-8")
+    result = _export(paths, [("009", "1")])
+    assert result.full
+    assert _cells(paths[1])[0] == ("009", 1)
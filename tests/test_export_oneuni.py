@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("openpyxl")
+from helpers.export_oneuni import ASSESSMENT_KEY, UNIT_KEY, _partition_filename, partition_oneuni_rows  # noqa: E402
+
+
+def _row(unit, assessment, n):
+    return {UNIT_KEY: unit, ASSESSMENT_KEY: assessment, "n": n}
+
+
+ROWS = [
+    _row("PSY101", "A1", 0),
+    _row("PSY202", "A1", 1),
+    _row("PSY101", "A2", 2),
+    _row("", "A1", 3),
+    _row("PSY101", "A1", 4),
+]
+
+
+def _ns(parts):
+    return {key: [r["n"] for r in rows] for key, rows in parts.items()}
+
+
+def test_partition_by_unit_keeps_row_order():
+    assert _ns(partition_oneuni_rows(ROWS)) == {
+        ("PSY101",): [0, 2, 4],
+        ("PSY202",): [1],
+        ("UNKNOWN",): [3],
+    }
+
+
+def test_partition_by_unit_and_assessment():
+    assert _ns(partition_oneuni_rows(ROWS, by_assessment=True)) == {
+        ("PSY101", "A1"): [0, 4],
+        ("PSY202", "A1"): [1],
+        ("PSY101", "A2"): [2],
+        ("UNKNOWN", "A1"): [3],
+    }
+
+
+def test_partition_filename_is_safe():
+    assert _partition_filename(("PSY 101/2", "A:1")) == "OneUni import - PSY-101-2_A-1.xlsx"
@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("openpyxl")
+from openpyxl import Workbook  # noqa: E402
+
+from helpers.gradebook_import import (  # noqa: E402
+    guess_columns, iter_gradebook_pairs, read_gradebook_header, recognised_columns,
+)
+
+BB_HEADER = ["Last Name", "First Name", "Username", "Student ID", "Essay [Total Pts: 100 Score] |123"]
+
+
+def test_guess_columns_from_blackboard_header():
+    assert guess_columns(BB_HEADER) == (3, 4)
+
+
+def test_guess_columns_uses_mark_words_when_there_is_no_total_column():
+    assert guess_columns(["Name", "Student Number", "Final Mark", "Notes"]) == (1, 2)
+
+
+def test_guess_columns_falls_back_to_first_and_last():
+    assert guess_columns(["a", "b", "c"]) == (0, 2)
+
+
+def test_utf16_tab_separated_xls(tmp_path):
+    path = tmp_path / "gc.xls"
+    text = "\t".join(BB_HEADER) + "\n" + "Doe\tJo\tjdoe\t00123\t72.5\n" + "X\tY\tz\t\t50\n"
+    path.write_bytes(text.encode("utf-16"))
+    header = read_gradebook_header(path)
+    assert header == BB_HEADER
+    assert list(iter_gradebook_pairs(path, *guess_columns(header))) == [("00123", "72.5")]
+
+
+def test_semicolon_csv(tmp_path):
+    path = tmp_path / "gc.csv"
+    path.write_text("Student ID;Total\n111;8\n222;\n", encoding="utf-8")
+    assert list(iter_gradebook_pairs(path, 0, 1)) == [("111", "8"), ("222", "")]
+
+
+def test_xlsx(tmp_path):
+    path = tmp_path / "gc.xlsx"
+    wb = Workbook()
+    wb.active.append(["Student ID", "Grade"])
+    wb.active.append([12345678, 65.0])
+    wb.save(path)
+    assert list(iter_gradebook_pairs(path, 0, 1)) == [("12345678", "65")]
+
+
+def test_recognised_columns_needs_both_names():
+    assert recognised_columns(BB_HEADER) == (3, 4)
+    assert recognised_columns(["Student ID", "Notes"]) is None
+    assert recognised_columns(["a", "Total"]) is None
@@ -0,0 +1,60 @@
+from helpers.grid_history import Change, EditHistory
+
+
+def _change(label, cells):
+    change = Change(label)
+    for item, old, new in cells:
+        change.cell("mark", item, old, new)
+    return change
+
+
+def test_unchanged_cells_are_not_recorded():
+    change = _change("edit", [("r1", "5", "5")])
+    assert not change
+    history = EditHistory()
+    history.push(change)
+    assert not history.can_undo()
+
+
+def test_writes_to_one_column_share_an_op():
+    change = _change("paste", [("r1", "", "1"), ("r2", "", "2")])
+    assert len(change.ops) == 1
+    assert change.ops[0] == ("cells", "mark", ["r1", "r2"], ["", ""], ["1", "2"])
+
+
+def test_row_insert_starts_a_new_cells_op():
+    change = Change("paste")
+    change.cell("mark", "r1", "", "1")
+    change.inserted(5, "r9", "123", "4")
+    change.cell("mark", "r1", "1", "2")
+    assert [op[0] for op in change.ops] == ["cells", "insert", "cells"]
+
+
+def test_undo_redo_and_new_push_clears_redo():
+    history = EditHistory()
+    first = _change("one", [("r1", "", "1")])
+    second = _change("two", [("r1", "1", "2")])
+    history.push(first)
+    history.push(second)
+    assert history.undo() is second
+    assert history.can_redo()
+    assert history.redo() is second
+    history.undo()
+    history.push(_change("three", [("r2", "", "3")]))
+    assert not history.can_redo()
+
+
+def test_oldest_changes_are_trimmed_to_the_budget():
+    history = EditHistory(max_cells=3)
+    changes = [_change(str(i), [(f"r{i}", "", "1"), (f"s{i}", "", "1")]) for i in range(3)]
+    for change in changes:
+        history.push(change)
+    assert history.undo() is changes[2]
+    assert history.undo() is None  # older changes were dropped
+
+
+def test_a_single_oversized_change_is_kept():
+    history = EditHistory(max_cells=1)
+    big = _change("big", [(f"r{i}", "", "1") for i in range(10)])
+    history.push(big)
+    assert history.undo() is big
@@ -0,0 +1,58 @@
+from helpers.grid_index import IdIndex
+
+
+def test_duplicates_are_tracked_per_edit():
+    idx = IdIndex()
+    idx.set("r1", "12345678")
+    affected = idx.set("r2", "12345678")
+    assert affected == {"r1", "r2"}
+    assert idx.is_duplicate("r1") and idx.is_duplicate("r2")
+    assert idx.duplicate_ids() == ["12345678"]
+
+    affected = idx.set("r2", "87654321")
+    assert "r1" in affected
+    assert not idx.is_duplicate("r1")
+    assert idx.duplicate_count() == 0
+
+
+def test_malformed_count_follows_edits():
+    idx = IdIndex()
+    idx.set("r1", "abc")
+    idx.set("r2", "12345678")
+    assert idx.is_malformed("r1") and not idx.is_malformed("r2")
+    assert idx.malformed_count() == 1
+    idx.discard("r1")
+    assert idx.malformed_count() == 0
+
+
+def test_blank_id_clears_the_row():
+    idx = IdIndex()
+    idx.set("r1", "12345678")
+    idx.set("r1", "  ")
+    assert idx.id_of("r1") == ""
+    assert len(idx) == 0
+
+
+def test_search_puts_exact_match_first():
+    idx = IdIndex()
+    for i, sid in enumerate(["1234", "12345", "12346", "2000"]):
+        idx.set(f"r{i}", sid)
+    assert idx.search("1234") == ["1234", "12345", "12346"]
+    assert idx.search("1234", limit=2) == ["1234", "12345"]
+    assert idx.search("9") == []
+
+
+def test_roster_tracks_missing_and_unenrolled():
+    idx = IdIndex()
+    idx.set("r1", "11111111")
+    idx.set("r2", "99999999")
+    idx.set_roster(["11111111", "22222222"])
+    assert idx.missing_ids() == ["22222222"]
+    assert idx.is_unenrolled("r2") and idx.unenrolled_count() == 1
+
+    idx.set("r2", "22222222")
+    assert idx.missing_count() == 0
+    assert idx.unenrolled_count() == 0
+
+    idx.set_roster(None)
+    assert not idx.has_roster() and not idx.is_unenrolled("r2")
@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip("tkinter")
+from helpers.idsandmarksgui import GridApp  # noqa: E402
+
+
+def test_numeric_ids_sort_as_numbers_before_text():
+    ids = ["100", "20", "abc", "3"]
+    assert sorted(ids, key=GridApp._sort_key_id) == ["3", "20", "100", "abc"]
+
+
+def test_digit_like_characters_do_not_break_sorting():
+    # str.isdigit() is true for these but int() rejects them
+    ids = ["12", "²", "①", "3"]
+    assert sorted(ids, key=GridApp._sort_key_id)[:2] == ["3", "12"]
+
+
+def test_marks_sort_numerically_then_as_text():
+    marks = ["72.5", "AF", "8", ""]
+    assert sorted(marks, key=GridApp._sort_key_mark) == ["8", "72.5", "", "AF"]
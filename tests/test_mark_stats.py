@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("tkinter")  # the module also holds the stats panel
+from helpers import mark_stats  # noqa: E402
+from helpers.mark_stats import GRADE_BANDS, MarkStats, format_summary_line, parse_mark  # noqa: E402
+
+MARKS = ["45", "50", "65", "72.5", "85", "100", "AF", ""]
+
+
+def test_parse_mark():
+    assert parse_mark("72.5") == 72.5
+    assert parse_mark("AF") is None
+    assert parse_mark("nan") is None
+    assert parse_mark(None) is None
+
+
+def test_summary_figures():
+    s = MarkStats.from_pairs((str(i), mk) for i, mk in enumerate(MARKS)).summary()
+    assert s["count"] == 6
+    assert s["non_numeric"] == 1
+    assert s["mean"] == pytest.approx(417.5 / 6)
+    assert s["median"] == pytest.approx(68.75)
+    assert (s["min"], s["max"]) == (45, 100)
+    assert s["fail_rate"] == pytest.approx(1 / 6)
+    assert s["bands"] == {"HD": 2, "D": 1, "C": 1, "P": 1, "N": 1}
+    assert s["histogram"][9] == 1 and s["histogram"][8] == 1  # 100 counts in the top bin
+
+
+@pytest.mark.skipif(mark_stats.np is None, reason="NumPy not installed")
+def test_numpy_and_python_paths_agree():
+    stats = MarkStats.from_pairs((str(i), mk) for i, mk in enumerate(MARKS))
+    values = list(stats._values.values())
+    py = stats._summary_python(values)
+    fast = stats._summary_numpy(values)
+    for key in ("count", "bands", "histogram"):
+        assert fast[key] == py[key]
+    for key in ("mean", "std", "median", "min", "max", "fail_rate"):
+        assert fast[key] == pytest.approx(py[key])
+
+
+def test_edits_update_the_cached_summary():
+    stats = MarkStats()
+    stats.set("r1", "40")
+    assert stats.summary()["fail_rate"] == 1.0
+    stats.set("r1", "90")
+    assert stats.summary()["bands"]["HD"] == 1
+    stats.discard("r1")
+    s = stats.summary()
+    assert s["count"] == 0 and s["mean"] is None
+    assert s["bands"] == {band: 0 for band, _ in GRADE_BANDS}
+    assert format_summary_line(s) == "No numeric marks."
@@ -0,0 +1,73 @@
+import gzip
+import zipfile
+
+import pytest
+
+from helpers.oneuni_csv import (
+    CSV_FIELD_MAP, _iter_csv_streams, extract_sspassess_rows, has_sspassess, is_oneuni_file,
+)
+
+STUDENT = CSV_FIELD_MAP[10]
+EXTRACT = (
+    "HEADER,ignored\n"
+    'SSPASSESS,PSY101,1,Intro,2026,S1,Sem 1,CAMP,Campus,1,00123,1,A1,Essay,Essay 1,BC1\n'
+    '"SSPASSESS","PSY202","2"\n'
+)
+
+
+def test_plain_csv_maps_fields_and_pads_short_rows(tmp_path):
+    path = tmp_path / "extract.csv"
+    path.write_text(EXTRACT, encoding="utf-8")
+    rows = extract_sspassess_rows(path)
+    assert [r[CSV_FIELD_MAP[1]] for r in rows] == ["PSY101", "PSY202"]
+    assert rows[0][STUDENT] == "00123"
+    assert rows[1][STUDENT] == ""
+
+
+def test_gzip(tmp_path):
+    path = tmp_path / "extract.csv.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(EXTRACT)
+    assert is_oneuni_file(path)
+    assert len(extract_sspassess_rows(path)) == 2
+    assert has_sspassess(path)
+
+
+def _zip(path, members):
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, text in members.items():
+            zf.writestr(name, text)
+    return path
+
+
+def test_zip_reads_every_csv_member_in_order(tmp_path):
+    path = _zip(tmp_path / "extract.zip", {
+        "a.csv": EXTRACT,
+        "readme.txt": "SSPASSESS,not,a,csv\n",
+        "__MACOSX/._a.csv": "SSPASSESS,junk\n",
+        "b.csv": "SSPASSESS,PSY303\n",
+    })
+    rows = extract_sspassess_rows(path)
+    assert [r[CSV_FIELD_MAP[1]] for r in rows] == ["PSY101", "PSY202", "PSY303"]
+
+
+def test_zip_members_are_opened_one_at_a_time(tmp_path):
+    path = _zip(tmp_path / "extract.zip", {"a.csv": EXTRACT, "b.csv": EXTRACT})
+    streams = _iter_csv_streams(path)
+    _, first = next(streams)
+    _, second = next(streams)
+    assert first.closed and not second.closed
+    streams.close()
+    assert second.closed
+
+
+def test_zip_without_csv_is_an_error(tmp_path):
+    path = _zip(tmp_path / "extract.zip", {"notes.txt": "hello"})
+    with pytest.raises(ValueError, match="No .csv files"):
+        extract_sspassess_rows(path)
+
+
+def test_has_sspassess_in_a_zip(tmp_path):
+    path = _zip(tmp_path / "extract.zip", {"a.csv": "x,y\n", "b.csv": EXTRACT})
+    assert has_sspassess(path)
+    assert not has_sspassess(_zip(tmp_path / "other.zip", {"a.csv": "x,y\n"}))
@@ -0,0 +1,134 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from helpers.oneuni_index import ASSESSMENT_KEY, ATTEMPT_KEY, STUDENT_KEY, UNIT_KEY, OneUniRowStore
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _row(unit, assessment, student, attempt="1"):
+    return {UNIT_KEY: unit, ASSESSMENT_KEY: assessment, STUDENT_KEY: student, ATTEMPT_KEY: attempt}
+
+
+ROWS = [
+    _row("PSY101", "A1", "100"),
+    _row("PSY101", "A2", "100"),
+    _row("PSY202", "A1", "200"),
+    _row("PSY101", "A1", "300"),
+]
+
+
+def test_extend_stores_rows_from_a_generator():
+    store = OneUniRowStore()
+    store.extend(r for r in ROWS)
+    assert len(store) == len(ROWS)
+    assert store.select(student="300") == [ROWS[3]]
+
+
+def test_filters_and_counts():
+    store = OneUniRowStore(ROWS)
+    assert list(store.positions(unit="PSY101", assessment="A1")) == [0, 3]
+    assert store.count(unit="PSY101") == 3
+    assert store.counts("unit") == {"PSY101": 3, "PSY202": 1}
+    assert store.distinct_count("student", unit="PSY101") == 2
+    assert store.select(student_prefix="1") == ROWS[:2]
+    assert store.values("assessment") == ["A1", "A2"]
+
+
+def test_partition_keeps_load_order():
+    store = OneUniRowStore(ROWS)
+    parts = store.partition(("unit", "assessment"))
+    assert list(parts[("PSY101", "A1")]) == [ROWS[0], ROWS[3]]
+    assert set(parts) == {("PSY101", "A1"), ("PSY101", "A2"), ("PSY202", "A1")}
+
+
+def test_sync_only_indexes_the_new_tail():
+    store = OneUniRowStore()
+    sent = list(ROWS[:2])
+    store.sync(sent)
+    sent.extend(ROWS[2:])
+    store.sync(sent)
+    assert store.rows == ROWS
+    assert store.count(unit="PSY101") == 3
+
+
+def test_upsert_replaces_same_student_assessment_attempt():
+    store = OneUniRowStore(ROWS)
+    newer = dict(ROWS[0], Extra="x")
+    store.upsert([newer])
+    assert len(store) == len(ROWS)
+    assert store.select(student="100", assessment="A1") == [newer]
+
+
+def test_snapshot_is_unaffected_by_later_rows():
+    for budget in (None, 0.0001):  # in memory, and spilled to disk
+        store = OneUniRowStore(ROWS, memory_budget_mb=budget)
+        snap = store.snapshot()
+        store.extend([_row("PSY101", "A1", "400")])
+        assert len(snap) == len(ROWS)
+        assert len(snap.partition(("unit",))[("PSY101",)]) == 3
+        assert store.count(unit="PSY101") == 4
+
+
+def test_store_does_not_import_the_gui_modules():
+    code = "import sys, helpers.oneuni_index; print(sorted({'openpyxl', 'tkinter'} & set(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def _ids(rows):
+    # Spilled rows come back with every CSV field, so compare the indexed ones
+    return [(r[UNIT_KEY], r[ASSESSMENT_KEY], r[STUDENT_KEY]) for r in rows]
+
+
+def test_extend_batched_spills_while_the_input_is_still_streaming():
+    store = OneUniRowStore(memory_budget_mb=0.05)
+    spilled_at = []
+
+    def stream():
+        for i in range(3000):
+            spilled_at.append(store.spilled)
+            yield _row("PSY101", "A1", str(i))
+
+    store.extend_batched(stream(), batch=500)
+    assert store.spilled
+    assert not spilled_at[0] and spilled_at[-1]  # spilled part-way, not after the last row
+    assert len(store) == 3000 and store.count(unit="PSY101") == 3000
+    assert store.select(student="2999")[0][STUDENT_KEY] == "2999"
+
+
+def test_truncate_drops_the_tail_and_its_index_entries():
+    for budget in (None, 0.0001):
+        store = OneUniRowStore(ROWS, memory_budget_mb=budget)
+        store.truncate(2)
+        assert _ids(store) == _ids(ROWS[:2])
+        assert store.counts("unit") == {"PSY101": 2}
+
+
+def test_sync_from_a_store_copies_only_new_rows_into_spilled_rows():
+    source = OneUniRowStore(ROWS[:2])
+    main = OneUniRowStore(memory_budget_mb=0.0001)
+    main.sync(source)
+    assert main.spilled
+    spilled = main.rows
+    source.extend(ROWS[2:])
+    main.sync(source)
+    assert main.rows is spilled  # appended to, not rebuilt
+    assert _ids(main) == _ids(ROWS)
+    assert main.count(unit="PSY101") == 3
+
+
+def test_sync_rebuilds_when_either_store_was_rewritten():
+    source = OneUniRowStore(ROWS[:2])
+    main = OneUniRowStore()
+    main.sync(source)
+    main.upsert([_row("PSY999", "B1", "900")])  # main changed since the last sync
+    source.extend(ROWS[2:])
+    main.sync(source)
+    assert list(main) == ROWS
+
+    source.truncate(1)
+    main.sync(source)
+    assert list(main) == ROWS[:1]
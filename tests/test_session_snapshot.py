@@ -0,0 +1,66 @@
+from helpers.session_snapshot import ROW_FIELDS, SnapshotWriter, read_snapshot
+
+
+def _rows(n, start=0):
+    return [{f: f"{f[-6:]}-{(i + start) % 7}" for f in ROW_FIELDS} for i in range(n)]
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "session.snapshot"
+    rows = _rows(50)
+    rows[3][ROW_FIELDS[1]] = "Psychologie – été"
+    SnapshotWriter(path).save([("00123", "72.5")], rows, {"oneuni": "/tmp/out.xlsx"})
+
+    snap = read_snapshot(path)
+    assert snap.pairs == [("00123", "72.5")]
+    assert snap.targets == {"oneuni": "/tmp/out.xlsx"}
+    assert snap.row_count == 50
+    assert snap.load_rows() == rows
+
+
+def test_only_new_rows_are_encoded(tmp_path):
+    writer = SnapshotWriter(tmp_path / "s")
+    rows = _rows(10)
+    writer.save([], rows, {})
+    codes = writer._encoder._codes[0]
+    rows.extend(_rows(5, 10))
+    writer.save([], rows, {})
+    assert writer._encoder._codes[0] is codes  # extended, not rebuilt
+    assert read_snapshot(tmp_path / "s").load_rows() == rows
+
+
+def test_save_async_and_adopt(tmp_path):
+    path = tmp_path / "s"
+    rows = _rows(20)
+    writer = SnapshotWriter(path)
+    writer.save_async([("1", "2")], rows, {})
+    rows.extend(_rows(3))  # after the call: not part of that snapshot
+    assert writer.flush(timeout=10)
+    snap = read_snapshot(path)
+    restored = snap.load_rows()
+    assert restored == rows[:20]
+
+    other = SnapshotWriter(path)
+    other.adopt(restored, snap)
+    assert other._encoder.count == 20
+
+
+def test_damaged_or_foreign_files_are_ignored(tmp_path):
+    path = tmp_path / "s"
+    assert read_snapshot(path) is None
+    SnapshotWriter(path).save([], _rows(100), {})
+    data = path.read_bytes()
+    path.write_bytes(data[:-20])
+    snap = read_snapshot(path)
+    assert snap is not None and snap.load_rows() is None
+
+    path.write_bytes(b"\x80\x04not a snapshot")
+    assert read_snapshot(path) is None
+
+
+def test_delete_removes_the_file(tmp_path):
+    path = tmp_path / "s"
+    writer = SnapshotWriter(path)
+    writer.save([], [], {})
+    writer.delete()
+    assert not path.exists()
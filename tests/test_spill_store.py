@@ -0,0 +1,68 @@
+import pickle
+
+import pytest
+
+from helpers.session_snapshot import SnapshotWriter, read_snapshot
+from helpers.spill_store import ROW_FIELDS, SpilledRows
+
+
+def _rows(n, start=0):
+    return [{f: f"{f[:4]}{i}" for f in ROW_FIELDS} for i in range(start, start + n)]
+
+
+@pytest.fixture
+def spilled():
+    rows = SpilledRows()
+    yield rows
+    rows.close()
+
+
+def test_reads_like_a_list(spilled):
+    rows = _rows(12)
+    spilled.extend(r for r in rows)
+    assert len(spilled) == 12 and spilled
+    assert spilled[0] == rows[0] and spilled[-1] == rows[-1]
+    assert spilled[3:6] == rows[3:6]
+    assert spilled[::5] == rows[::5]
+    assert list(spilled) == rows
+    with pytest.raises(IndexError):
+        spilled[12]
+
+
+def test_take_and_views_keep_the_given_order(spilled):
+    rows = _rows(10)
+    spilled.extend(rows)
+    assert spilled.take([7, 2, 5]) == [rows[7], rows[2], rows[5]]
+    view = spilled.view([1, 3, 5, 7])
+    assert list(view) == [rows[1], rows[3], rows[5], rows[7]]
+    assert view.take([3, 0]) == [rows[7], rows[1]]
+    assert list(view.view([1, 2])) == [rows[3], rows[5]]
+
+
+def test_frozen_handle_ignores_later_rows_and_is_read_only(spilled):
+    spilled.extend(_rows(5))
+    frozen = spilled.frozen()
+    spilled.extend(_rows(5, 5))
+    assert len(frozen) == 5 and len(spilled) == 10
+    with pytest.raises(TypeError):
+        frozen.extend(_rows(1))
+
+
+def test_pickles_as_a_path(spilled):
+    spilled.extend(_rows(3))
+    copy = pickle.loads(pickle.dumps(spilled))
+    assert copy.path == spilled.path and not copy.owner
+    assert list(copy) == list(spilled)
+
+
+def test_snapshot_of_spilled_rows_encodes_only_the_tail(spilled, tmp_path):
+    # Every save takes a new frozen() handle; the encoder must still see the same rows
+    path = tmp_path / "s"
+    writer = SnapshotWriter(path)
+    spilled.extend(_rows(10))
+    writer.save([], spilled.frozen(), {})
+    codes = writer._encoder._codes[0]
+    spilled.extend(_rows(4, 10))
+    writer.save([], spilled.frozen(), {})
+    assert writer._encoder._codes[0] is codes
+    assert read_snapshot(path).load_rows() == _rows(14)
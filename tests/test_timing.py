@@ -0,0 +1,70 @@
+import pytest
+
+from helpers import timing
+
+
+@pytest.fixture(autouse=True)
+def fresh_spans():
+    timing.clear_spans()
+    yield
+    timing.disable_file_log()
+    timing.clear_spans()
+
+
+def test_nested_spans_record_depth_and_info():
+    with timing.span("outer", rows=3) as info:
+        with timing.span("inner"):
+            pass
+        info["written"] = 2
+    inner, outer = timing.recent_spans()
+    assert (inner["name"], inner["depth"]) == ("inner", 1)
+    assert (outer["name"], outer["depth"]) == ("outer", 0)
+    assert outer["info"] == {"rows": 3, "written": 2}
+    assert outer["status"] == "ok" and outer["ms"] >= inner["ms"] >= 0
+
+
+def test_failed_span_is_recorded_as_error():
+    with pytest.raises(ValueError):
+        with timing.span("boom"):
+            raise ValueError("x")
+    (record,) = timing.recent_spans()
+    assert record["status"] == "error"
+
+
+def test_timed_decorator_uses_the_qualified_name():
+    @timing.timed()
+    def work():
+        return 7
+
+    assert work() == 7
+    assert timing.recent_spans()[-1]["name"].endswith("work")
+
+
+def test_ring_buffer_keeps_the_newest_spans():
+    for i in range(timing.RING_SIZE + 5):
+        with timing.span(f"s{i}"):
+            pass
+    spans = timing.recent_spans()
+    assert len(spans) == timing.RING_SIZE
+    assert spans[0]["name"] == "s5"
+    assert spans[-1]["name"] == f"s{timing.RING_SIZE + 4}"
+
+
+def test_file_log_rotates(tmp_path):
+    path = timing.enable_file_log(tmp_path / "timings.log", max_bytes=300, backups=2)
+    assert timing.file_log_enabled()
+    for i in range(40):
+        with timing.span("export", row=i):
+            pass
+    timing.disable_file_log()
+    assert not timing.file_log_enabled()
+    assert "export" in path.read_text(encoding="utf-8")
+    assert (tmp_path / "timings.log.1").exists()
+    assert not (tmp_path / "timings.log.3").exists()
+
+
+def test_note_records_an_event_without_duration():
+    timing.note("watch_folder.skipped", file="x.csv")
+    (record,) = timing.recent_spans()
+    assert record["ms"] == 0.0 and record["status"] == "warning"
+    assert record["info"] == {"file": "x.csv"}
@@ -0,0 +1,44 @@
+import pytest
+
+from helpers.watch_folder import classify, ingest
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_quoted_sspassess_is_a_oneuni_extract(tmp_path):
+    path = _write(tmp_path, "extract.csv", '"HEADER","x"\n"SSPASSESS","PSY101","1"\n')
+    assert classify(path) == "oneuni"
+
+
+def test_sspassess_after_a_long_preamble_is_found(tmp_path):
+    preamble = "".join(f"INFO,line {i}\n" for i in range(200))
+    path = _write(tmp_path, "extract.csv", preamble + "SSPASSESS,PSY101,1\n")
+    assert classify(path) == "oneuni"
+
+
+def test_other_csv_files_may_be_gradebooks(tmp_path):
+    path = _write(tmp_path, "marks.csv", "Student ID,Total\n12345678,72\n")
+    assert classify(path) == "gradebook"
+    assert ingest(path, "gradebook") == [("12345678", "72")]
+
+
+def test_skipped_names_and_suffixes(tmp_path):
+    assert classify(_write(tmp_path, "~$marks.xlsx", "")) is None
+    assert classify(_write(tmp_path, ".hidden.csv", "")) is None
+    assert classify(_write(tmp_path, "notes.pdf", "")) is None
+
+
+def test_unrecognised_gradebook_header_is_rejected(tmp_path):
+    path = _write(tmp_path, "other.csv", "foo,bar\n1,2\n")
+    with pytest.raises(ValueError):
+        ingest(path, "gradebook")
+
+
+def test_gradebook_without_rows_is_rejected(tmp_path):
+    path = _write(tmp_path, "empty.csv", "Student ID,Total\n")
+    with pytest.raises(ValueError):
+        ingest(path, "gradebook")
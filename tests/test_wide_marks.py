@@ -0,0 +1,71 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from helpers.oneuni_index import ASSESSMENT_KEY, ATTEMPT_KEY, MARK_KEY, STUDENT_KEY, UNIT_KEY, OneUniRowStore
+from helpers.wide_marks import (
+    DESCRIPTION_KEY, MarkColumn, assessment_description, join_wide_marks, load_wide, save_wide,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _row(student, assessment, attempt="1", description=""):
+    return {UNIT_KEY: "PSY101", STUDENT_KEY: student, ASSESSMENT_KEY: assessment,
+            ATTEMPT_KEY: attempt, DESCRIPTION_KEY: description}
+
+
+@pytest.fixture
+def store():
+    return OneUniRowStore([
+        _row("100", "A1", description="Essay"),
+        _row("100", "A2"),
+        _row("100", "A1", attempt="2"),
+        _row("200", "A1"),
+    ])
+
+
+COLUMNS = [MarkColumn("Essay", "A1"), MarkColumn("Exam", "A2")]
+
+
+def test_join_uses_latest_attempt_and_orders_by_column(store):
+    joined, problems = join_wide_marks(store, COLUMNS, [["100", "70", "55"], ["200", "64", ""]])
+    assert [(r[STUDENT_KEY], r[ASSESSMENT_KEY], r[ATTEMPT_KEY], r[MARK_KEY]) for r in joined] == [
+        ("100", "A1", "2", "70"),
+        ("200", "A1", "1", "64"),
+        ("100", "A2", "1", "55"),
+    ]
+    assert problems == []
+
+
+def test_join_reports_what_cannot_be_exported(store):
+    rows = [["200", "", "50"], ["999", "40", ""], ["200", "1", "1"]]
+    joined, problems = join_wide_marks(store, COLUMNS, rows)
+    assert joined == []
+    assert [(p.sid, p.column) for p in problems] == [("200", ""), ("999", "Essay"), ("200", "Exam")]
+
+
+def test_join_does_not_change_the_stored_rows(store):
+    join_wide_marks(store, COLUMNS, [["200", "64", ""]])
+    assert all(MARK_KEY not in r for r in store.rows)
+
+
+def test_assessment_description(store):
+    assert assessment_description(store, "A1") == "Essay"
+    assert assessment_description(store, "ZZ") == ""
+
+
+def test_state_round_trip(tmp_path):
+    path = tmp_path / "wide.json"
+    save_wide(COLUMNS, [["100", "70", "55"]], path)
+    assert load_wide(path) == (COLUMNS, [["100", "70", "55"]])
+    path.write_text("{not json", encoding="utf-8")
+    assert load_wide(path) == ([], [])
+
+
+def test_wide_marks_does_not_import_the_gui_modules():
+    code = "import sys, helpers.wide_marks; print(sorted({'openpyxl', 'tkinter'} & set(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
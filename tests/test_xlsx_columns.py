@@ -0,0 +1,86 @@
+import inspect
+
+import pytest
+
+pytest.importorskip("openpyxl")
+from openpyxl import Workbook  # noqa: E402
+from openpyxl.cell.cell import Cell  # noqa: E402
+
+from helpers.xlsx_columns import NUMBER, STRING, TEXT, TypedColumnWriter  # noqa: E402
+
+
+@pytest.fixture
+def ws():
+    return Workbook().active
+
+
+def _cell(ws, row, col):
+    c = ws.cell(row=row, column=col)
+    return c.value, c.data_type, c.number_format
+
+
+def test_text_keeps_leading_zeros(ws):
+    TypedColumnWriter(ws, {1: TEXT}).write_block(1, [["00123"], [" 7 "], [""]])
+    assert _cell(ws, 1, 1) == ("00123", "s", "@")
+    assert _cell(ws, 2, 1) == ("7", "s", "@")
+    assert ws.cell(row=3, column=1).value is None
+
+
+def test_number_conversion(ws):
+    TypedColumnWriter(ws, {1: NUMBER}).write_block(1, [["70"], ["72.5"], ["70.0"], ["AB"], [""]])
+    assert _cell(ws, 1, 1) == (70, "n", "General")
+    assert _cell(ws, 2, 1) == (72.5, "n", "General")
+    assert _cell(ws, 3, 1) == (70, "n", "General")
+    assert _cell(ws, 4, 1) == ("AB", "s", "@")
+    assert ws.cell(row=5, column=1).value is None
+
+
+def test_number_keeps_the_template_format(ws):
+    ws.cell(row=1, column=1).number_format = "0.0"
+    TypedColumnWriter(ws, {1: NUMBER}).write_row(1, ["65"])
+    assert _cell(ws, 1, 1) == (65, "n", "0.0")
+
+
+def test_number_replacing_text_goes_back_to_general(ws):
+    writer = TypedColumnWriter(ws, {1: NUMBER})
+    writer.write_row(1, ["AB"])
+    writer.write_row(1, ["55"])
+    assert _cell(ws, 1, 1) == (55, "n", "General")
+
+
+def test_string_leaves_the_format_alone(ws):
+    ws.cell(row=1, column=2).number_format = "0.00"
+    TypedColumnWriter(ws, {2: STRING}).write_row(1, ["PSY101"])
+    assert _cell(ws, 1, 2) == ("PSY101", "s", "0.00")
+
+
+def test_format_is_only_set_when_it_differs(ws, monkeypatch):
+    real = inspect.getattr_static(Cell, "number_format")
+    sets = []
+
+    class Counting:
+        def __get__(self, obj, owner=None):
+            return real.__get__(obj, owner)
+
+        def __set__(self, obj, value):
+            sets.append(value)
+            real.__set__(obj, value)
+
+    monkeypatch.setattr(Cell, "number_format", Counting(), raising=False)
+    writer = TypedColumnWriter(ws, {1: TEXT})
+    writer.write_row(1, ["1"])
+    writer.write_row(1, ["2"])
+    assert sets == ["@"]
+    assert _cell(ws, 1, 1) == ("2", "s", "@")
+
+
+def test_blank_values_clear_old_ones_and_clear_rows(ws):
+    writer = TypedColumnWriter(ws, {1: TEXT, 2: NUMBER})
+    writer.write_block(1, [["1", "10"], ["2", "20"], ["3", "30"]])
+    writer.write_row(1, ["", ""])
+    assert ws.cell(row=1, column=1).value is None and ws.cell(row=1, column=2).value is None
+    ws.cell(row=2, column=3).value = "keep"
+    writer.clear_rows(2, 3)
+    assert [ws.cell(row=r, column=c).value for r in (2, 3) for c in (1, 2)] == [None] * 4
+    assert ws.cell(row=2, column=3).value == "keep"
+    writer.clear_rows(5, 4)  # empty range is a no-op